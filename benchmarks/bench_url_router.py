@@ -0,0 +1,150 @@
+"""
+URL router micro-benchmark and equivalence check.
+
+    python benchmarks/bench_url_router.py [--count 100000] [--skip-check]
+
+1. Equivalence: every URL of yt-dlp's own extractor tests is routed through
+   the extractor index and through yt-dlp's plain full scan (the first
+   extractor whose suitable() accepts the URL). Extractor key and id must
+   agree for all of them.
+2. Speed: route_url and get_url_type on --count generated URLs (every one
+   distinct), cold (empty caches) and cached, against the full scan on a sample.
+
+Exits with 1 when a URL routes differently than in yt-dlp.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from yt_dlp.extractor import gen_extractor_classes
+from src.core.url_router import route_url, get_extractor_index
+from src.detector import get_url_type
+
+FULL_SCAN_SAMPLE = 2000
+
+
+def full_scan(extractors, url):
+    """(extractor key, id) the way yt-dlp picks the extractor: first suitable() in order."""
+    for ie in extractors:
+        if ie.suitable(url):
+            if ie.ie_key() == 'Generic':
+                return ('Generic', None)
+            video_id = ie.get_temp_id(url)
+            return (ie.ie_key(), str(video_id) if video_id else None)
+    return (None, None)
+
+
+def routed(url, keys):
+    route = route_url(url)
+    if route.extractor and route.extractor not in keys:
+        return ('Generic', None) # gallery-dl category of a site yt-dlp leaves to Generic
+    return (route.extractor, route.video_id)
+
+
+def test_urls(extractors):
+    urls = []
+    for ie in extractors:
+        try:
+            for case in ie.get_testcases(include_onlymatching=True):
+                if isinstance(case.get('url'), str):
+                    urls.append(case['url'])
+        except Exception:
+            continue
+    return urls
+
+
+def generated_urls(count, seed=1):
+    """A mix of popular sites and unknown hosts, every URL distinct."""
+    rnd = random.Random(seed)
+    ident = lambda n: ''.join(rnd.choice(string.ascii_letters + string.digits + '-_') for _ in range(n))
+    makers = [
+        (40, lambda: f'https://www.youtube.com/watch?v={ident(11)}&list=PL{ident(16)}'),
+        (10, lambda: f'https://youtu.be/{ident(11)}?si={ident(8)}'),
+        (10, lambda: f'https://www.instagram.com/p/{ident(11)}/'),
+        (5, lambda: f'https://x.com/{ident(8)}/status/{rnd.randrange(10**18)}'),
+        (5, lambda: f'https://www.tiktok.com/@{ident(6)}/video/{rnd.randrange(10**18)}'),
+        (5, lambda: f'https://vimeo.com/{rnd.randrange(10**8)}'),
+        (5, lambda: f'https://www.twitch.tv/videos/{rnd.randrange(10**9)}'),
+        (5, lambda: f'https://www.dailymotion.com/video/x{ident(6).lower()}'),
+        (5, lambda: f'https://soundcloud.com/{ident(6).lower()}/{ident(10).lower()}'),
+        (10, lambda: f'https://{ident(8).lower()}.example.com/media/{ident(12)}.html'),
+    ]
+    pool = [make for weight, make in makers for _ in range(weight)]
+    return [rnd.choice(pool)() for _ in range(count)]
+
+
+def per_url(seconds, count):
+    return f"{seconds / count * 1e6:.2f} us/url"
+
+
+def check(extractors):
+    urls = test_urls(extractors)
+    keys = {ie.ie_key() for ie in extractors}
+    route_url.cache_clear()
+    mismatches = []
+    for url in urls:
+        expected, got = full_scan(extractors, url), routed(url, keys)
+        if got != expected:
+            mismatches.append((url, expected, got))
+    print(f"Equivalence: {len(urls)} yt-dlp test URLs, {len(mismatches)} mismatches")
+    for url, expected, got in mismatches[:20]:
+        print(f"  {url}\n    full scan {expected}, router {got}")
+    return not mismatches
+
+
+def bench(extractors, count):
+    urls = generated_urls(count)
+    route_url.cache_clear()
+    get_extractor_index().host_candidates.cache_clear()
+    started = time.perf_counter()
+    for url in urls:
+        route_url(url)
+    cold = time.perf_counter() - started
+
+    recent = urls[-4096:] # What route_url's cache holds
+    started = time.perf_counter()
+    for _ in range(25):
+        for url in recent:
+            route_url(url)
+    cached = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for url in urls:
+        get_url_type(url)
+    engine = time.perf_counter() - started
+
+    sample = urls[:FULL_SCAN_SAMPLE]
+    started = time.perf_counter()
+    for url in sample:
+        full_scan(extractors, url)
+    scan = time.perf_counter() - started
+
+    print(f"{count} distinct URLs:")
+    print(f"  route_url cold     {per_url(cold, count)} ({cold:.1f} s total)")
+    print(f"  route_url cached   {per_url(cached, len(recent) * 25)}")
+    print(f"  get_url_type       {per_url(engine, count)}")
+    print(f"  full scan (sample) {per_url(scan, len(sample))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="URL router benchmark")
+    parser.add_argument('--count', type=int, default=100_000, help="generated URLs to route")
+    parser.add_argument('--skip-check', action='store_true', help="skip the full-scan equivalence check")
+    args = parser.parse_args()
+
+    extractors = list(gen_extractor_classes())
+    started = time.perf_counter()
+    get_extractor_index()
+    print(f"Index build: {time.perf_counter() - started:.2f} s")
+    ok = True if args.skip_check else check(extractors)
+    bench(extractors, args.count)
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
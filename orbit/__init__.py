@@ -0,0 +1 @@
+"""Orbit command line entry point: python -m orbit urls.txt (see src.cli)."""
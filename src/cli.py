@@ -0,0 +1,211 @@
+"""
+Orbit headless batch runner.
+
+Runs the same download logic as the UI (DownloadTask / GalleryTask) without a
+display or Qt event loop, printing one JSON object per line to stdout.
+
+Usage (from the repository root; 'python -m src.cli' works the same):
+    python -m orbit urls.txt --format mp4 --quality 1080 --jobs 4 --output ./out
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.downloader import DownloadTask
+from src.core.gallery_worker import GalleryTask
+from src.core.playlist_worker import expand_playlist
+from src.core.bandwidth import get_bandwidth_governor
+from src.core.ydl_pool import get_ydl_pool
+from src.core.host_pacer import get_host_pacer
+from src.core.logger import get_logger
+from src.detector import get_url_type
+from src.settings_manager import get_default_download_folder
+
+_print_lock = threading.Lock()
+
+
+def emit(event, **fields):
+    """Writes a single machine-readable progress line."""
+    fields['event'] = event
+    fields['time'] = round(time.time(), 3)
+    line = json.dumps(fields, ensure_ascii=False)
+    with _print_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+def read_urls(path):
+    """Reads URLs from a file ('-' for stdin). Blank lines and '#' comments are skipped."""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [l.strip() for l in lines if l.strip() and not l.strip().startswith('#')]
+
+
+def build_video_options(args):
+    """Same keyword arguments HomeView passes to DownloadWorker."""
+    quality = args.quality
+    if args.format == 'mp4' and quality not in ('max', '1080', '720', '480'):
+        quality = 'max'
+    elif args.format == 'mp3' and quality not in ('0', '2', '6'):
+        quality = '2'
+
+    output_folder = args.output
+    if args.subfolders:
+        output_folder = os.path.join(output_folder, "Ses" if args.format in ('mp3', 'm4a') else "Video")
+
+    return {
+        'fmt': args.format,
+        'quality': quality,
+        'sub_opts': {
+            'enabled': bool(args.subs) and args.format == 'mp4',
+            'lang': args.subs or 'tr',
+            'embed': args.sub_mode == 'embed',
+        },
+        'trim_opts': {
+            'enabled': bool(args.trim_start or args.trim_end),
+            'start': args.trim_start or '0',
+            'end': args.trim_end or '',
+        },
+        'output_folder': output_folder,
+        'playlist_mode': args.playlist,
+        'browser': args.browser,
+    }
+
+
+def build_gallery_options(args):
+    """Same options HomeView passes to GalleryWorker."""
+    opts = {'download_folder': args.output, 'browser': args.browser}
+    if args.gallery_range:
+        opts['range'] = args.gallery_range
+    if args.gallery_date:
+        opts['date_after'] = args.gallery_date
+    if args.gallery_type:
+        opts['filter_type'] = args.gallery_type
+    return opts
+
+
+def expand_job(job_id, url, args, submit):
+    """Flat-expands a playlist and submits every entry as its own job ('<job>.<entry>')."""
+    emit('start', job=job_id, url=url, kind='playlist')
+    options = dict(build_video_options(args), playlist_mode=False)
+    
+    def on_entry(entry):
+        submit(f"{job_id}.{entry['index']}", entry['url'], dict(options, playlist_index=entry['index']))
+    
+    try:
+        title, count = expand_playlist(url, args.browser, on_entry=on_entry,
+                                       on_log=lambda msg: emit('log', job=job_id, message=msg))
+        emit('expanded', job=job_id, url=url, title=str(title), entries=count)
+    except Exception as e:
+        emit('error', job=job_id, url=url, error=str(e))
+        return False
+    return None # Entries report their own result
+
+
+def run_job(job_id, url, args, tasks, submit, video_options=None):
+    kind = 'video' if video_options else get_url_type(url, resolve=True)
+    if kind != 'gallery' and args.playlist and not video_options:
+        return expand_job(job_id, url, args, submit)
+    emit('start', job=job_id, url=url, kind=kind)
+    
+    on_log = lambda msg: emit('log', job=job_id, message=msg)
+    on_progress = lambda event: emit('progress', job=job_id, **dict(event.to_dict(), percent=round(event.percent, 1)))
+    try:
+        if kind == 'gallery':
+            task = GalleryTask(url, build_gallery_options(args), on_log=on_log, on_progress=on_progress)
+        else:
+            task = DownloadTask(url, **(video_options or build_video_options(args)),
+                                on_progress=on_progress, on_log=on_log,
+                                on_retry=lambda info: emit('retry', job=job_id, **info))
+        tasks[job_id] = task
+        
+        result = task.run()
+        emit('finished', job=job_id, url=url, title=str(result), path=getattr(task, 'output_path', None))
+        return True
+    except Exception as e:
+        emit('error', job=job_id, url=url, error=str(e))
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m orbit", description="Orbit headless batch downloader")
+    parser.add_argument("url_file", help="Text file with one URL per line ('-' for stdin)")
+    parser.add_argument("-f", "--format", choices=['mp4', 'mp3', 'm4a'], default='mp4')
+    parser.add_argument("-q", "--quality", default='max', help="mp4: max/1080/720/480, mp3: 0/2/6")
+    parser.add_argument("-o", "--output", default=get_default_download_folder(), help="Download folder")
+    parser.add_argument("--subfolders", action='store_true', help="Use 'Ses' / 'Video' subfolders like the UI")
+    parser.add_argument("--subs", choices=['tr', 'en', 'all'], help="Download subtitles in this language")
+    parser.add_argument("--sub-mode", choices=['embed', 'file'], default='embed')
+    parser.add_argument("--trim-start", help="HH:MM:SS")
+    parser.add_argument("--trim-end", help="HH:MM:SS")
+    parser.add_argument("--playlist", action='store_true', help="Download whole playlists (entries run as parallel jobs)")
+    parser.add_argument("--browser", default='disabled', help="Use cookies from this browser (chrome, firefox...)")
+    parser.add_argument("--gallery-range", help="gallery-dl range, e.g. 1-20")
+    parser.add_argument("--gallery-date", help="Only gallery items after YYYY-MM-DD")
+    parser.add_argument("--gallery-type", choices=['image', 'video'])
+    parser.add_argument("-j", "--jobs", type=int, default=3, help="Parallel jobs")
+    parser.add_argument("--limit-rate", type=int, help="Total bandwidth for all jobs in KB/s (default: app setting, 0 = unlimited)")
+    args = parser.parse_args(argv)
+
+    # Keep stdout machine-readable: console logs go to stderr
+    for handler in get_logger().logger.handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setStream(sys.stderr)
+
+    if args.limit_rate is not None:
+        get_bandwidth_governor().set_limits(args.limit_rate * 1024)
+
+    urls = read_urls(args.url_file)
+    if not urls:
+        emit('summary', total=0, succeeded=0, failed=0)
+        return 0
+    os.makedirs(args.output, exist_ok=True)
+
+    tasks = {}
+    results = []
+    emit('batch', total=len(urls), jobs=args.jobs)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    futures = []
+    
+    def submit(job_id, url, video_options=None):
+        # Playlist entries are appended while the batch is running
+        futures.append(executor.submit(run_job, job_id, url, args, tasks, submit, video_options))
+    
+    try:
+        for i, url in enumerate(urls):
+            submit(i, url)
+        i = 0
+        while i < len(futures):
+            result = futures[i].result()
+            if result is not None:
+                results.append(result)
+            i += 1
+    except KeyboardInterrupt:
+        emit('cancelled')
+        for task in list(tasks.values()):
+            task.stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    else:
+        executor.shutdown()
+    finally:
+        # Also after Ctrl-C: pooled instances are closed, learned pacing is kept
+        get_ydl_pool().close_all()
+        get_host_pacer().save()
+
+    succeeded = sum(1 for r in results if r)
+    emit('summary', total=len(results), succeeded=succeeded, failed=len(results) - succeeded)
+    return 0 if succeeded == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import os
+import time
+from yt_dlp.postprocessor import FFmpegExtractAudioPP, FFmpegMetadataPP
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.postprocessor.ffmpeg import ACODECS, FFmpegPostProcessorError, resolve_mapping
+from yt_dlp.globals import postprocessors
+from yt_dlp.utils import PostProcessingError, prepend_extension, replace_extension
+from src.core.logger import get_logger
+
+# Cover formats both containers take as they are (others are re-encoded in the same pass)
+COVER_COPY_EXTS = ('jpg', 'jpeg', 'png')
+
+
+class OrbitAudioPP(FFmpegExtractAudioPP):
+    """
+    FFmpegExtractAudio + EmbedThumbnail + FFmpegMetadata in one ffmpeg run:
+    the audio is transcoded (or copied), the cover is attached and the tags and
+    chapters are written while the output is written once.
+    The chained postprocessors rewrite the whole file three times.
+    Used through build_ydl_opts as {'key': 'OrbitAudio', ...} (MP3 / M4A jobs).
+    """
+    def __init__(self, downloader=None, preferredcodec=None, preferredquality=None):
+        FFmpegExtractAudioPP.__init__(self, downloader, preferredcodec, preferredquality)
+        self._metadata = FFmpegMetadataPP(downloader, add_infojson=False)
+
+    @PostProcessor._restrict_to(images=False)
+    def run(self, information):
+        started = time.monotonic()
+        path = information['filepath']
+        target_format, _ = resolve_mapping(information['ext'], self.mapping)
+        if target_format == 'best':
+            target_format = information['ext'] if information['ext'] in ACODECS else 'mp3'
+
+        filecodec = self.get_audio_codec(path)
+        if filecodec is None:
+            raise PostProcessingError('WARNING: unable to obtain file audio codec with ffprobe')
+
+        # Same codec decisions as FFmpegExtractAudio (lossless copy when possible)
+        if filecodec == 'aac' and target_format == 'm4a':
+            extension, _, more_opts, acodec = *ACODECS['m4a'], 'copy'
+        elif target_format == filecodec:
+            extension, _, more_opts, acodec = *ACODECS[filecodec], 'copy'
+        else:
+            extension, acodec, more_opts = ACODECS[target_format]
+            if acodec == 'aac' and self._features.get('fdk'):
+                acodec, more_opts = 'libfdk_aac', []
+        more_opts = list(more_opts)
+        if acodec != 'copy':
+            more_opts = self._quality_args(acodec)
+
+        new_path = replace_extension(path, extension, information['ext'])
+        temp_path = prepend_extension(new_path, 'temp')
+        inputs = [path]
+        options = ['-map', '0:a:0', '-c:a', acodec, *more_opts]
+        extras = [] # Cover and chapters file, removed once they are in the output
+
+        # Cover art
+        thumbnail = self._thumbnail_file(information)
+        if thumbnail:
+            inputs.append(thumbnail)
+            thumb_ext = os.path.splitext(thumbnail)[1][1:].lower()
+            options += ['-map', '1:0', '-c:v', 'copy' if thumb_ext in COVER_COPY_EXTS else 'mjpeg']
+            if extension == 'mp3':
+                options += ['-id3v2_version', '3', '-metadata:s:v', 'title=Album cover', '-metadata:s:v', 'comment=Cover (front)']
+            else:
+                options += ['-disposition:v:0', 'attached_pic']
+            extras.append(thumbnail)
+        else:
+            options.append('-vn')
+
+        # Chapters (ffmetadata file as the last input) and tags
+        self._metadata._fixup_chapters(information)
+        if information.get('chapters'):
+            chapters_file = replace_extension(path, 'meta')
+            list(self._metadata._get_chapter_opts(information['chapters'], chapters_file))
+            inputs.append(chapters_file)
+            options += ['-map_metadata', str(len(inputs) - 1)]
+            extras.append(chapters_file)
+        for option in self._metadata._get_metadata_opts(information):
+            options.extend(option)
+
+        self.to_screen(f'Destination: {new_path}')
+        try:
+            self.run_ffmpeg_multiple_files(inputs, temp_path, options)
+        except FFmpegPostProcessorError as err:
+            raise PostProcessingError(f'audio conversion failed: {err.msg}')
+        os.replace(temp_path, new_path)
+        information['filepath'] = new_path
+        information['ext'] = extension
+
+        if information.get('filetime') is not None:
+            self.try_utime(new_path, time.time(), information['filetime'], errnote='Cannot update utime of audio file')
+
+        written = os.path.getsize(new_path)
+        get_logger().log(
+            f"Audio single pass ({filecodec} -> {extension}, {acodec}): "
+            f"{written / 1024 / 1024:.1f} MB written in {time.monotonic() - started:.1f}s"
+        )
+        self._delete_downloaded_files(*extras, info=information)
+        # The source goes through yt-dlp's usual cleanup (kept with keepvideo)
+        return [path] if new_path != path else [], information
+
+    def _thumbnail_file(self, info):
+        """Last thumbnail written to disk (writethumbnail), None if there is none."""
+        for thumb in reversed(info.get('thumbnails') or []):
+            if thumb.get('filepath') and os.path.exists(thumb['filepath']):
+                return thumb['filepath']
+        return None
+
+
+# yt-dlp resolves {'key': 'OrbitAudio'} through its postprocessor registry (the plugin destination)
+postprocessors.value.setdefault('OrbitAudioPP', OrbitAudioPP)
@@ -0,0 +1,205 @@
+import threading
+import time
+from datetime import datetime
+from src.settings_manager import get_settings
+from src.core.logger import get_logger
+
+# Rate presets in KB/s offered in Settings (0 = unlimited)
+RATE_PRESETS_KB = [0, 256, 512, 1024, 2048, 5120, 10240, 20480, 51200]
+
+# Burst size: up to this many seconds of traffic may be spent at once
+BURST_SECONDS = 0.5
+MAX_WAIT_STEP = 0.25  # Waiting consumers re-check cancellation / new limits this often
+
+
+def format_rate(kb):
+    """'Sınırsız', '512 KB/s', '2 MB/s'..."""
+    if not kb:
+        return "Sınırsız"
+    if kb >= 1024:
+        return f"{kb / 1024:g} MB/s"
+    return f"{kb} KB/s"
+
+
+def parse_clock(text, default):
+    """'HH:MM' -> minutes since midnight."""
+    try:
+        h, m = str(text).split(':')
+        return (int(h) % 24) * 60 + int(m) % 60
+    except (TypeError, ValueError):
+        return default
+
+
+class BandwidthConsumer:
+    """A job drawing from the governor (one per running download / gallery)."""
+    def __init__(self, name):
+        self.name = name
+        self.vtime = 0.0      # Fair-queueing position (bytes served, normalized)
+        self.waiting = False
+        self.reserved = 0     # Fixed share in bytes/sec (gallery-dl processes)
+
+
+class BandwidthGovernor:
+    """
+    Global token bucket shared by every download of the session.
+    - Total rate from Settings, optionally replaced by a time-of-day schedule
+    - Fair sharing: when several jobs wait for tokens, the one that received
+      the least so far goes first (start-time fair queueing)
+    - Limits can be changed while jobs are running (reload_settings)
+    yt-dlp jobs call acquire() for every received block; gallery-dl runs as a
+    separate process, so it gets a fixed share through --limit-rate instead.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._consumers = []
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._vclock = 0.0
+        self.base_rate = 0          # bytes/sec, 0 = unlimited
+        self.schedule = None        # (start_min, end_min, bytes/sec) or None
+        self.reload_settings()
+
+    # --- Configuration ---
+
+    def reload_settings(self):
+        """Re-reads the limits from Settings (called live from SettingsView)."""
+        settings = get_settings()
+        try:
+            base = int(settings.value("bandwidth_limit_kb", 0)) * 1024
+            scheduled = int(settings.value("bandwidth_schedule_limit_kb", 0)) * 1024
+        except (TypeError, ValueError):
+            base, scheduled = 0, 0
+        
+        schedule = None
+        if settings.value("bandwidth_schedule_enabled", "false") == "true":
+            start = parse_clock(settings.value("bandwidth_schedule_start", "09:00"), 9 * 60)
+            end = parse_clock(settings.value("bandwidth_schedule_end", "18:00"), 18 * 60)
+            schedule = (start, end, scheduled)
+        self.set_limits(base, schedule)
+
+    def set_limits(self, base_rate, schedule=None):
+        with self._cond:
+            self.base_rate = max(0, int(base_rate))
+            self.schedule = schedule
+            self._tokens = min(self._tokens, self._capacity(self._rate()))
+            self._cond.notify_all()
+        get_logger().log(f"Bandwidth limit: {format_rate(self.current_rate() // 1024)} (base {format_rate(self.base_rate // 1024)}, schedule {schedule})")
+
+    def current_rate(self):
+        """Total limit in bytes/sec right now (0 = unlimited)."""
+        with self._cond:
+            return self._rate()
+
+    def _rate(self):
+        if self.schedule:
+            start, end, rate = self.schedule
+            now = datetime.now()
+            minute = now.hour * 60 + now.minute
+            # Windows may wrap around midnight (e.g. 22:00 - 06:00)
+            inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if inside:
+                return rate
+        return self.base_rate
+
+    def _capacity(self, rate):
+        return max(rate * BURST_SECONDS, 64 * 1024)
+
+    # --- Consumers ---
+
+    def register(self, name):
+        with self._cond:
+            consumer = BandwidthConsumer(name)
+            consumer.vtime = self._vclock # New jobs don't get a backlog of credit
+            self._consumers.append(consumer)
+            return consumer
+
+    def unregister(self, consumer):
+        with self._cond:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
+            self._cond.notify_all()
+
+    def reserve_share(self, consumer):
+        """
+        Reserves a fair share of the current limit for a consumer that can't
+        be throttled block by block (gallery-dl). Returns bytes/sec, 0 = unlimited.
+        """
+        with self._cond:
+            rate = self._rate()
+            if not rate:
+                return 0
+            share = max(int(rate / max(1, len(self._consumers))), 16 * 1024)
+            consumer.reserved = share
+            return share
+
+    def _bucket_rate(self, rate):
+        # Reserved shares are taken out of the bucket used by yt-dlp jobs
+        reserved = sum(c.reserved for c in self._consumers)
+        return max(rate - reserved, rate * 0.1)
+
+    def acquire(self, consumer, nbytes, should_continue=None):
+        """
+        Blocks until nbytes may be received. Returns False if cancelled meanwhile.
+        Blocks larger than the bucket are allowed and paid back as debt.
+        """
+        if nbytes <= 0 or not self.base_rate and not self.schedule:
+            return True # Unlimited: fast path without locking
+
+        with self._cond:
+            consumer.waiting = True
+            try:
+                while True:
+                    rate = self._rate()
+                    if not rate:
+                        return True
+                    bucket_rate = self._bucket_rate(rate)
+                    self._refill(bucket_rate)
+                    
+                    if self._tokens > 0 and self._is_next(consumer):
+                        self._tokens -= nbytes
+                        consumer.vtime = max(consumer.vtime, self._vclock) + nbytes
+                        self._advance_clock()
+                        self._cond.notify_all()
+                        return True
+                    
+                    if should_continue and not should_continue():
+                        return False
+                    wait = (-self._tokens + 1) / bucket_rate if self._tokens <= 0 else MAX_WAIT_STEP
+                    self._cond.wait(min(max(wait, 0.005), MAX_WAIT_STEP))
+            finally:
+                consumer.waiting = False
+
+    def _refill(self, rate):
+        now = time.monotonic()
+        self._tokens = min(self._tokens + (now - self._last_refill) * rate, self._capacity(rate))
+        self._last_refill = now
+
+    def _active(self):
+        # Jobs competing for tokens right now (reserved gallery-dl shares never call acquire)
+        return [c for c in self._consumers if c.waiting and not c.reserved]
+
+    def _advance_clock(self):
+        # Virtual clock follows the competing jobs only, an idle or reserved
+        # consumer's old position would hold it back and give new jobs a head start
+        active = self._active()
+        if active:
+            self._vclock = max(self._vclock, min(c.vtime for c in active))
+
+    def _is_next(self, consumer):
+        # Fair sharing: serve the waiting job that received the least so far
+        waiting = self._active()
+        if not waiting or consumer not in waiting:
+            return True
+        return consumer is min(waiting, key=lambda c: c.vtime)
+
+
+# Global Access
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_bandwidth_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = BandwidthGovernor()
+        return _governor
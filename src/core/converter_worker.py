@@ -2,8 +2,10 @@ import os
 import subprocess
 import re
 import json
+import time
 from PySide6.QtCore import QThread, Signal
 from src.core.logger import get_logger
+from src.core.progress import ProgressEvent, PHASE_POSTPROCESS
 
 class MediaInfoWorker(QThread):
     finished = Signal(dict)
@@ -99,7 +101,7 @@ class MediaInfoWorker(QThread):
         self.finished.emit(info)
 
 class ConverterWorker(QThread):
-    progress = Signal(int)       # 0-100
+    progress = Signal(object)    # ProgressEvent
     finished = Signal(str, str)  # Output path, Message
     error = Signal(str)          # Error message
     log = Signal(str)            # Status log messages
@@ -247,6 +249,9 @@ class ConverterWorker(QThread):
             )
             
             time_pattern = re.compile(r"time=(\d+:\d+:\d+\.\d+)")
+            size_pattern = re.compile(r"size=\s*(\d+)\s*[kK]i?B")
+            speed_pattern = re.compile(r"speed=\s*([\d.]+)x")
+            started = time.monotonic()
             
             for line in self.process.stdout:
                 if not self.is_running:
@@ -259,8 +264,20 @@ class ConverterWorker(QThread):
                      time_str = match.group(1) # e.g. 00:00:10.50
                      current_sec = self._parse_time(time_str)
                      if current_sec:
-                          percent = min(100, int((current_sec / process_duration) * 100))
-                          self.progress.emit(percent)
+                          percent = min(100.0, (current_sec / process_duration) * 100)
+                          
+                          # Output size and ffmpeg's realtime factor (e.g. speed=2.5x)
+                          size_match = size_pattern.search(line)
+                          speed_match = speed_pattern.search(line)
+                          written = int(size_match.group(1)) * 1024 if size_match else None
+                          elapsed = time.monotonic() - started
+                          eta = None
+                          if speed_match and float(speed_match.group(1)) > 0:
+                               eta = max(0.0, (process_duration - current_sec) / float(speed_match.group(1)))
+                          self.progress.emit(ProgressEvent(
+                               PHASE_POSTPROCESS, percent, written,
+                               speed=written / elapsed if written and elapsed > 0 else None, eta=eta
+                          ))
 
             self.process.wait()
             
@@ -268,7 +285,7 @@ class ConverterWorker(QThread):
                  raise Exception(f"FFMPEG Hatası (Kod: {self.process.returncode})")
                  
             if self.is_running:
-                 self.progress.emit(100)
+                 self.progress.emit(ProgressEvent(PHASE_POSTPROCESS, 100.0))
                  self.finished.emit(self.output_path, "Dönüştürme tamamlandı!")
                  
         except Exception as e:
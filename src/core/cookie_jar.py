@@ -0,0 +1,120 @@
+import os
+import tempfile
+import threading
+import time
+from yt_dlp.cookies import load_cookies, YoutubeDLCookieJar
+from src.core.logger import get_logger
+
+# Browser cookies are read again after this long (new logins, rotated session tokens)
+REFRESH_INTERVAL = 30 * 60
+# A failed read (browser open / DPAPI) is not retried by every job for this long
+FAILURE_BACKOFF = 60
+
+
+def browser_spec(browser):
+    """'chrome' / ('chrome',) / ('firefox', 'profile') -> yt-dlp's browser specification tuple."""
+    if not browser or browser == 'disabled':
+        return None
+    return tuple(browser) if isinstance(browser, (tuple, list)) else (browser, )
+
+
+class BrowserCookieCache:
+    """
+    Session wide browser cookies: the browser database is read and decrypted
+    once, then every yt-dlp instance shares the same in-memory jar.
+    Refreshes happen in place, so jars already handed out see the new cookies.
+    Nothing is written to disk except short-lived files for gallery-dl runs.
+    """
+    def __init__(self, refresh_interval=REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._jars = {}       # spec -> YoutubeDLCookieJar (shared, refreshed in place)
+        self._loaded_at = {}  # spec -> monotonic time of the last successful read
+        self._failures = {}   # spec -> (monotonic time, exception)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock() # One browser read at a time
+
+    def get(self, browser):
+        """
+        Returns the shared jar for a browser, reading the browser if it was never
+        read, is older than refresh_interval or was invalidated.
+        Raises CookieLoadError if the browser can't be read.
+        """
+        spec = browser_spec(browser)
+        if spec is None:
+            return None
+
+        with self._load_lock:
+            now = time.monotonic()
+            with self._lock:
+                jar = self._jars.get(spec)
+                loaded_at = self._loaded_at.get(spec)
+                failure = self._failures.get(spec)
+            if jar is not None and loaded_at is not None and now - loaded_at < self.refresh_interval:
+                return jar
+            if failure and now - failure[0] < FAILURE_BACKOFF:
+                raise failure[1]
+
+            started = time.monotonic()
+            try:
+                fresh = load_cookies(None, spec, None)
+            except Exception as e:
+                get_logger().error(f"Browser cookies could not be loaded ({spec[0]}): {e}")
+                with self._lock:
+                    self._failures[spec] = (time.monotonic(), e)
+                if jar is not None:
+                    return jar # Keep using the last good cookies
+                raise
+
+            with self._lock:
+                if jar is None:
+                    jar = self._jars[spec] = YoutubeDLCookieJar()
+                self._loaded_at[spec] = time.monotonic()
+                self._failures.pop(spec, None)
+            # CookieJar's lock is reentrant: requests never see a half refreshed jar
+            with jar._cookies_lock:
+                jar.clear()
+                for cookie in fresh:
+                    jar.set_cookie(cookie)
+            get_logger().log(f"Browser cookies loaded ({spec[0]}): {len(jar)} cookies in {time.monotonic() - started:.1f}s")
+            return jar
+
+    def invalidate(self, browser=None):
+        """Forces a fresh read on the next get() (e.g. after an auth failure)."""
+        spec = browser_spec(browser)
+        with self._lock:
+            if spec is None:
+                self._loaded_at.clear()
+                self._failures.clear()
+            else:
+                self._loaded_at.pop(spec, None)
+                self._failures.pop(spec, None)
+
+    def export(self, browser):
+        """
+        Writes the cookies to a private Netscape cookie file (for gallery-dl).
+        Returns the path, the caller deletes it when the run ends.
+        """
+        jar = self.get(browser)
+        if jar is None:
+            return None
+        fd, path = tempfile.mkstemp(prefix='orbit_cookies_', suffix='.txt') # Owner-only permissions
+        os.close(fd)
+        try:
+            with jar._cookies_lock:
+                jar.save(path, ignore_discard=True, ignore_expires=True)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+
+
+# Global Access
+_cookie_cache = None
+_cookie_cache_lock = threading.Lock()
+
+def get_cookie_cache():
+    global _cookie_cache
+    with _cookie_cache_lock:
+        if _cookie_cache is None:
+            _cookie_cache = BrowserCookieCache()
+        return _cookie_cache
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from yt_dlp.utils import make_archive_id
+from src.settings_manager import get_app_data_dir
+from src.core.info_cache import cache_key_for_url
+
+
+def archive_profile(fmt, quality):
+    """Format profile an archive entry is valid for (an MP3 doesn't make the MP4 'downloaded')."""
+    return f"{fmt}:{quality}"
+
+
+def archive_id_for_url(url):
+    """yt-dlp style archive id ('youtube dQw4w9WgXcQ') derived from the URL alone, None if unknown."""
+    key = cache_key_for_url(url)
+    if not key:
+        return None
+    extractor, video_id = key.split(':', 1)
+    return make_archive_id(extractor, video_id)
+
+
+def archive_id_for_info(info):
+    extractor = info.get('extractor_key') or info.get('ie_key')
+    if not extractor or not info.get('id'):
+        return None
+    return make_archive_id(extractor, info['id'])
+
+
+class DownloadArchive:
+    """
+    Record of finished downloads (AppData/Orbit/archive.db), keyed by
+    (archive id, format profile) so known items are skipped before extraction.
+    gallery-dl uses the same file through --download-archive
+    (it keeps its own 'archive' table next to ours).
+    """
+    def __init__(self, db_path=None):
+        self.path = db_path or os.path.join(get_app_data_dir(), "archive.db")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._views = {}
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS downloads (
+                    archive_id TEXT NOT NULL,
+                    profile TEXT NOT NULL,
+                    title TEXT,
+                    path TEXT,
+                    created_at TEXT,
+                    PRIMARY KEY (archive_id, profile)
+                ) WITHOUT ROWID
+            """)
+
+    def lookup(self, archive_id, profile):
+        """
+        Returns the entry dict if this item was downloaded in this profile and
+        its file still exists (deleted files are downloaded again), else None.
+        Entries without a path don't count: the item never reached its final file.
+        """
+        if not archive_id:
+            return None
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT title, path FROM downloads WHERE archive_id = ? AND profile = ?", (archive_id, profile)
+            ).fetchone()
+        if row is None:
+            return None
+        title, path = row
+        if not path or not os.path.exists(path):
+            return None
+        return {'archive_id': archive_id, 'title': title, 'path': path}
+
+    def add(self, archive_id, profile, title=None, path=None):
+        """Records a finished download (keeps the known title/path if the new ones are missing)."""
+        if not archive_id:
+            return
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock, self.conn:
+            self.conn.execute(
+                """INSERT INTO downloads (archive_id, profile, title, path, created_at) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(archive_id, profile) DO UPDATE SET
+                       title = COALESCE(excluded.title, title),
+                       path = COALESCE(excluded.path, path),
+                       created_at = excluded.created_at""",
+                (archive_id, profile, title, path, now)
+            )
+
+    def remove(self, archive_id, profile):
+        if not archive_id:
+            return
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM downloads WHERE archive_id = ? AND profile = ?", (archive_id, profile))
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM downloads")
+
+    def view(self, profile):
+        """Set-like view of one profile, passed to yt-dlp as 'download_archive'."""
+        with self._lock:
+            view = self._views.get(profile)
+            if view is None:
+                view = self._views[profile] = ArchiveView(self, profile)
+            return view
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class ArchiveView:
+    """
+    yt-dlp accepts any object with 'in' and add() as download_archive:
+    playlist entries found in it are skipped before their extraction.
+    """
+    def __init__(self, archive, profile):
+        self.archive = archive
+        self.profile = profile
+
+    def __contains__(self, archive_id):
+        return self.archive.lookup(archive_id, self.profile) is not None
+
+    def add(self, archive_id, path=None):
+        self.archive.add(archive_id, self.profile, path=path)
+
+    def __bool__(self):
+        return True # yt-dlp skips the lookup for an empty archive
+
+    def __repr__(self):
+        # Stable across jobs: part of the YoutubeDL pool key
+        return f"ArchiveView({self.profile!r})"
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+# Global Access
+def get_download_archive():
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = DownloadArchive()
+        return _archive
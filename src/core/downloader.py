@@ -1,27 +1,207 @@
 import yt_dlp
+import copy
 import os
 import sys
-import re
+import time
+import threading
 from PySide6.QtCore import QThread, Signal
 import yt_dlp.utils
 from src.core.logger import get_logger
+from src.core.info_cache import get_info_cache, cache_key_for_url, cache_key_for_info
+from src.core.metadata_prefetch import wait_for_prefetch
+from src.core.fragment_tuner import get_fragment_tuner, FragmentMonitor
+from src.core.bandwidth import get_bandwidth_governor
+from src.core.ydl_pool import get_ydl_pool
+from src.core.host_pacer import get_host_pacer
+from src.core.download_archive import get_download_archive, archive_profile, archive_id_for_url, archive_id_for_info
+from src.core.progress import (ProgressEvent, PHASE_EXTRACT, PHASE_SUBTITLES, PHASE_DOWNLOAD, PHASE_MERGE, PHASE_POSTPROCESS,
+                               PHASE_POSTPROCESS_WAIT)
+from src.core.postprocess_pool import get_postprocess_pool
+from src.core import audio_postprocessor, mp4_postprocessor # Register the 'OrbitAudio' / 'OrbitMp4Subtitles' postprocessors
+from src.core.retry import (classify_error, wait_interruptible, RETRY_POLICIES, ERROR_LABELS, ERROR_SSL, ERROR_COOKIES, ERROR_AUTH,
+                            ERROR_RATE_LIMIT)
+from src.core.cookie_jar import get_cookie_cache
+from src.core.partial_files import partial_files_for, remove_files
+from src.core.segmented_downloader import (SegmentedDownload, DirectDownloadError, DEFAULT_CONNECTIONS, DIRECT_VIDEO_EXTENSIONS,
+                                           direct_media_extension, direct_filename, probe)
+from src.utils import get_host
 
-# Pre-compiled regex for ANSI escape codes (used in progress hook)
-ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+# Progress is sampled in the worker: at most one report per interval (10 Hz)
+PROGRESS_INTERVAL = 0.1
 
-class DownloadWorker(QThread):
+
+def parse_time(time_str):
     """
-    Worker thread that handles yt-dlp operations.
-    Communicates with the UI via Signals.
-    Supports MP4, MP3, M4A, Subtitles, and Time Range Trimming.
+    Parses 'MM:SS' or 'HH:MM:SS' or 'SS' into seconds (float).
+    Returns None if parsing fails or empty.
     """
-    progress = Signal(int)       # 0-100
-    finished = Signal(str, str)  # Success message (Title, URL)
-    error = Signal(str)          # Error message
-    log = Signal(str)            # Status log messages
+    if not time_str:
+        return None
+    
+    try:
+        parts = [float(p) for p in time_str.split(':')]
+        if len(parts) == 1:
+            return parts[0]
+        elif len(parts) == 2: # MM:SS
+            return parts[0] * 60 + parts[1]
+        elif len(parts) == 3: # HH:MM:SS
+            return parts[0] * 3600 + parts[1] * 60 + parts[2]
+    except:
+        return None
+    return None
 
-    def __init__(self, url, fmt='mp4', quality='max', sub_opts=None, trim_opts=None, output_folder=None, playlist_mode=False, browser=None):
-        super().__init__()
+
+def _subtitles_requested(opts):
+    return bool(opts.get('writesubtitles') or opts.get('writeautomaticsub'))
+
+
+def build_ydl_opts(fmt='mp4', quality='max', sub_opts=None, trim_opts=None, output_folder=None, playlist_mode=False, browser=None,
+                   playlist_index=None):
+    """
+    Builds the yt-dlp options for a job (without hooks).
+    Shared by the UI worker and the headless CLI.
+    playlist_index: set for a single entry of an expanded playlist (keeps the 'NN - title' naming).
+    """
+    sub_opts = sub_opts if sub_opts else {'enabled': False}
+    trim_opts = trim_opts if trim_opts else {'enabled': False}
+
+    # Base Options
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True, # Progress is reported through hooks only
+        'ffmpeg_location': os.getcwd(), 
+    }
+
+    # Browser Cookies (Premium / Members Only)
+    if browser and browser != 'disabled':
+        # yt-dlp expects tuple: (browser_name, profile, container, keyring)
+        # We just pass the name, letting it use defaults.
+        ydl_opts['cookiesfrombrowser'] = (browser, )
+
+    # Custom Filename Template
+    name_tmpl = '%(title)s'
+    
+    if fmt == 'mp4':
+        # Video: Append resolution (e.g. [1080p])
+        name_tmpl += ' [%(height)sp]'
+    elif fmt == 'mp3':
+        # Audio: Append Quality Tag
+        # quality is '0' (Best), '2' (High), '6' (Good)
+        q_suffix = {'0': ' [HQ]', '2': ' [SQ]', '6': ' [LQ]'}.get(str(quality), '')
+        name_tmpl += q_suffix
+
+    # Playlist Logic & Final Template
+    if playlist_mode:
+        ydl_opts['noplaylist'] = False
+        ydl_opts['outtmpl'] = f'%(playlist_index)s - {name_tmpl}.%(ext)s'
+    elif playlist_index:
+        ydl_opts['noplaylist'] = True
+        ydl_opts['outtmpl'] = f'{playlist_index} - {name_tmpl}.%(ext)s'
+    else:
+        ydl_opts['noplaylist'] = True
+        ydl_opts['outtmpl'] = f'{name_tmpl}.%(ext)s'
+
+    # Set Output Folder
+    if output_folder:
+         ydl_opts['paths'] = {'home': output_folder}
+
+    # Subtitle Options
+    if sub_opts.get('enabled', False):
+        ydl_opts['writesubtitles'] = True
+        ydl_opts['writeautomaticsub'] = True
+        
+        # Language
+        lang = sub_opts.get('lang', 'tr')
+        if lang == 'all':
+            ydl_opts['subtitleslangs'] = ['all']
+        else:
+            ydl_opts['subtitleslangs'] = [lang] 
+        
+        # Formats
+        ydl_opts['subtitlesformat'] = 'best'
+
+        # Embed vs Separate (merged files get them in the merge pass, see OrbitMergerPP)
+        if sub_opts.get('embed', False) and fmt == 'mp4':
+            ydl_opts['embedsubtitles'] = True
+            ydl_opts['postprocessors'] = [{'key': 'OrbitMp4Subtitles'}] # Single file formats
+        else:
+            ydl_opts['embedsubtitles'] = False
+
+    # Trim / Time Range Options
+    if trim_opts.get('enabled', False):
+        start_sec = parse_time(trim_opts.get('start', ''))
+        end_sec = parse_time(trim_opts.get('end', ''))
+        
+        # Setup download ranges callback
+        # yt-dlp expects a list of tuples [(start, end)]
+        # If end is None, it goes to end of video
+        
+        # IMPORTANT: yt_dlp.utils.download_range_func handles logic to tell ffmpeg to cut
+        if start_sec is not None:
+            ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(None, [(start_sec, end_sec)])
+            ydl_opts['force_keyframes_at_cuts'] = True # Re-encode at cuts for precision
+
+    # Format Specific Options
+    audio_fmt_pref = 'bestaudio[language^=tr]/bestaudio/best'
+    
+    if fmt == 'mp3':
+        ydl_opts.update({
+            'format': audio_fmt_pref,
+            'postprocessors': [{
+                'key': 'OrbitAudio', # Converts, embeds the thumbnail and writes metadata in one ffmpeg pass
+                'preferredcodec': 'mp3',
+                'preferredquality': quality,
+            }],
+            'writethumbnail': True,
+            'addmetadata': True,
+        })
+    elif fmt == 'm4a':
+        ydl_opts.update({
+            'format': audio_fmt_pref,
+            'postprocessors': [{
+                'key': 'OrbitAudio',
+                'preferredcodec': 'm4a',
+            }],
+            'writethumbnail': True,
+            'addmetadata': True,
+        })
+    else: # mp4 (video)
+        # Default 'bestvideo+bestaudio/best' implies Max
+        # Prioritize Turkish Audio
+        fmt_str = 'bestvideo+bestaudio[language^=tr]/bestvideo+bestaudio/best'
+        
+        if quality != 'max':
+            # Limit resolution
+            # Complex fallback: 
+            # 1. Best Video (Limited) + Best Turkish Audio
+            # 2. Best Video (Limited) + Best Audio (Any)
+            # 3. Best File (Limited)
+            fmt_str = (f'bestvideo[height<={quality}]+bestaudio[language^=tr]/'
+                       f'bestvideo[height<={quality}]+bestaudio/'
+                       f'best[height<={quality}]')
+        
+        ydl_opts.update({
+            'format': fmt_str,
+            'merge_output_format': 'mp4',
+            'parallel_streams': True, # Video and audio of the merge download at the same time (OrbitYoutubeDL)
+        })
+    
+    # Request spacing comes from the per-host pacer (see DownloadTask._perform_download)
+    return ydl_opts
+
+
+class DownloadTask:
+    """
+    Runs a single yt-dlp job: format, subtitle, trim and fallback logic.
+    Qt-free (reports through plain callbacks), so it is shared by the
+    DownloadWorker thread and the headless CLI.
+    Supports MP4, MP3, M4A, Subtitles, and Time Range Trimming.
+    defer_postprocess: run() returns once the streams are downloaded and
+    finish_postprocess() does the merge / conversion later (postprocess_pending).
+    """
+    def __init__(self, url, fmt='mp4', quality='max', sub_opts=None, trim_opts=None, output_folder=None, playlist_mode=False, browser=None,
+                 playlist_index=None, defer_postprocess=False, on_progress=None, on_log=None, on_retry=None):
         self.url = url
         self.fmt = fmt # 'mp4', 'mp3', 'm4a'
         self.quality = quality 
@@ -29,283 +209,375 @@ class DownloadWorker(QThread):
         self.trim_opts = trim_opts if trim_opts else {'enabled': False}
         self.output_folder = output_folder
         self.playlist_mode = playlist_mode
+        self.playlist_index = playlist_index # Entry number when expanded from a playlist
         self.browser = browser
         self.is_running = True
+        self.output_path = None # Last written file (reported to the job store)
+        self.stream_files = [] # Files yt-dlp downloads into (kept on pause for resuming)
+        self._info = None # Raw extraction result, shared by retries
+        self._phase = PHASE_EXTRACT # Phase the job is in (retries repeat only the failed one)
+        self.title = None
+        # Post-processing stage (playlist mode jobs post-process inline, entry by entry)
+        self.defer_postprocess = defer_postprocess and not playlist_mode
+        self._postprocess = None # DeferredPostProcess left by the download
+        self._pp_steps = 0
+        self._pp_done = 0
+        self.host = get_host(url)
+        # Download archive profile (trimmed clips are not archived: they aren't the full item)
+        self.archive_profile = None if self.trim_opts.get('enabled') else archive_profile(fmt, quality)
+        
+        # Fragment concurrency tuning (HLS/DASH)
+        self._ydl = None
+        self._fragment_monitor = FragmentMonitor()
+        self._fragment_level = 1
+        self._fragment_count = 0
+        
+        # Global bandwidth limit (received bytes are paid for in the progress hook)
+        self._bandwidth = None
+        self._bw_lock = threading.Lock()
+        self._bw_bytes = {} # filename -> bytes already paid for
+        
+        # Progress sampling (yt-dlp calls the hook for every block / fragment)
+        self._progress_lock = threading.Lock()
+        self._pending_progress = None
+        self._last_report = 0.0
+        self._streams = {} # filename -> last sample of the item's streams (video + audio are combined)
+        self._streams_item = None
+        
+        # Callbacks
+        self.on_progress = on_progress or (lambda event: None)  # ProgressEvent
+        self.on_log = on_log or (lambda msg: None)              # Status log messages
+        self.on_retry = on_retry or (lambda info: None)         # Retry record (class, phase, attempt, delay)
         
         # Locate ffmpeg.exe
         self.ffmpeg_path = os.path.join(os.getcwd(), 'ffmpeg.exe')
 
     def run(self):
         """
-        Main execution method for the thread.
+        Runs the job. Returns the title, raises on failure.
         """
-        # Base Options
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'progress_hooks': [self._progress_hook],
-            'ffmpeg_location': os.getcwd(), 
-        }
+        ydl_opts = build_ydl_opts(self.fmt, self.quality, self.sub_opts, self.trim_opts,
+                                  self.output_folder, self.playlist_mode, self.browser, self.playlist_index)
+        ydl_opts['progress_hooks'] = [self._progress_hook]
+        ydl_opts['postprocessor_hooks'] = [self._postprocessor_hook]
+        ydl_opts['logger'] = self._fragment_monitor
+        self._fragment_level = get_fragment_tuner().recommend(self.host)
+        ydl_opts['concurrent_fragment_downloads'] = self._fragment_level
+        if self.defer_postprocess:
+            ydl_opts['defer_postprocess'] = True
 
-        # Browser Cookies (Premium / Members Only)
-        if self.browser and self.browser != 'disabled':
-            # yt-dlp expects tuple: (browser_name, profile, container, keyring)
-            # We just pass the name, letting it use defaults.
-            ydl_opts['cookiesfrombrowser'] = (self.browser, )
-            self.log.emit(f"Tarayıcı çerezleri kullanılıyor: {self.browser}")
+        # Already downloaded in this format: done without extraction (no network request)
+        archived = self._archived_entry()
+        if archived:
+            self.output_path = archived['path']
+            title = archived['title'] or self.url
+            self.on_log(f"Zaten indirilmiş, atlanıyor: {title}")
+            get_logger().log(f"Skipped (download archive {archived['archive_id']}, {self.archive_profile}): {self.url}")
+            self.is_running = False
+            return title
+        if self.archive_profile:
+            # Playlist entries are checked by yt-dlp before their extraction
+            ydl_opts['download_archive'] = get_download_archive().view(self.archive_profile)
 
-        # Custom Filename Template
-        name_tmpl = '%(title)s'
+        if 'cookiesfrombrowser' in ydl_opts:
+            self.on_log(f"Tarayıcı çerezleri kullanılıyor: {self.browser}")
         
-        if self.fmt == 'mp4':
-            # Video: Append resolution (e.g. [1080p])
-            name_tmpl += ' [%(height)sp]'
-        elif self.fmt == 'mp3':
-            # Audio: Append Quality Tag
-            # self.quality is '0' (Best), '2' (High), '6' (Good)
-            q_suffix = {'0': ' [HQ]', '2': ' [SQ]', '6': ' [LQ]'}.get(str(self.quality), '')
-            name_tmpl += q_suffix
-
-        # Playlist Logic & Final Template
-        if self.playlist_mode:
-            ydl_opts['noplaylist'] = False
-            ydl_opts['outtmpl'] = f'%(playlist_index)s - {name_tmpl}.%(ext)s'
+        get_logger().log(f"Starting download: {self.url} | Fmt: {self.fmt} | Playlist: {self.playlist_mode}")
+        self._bandwidth = get_bandwidth_governor().register(self.url)
+
+        try:
+            # Direct media links skip extraction and download over several connections
+            title = self._direct_download()
+            if title is None:
+                self.on_log(f"Analiz ediliyor: {self.url} ({self.fmt.upper()})")
+                self.on_progress(ProgressEvent(PHASE_EXTRACT))
+                title = self._run_with_retries(ydl_opts)
+                if self._postprocess is None:
+                    self._record_archive(title)
+            self.title = title
+            return title
+        finally:
+            self._flush_progress()
+            if self._postprocess is None:
+                self.is_running = False
+            get_bandwidth_governor().unregister(self._bandwidth)
+
+    @property
+    def postprocess_pending(self):
+        return self._postprocess is not None
+
+    def finish_postprocess(self):
+        """
+        Runs the merge / conversion steps the download left (post-processing stage).
+        Returns the title, raises on failure.
+        """
+        deferred, self._postprocess = self._postprocess, None
+        ok = False
+        try:
+            if not self.is_running:
+                raise Exception("İndirme kullanıcı tarafından iptal edildi.")
+            self._phase = PHASE_POSTPROCESS
+            self._pp_steps, self._pp_done = deferred.steps, 0
+            started = time.monotonic()
+            paths = deferred.run(lambda: self.is_running)
+            if paths:
+                self.output_path = paths[-1]
+            get_logger().log(f"Post-processing finished in {time.monotonic() - started:.1f}s: {self.title}")
+            ok = True
+        finally:
+            deferred.release(ok)
+            self.is_running = False
+        self._record_archive(self.title)
+        return self.title
+
+    def wait_postprocess(self):
+        """Reports that the job waits for a post-processing worker."""
+        self.on_progress(ProgressEvent(PHASE_POSTPROCESS_WAIT))
+
+    def _perform_download(self, opts, subtitles_only=False):
+        """
+        One pass over the job. Extraction runs only if no earlier pass finished it,
+        subtitles_only writes the subtitle files without downloading the media.
+        """
+        opts['concurrent_fragment_downloads'] = self._fragment_level
+        # Throttled hosts: extractor requests are spaced too
+        pace = get_host_pacer().delay(self.host)
+        if pace:
+            opts['sleep_interval_requests'] = pace
         else:
-            ydl_opts['noplaylist'] = True
-            ydl_opts['outtmpl'] = f'{name_tmpl}.%(ext)s'
+            opts.pop('sleep_interval_requests', None)
+        if subtitles_only:
+            opts = dict(opts, skip_download=True)
 
-        # Set Output Folder
-        if self.output_folder:
-             ydl_opts['paths'] = {'home': self.output_folder}
+        # Pooled instance: extractor setup, cookies and connections carry over from earlier jobs
+        with get_ydl_pool().session(opts) as ydl:
+            self._ydl = ydl
+            # 1. Extract Info (only once: retries reuse the same result)
+            if self._info is None:
+                self._phase = PHASE_EXTRACT
+                self._wait_for_host()
+                # Repeated jobs (retries, other formats) skip extraction via the cache
+                cache_key = None if self.playlist_mode else cache_key_for_url(self.url)
+                # A prefetch started while the options were chosen fills the cache
+                wait_for_prefetch(cache_key, lambda: self.is_running)
+                info = get_info_cache().get(cache_key)
 
-        # Subtitle Options
-        if self.sub_opts.get('enabled', False):
-            ydl_opts['writesubtitles'] = True
-            ydl_opts['writeautomaticsub'] = True
-            
-            # Language
-            lang = self.sub_opts.get('lang', 'tr')
-            if lang == 'all':
-                ydl_opts['subtitleslangs'] = ['all']
-            else:
-                ydl_opts['subtitleslangs'] = [lang] 
-            
-            # Formats
-            ydl_opts['subtitlesformat'] = 'best'
+                if info is None:
+                    info = ydl.extract_info(self.url, download=False, process=False)
+                    if info.get('_type', 'video') == 'video':
+                        get_info_cache().put(cache_key_for_info(info), info)
+                else:
+                    self.on_log("Bilgiler önbellekten alındı.")
 
-            # Embed vs Separate
-            if self.sub_opts.get('embed', False) and self.fmt == 'mp4':
-                ydl_opts['embedsubtitles'] = True
+                # Single videos can be re-processed by a retry,
+                # playlists carry lazy entry generators and can't be copied.
+                if info.get('_type', 'video') == 'video':
+                    self._info = copy.deepcopy(info)
             else:
-                ydl_opts['embedsubtitles'] = False
+                info = copy.deepcopy(self._info)
+            title = info.get('title', 'Unknown Title')
+            self.on_log(f"Bulundu: {title}")
 
-        # Trim / Time Range Options
-        if self.trim_opts.get('enabled', False):
-            start_str = self.trim_opts.get('start', '')
-            end_str = self.trim_opts.get('end', '')
-            
-            start_sec = self._parse_time(start_str)
-            end_sec = self._parse_time(end_str)
-            
-            # Setup download ranges callback
-            # yt-dlp expects a list of tuples [(start, end)]
-            # If end is None, it goes to end of video
-            
-            # IMPORTANT: yt_dlp.utils.download_range_func handles logic to tell ffmpeg to cut
-            if start_sec is not None:
-                ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(None, [(start_sec, end_sec)])
-                ydl_opts['force_keyframes_at_cuts'] = True # Re-encode at cuts for precision
+            # 2. Download from the extracted info (no second extraction)
+            if self.is_running:
+                # yt-dlp writes subtitles before the media: errors until the first media block belong to them
+                self._phase = PHASE_SUBTITLES if _subtitles_requested(opts) else PHASE_DOWNLOAD
+                if not subtitles_only:
+                    self.on_log(f"İndiriliyor: {title}...")
+                self._wait_for_host()
+                result = ydl.process_ie_result(info, download=True)
+                if result:
+                    title = result.get('title', title)
+                if opts.get('defer_postprocess') and not subtitles_only:
+                    # Merge / conversion runs in the post-processing stage, the instance goes with it
+                    self._postprocess = get_ydl_pool().take_deferred(ydl)
+            return title
 
-        # Format Specific Options
-        audio_fmt_pref = 'bestaudio[language^=tr]/bestaudio/best'
-        
-        if self.fmt == 'mp3':
-            ydl_opts.update({
-                'format': audio_fmt_pref,
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': self.quality,
-                }, {
-                    'key': 'EmbedThumbnail', # Embeds the thumbnail
-                }, {
-                    'key': 'FFmpegMetadata', # Writes metadata
-                }],
-                'writethumbnail': True,
-                'addmetadata': True,
-            })
-        elif self.fmt == 'm4a':
-            ydl_opts.update({
-                'format': audio_fmt_pref,
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'm4a',
-                }, {
-                    'key': 'EmbedThumbnail',
-                }, {
-                    'key': 'FFmpegMetadata',
-                }],
-                'writethumbnail': True,
-                'addmetadata': True,
-            })
-        else: # mp4 (video)
-            # Default 'bestvideo+bestaudio/best' implies Max
-            # Prioritize Turkish Audio
-            fmt_str = 'bestvideo+bestaudio[language^=tr]/bestvideo+bestaudio/best'
-            
-            if self.quality != 'max':
-                # Limit resolution
-                # Complex fallback: 
-                # 1. Best Video (Limited) + Best Turkish Audio
-                # 2. Best Video (Limited) + Best Audio (Any)
-                # 3. Best File (Limited)
-                fmt_str = (f'bestvideo[height<={self.quality}]+bestaudio[language^=tr]/'
-                           f'bestvideo[height<={self.quality}]+bestaudio/'
-                           f'best[height<={self.quality}]')
-            
-            ydl_opts.update({
-                'format': fmt_str,
-                'merge_output_format': 'mp4',
-            })
-        
-        ydl_opts['sleep_interval'] = 1 # Wait 1s between requests
-        
-        # Flag to track if we are in fallback mode
-        fallback_mode = False
-        
-        get_logger().log(f"Starting download: {self.url} | Fmt: {self.fmt} | Playlist: {self.playlist_mode}")
+    def _run_with_retries(self, ydl_opts):
+        """
+        Runs passes until the job succeeds. Failures are classified by exception type
+        and retried with that class' backoff policy (Retry-After is honoured).
+        Only the failed phase is repeated: the extraction result is kept, finished
+        media files are skipped by yt-dlp (partial files resume) and failed
+        subtitles are fetched again in a subtitle-only pass.
+        """
+        attempts = {}
+        subtitles_pending = False
+        cookies_dropped = False
 
-        try:
-            self.log.emit(f"Analiz ediliyor: {self.url} ({self.fmt.upper()})")
-            
-            # Helper to run download
-            def perform_download(opts):
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    # 1. Extract Info
-                    info = ydl.extract_info(self.url, download=False)
-                    title = info.get('title', 'Unknown Title')
-                    
-                    if not fallback_mode:
-                        self.log.emit(f"Bulundu: {title}")
-                    else:
-                        self.log.emit(f"Güvenli Mod: {title}")
-
-                    # 2. Download
-                    if self.is_running:
-                        self.log.emit(f"İndiriliyor: {title}...")
-                        ydl.download([self.url])
-                    return title
-
-            # First Attempt: Normal
+        while True:
             try:
-                title = perform_download(ydl_opts)
-                self.finished.emit(str(title), self.url)
-                get_logger().log(f"Download finished: {title}")
-                
+                if subtitles_pending:
+                    self.on_log("Altyazılar tekrar indiriliyor...")
+                    self._perform_download(ydl_opts, subtitles_only=True)
+                    subtitles_pending = False
+                    ydl_opts['overwrites'] = False # Keep the subtitle files of the last pass
+
+                title = self._perform_download(ydl_opts)
+                get_host_pacer().record_success(self.host)
+                get_logger().log(f"Download finished: {title} (retries: {sum(attempts.values())})")
+                return title
+
             except Exception as e:
-                err_str = str(e).lower()
-                
-                # CASE 1: Subtitle Error (429 Too Many Requests)
-                if "429" in err_str and ("subtitle" in err_str or "caption" in err_str):
-                    # Check if we haven't already retried without subs
-                    # We can use a flag attribute on the function or similar, but let's just do a nested try
-                    
-                    self.log.emit("UYARI: Altyazı sunucusu yoğun (429). 2 saniye beklenip tekrar deneniyor...")
-                    QThread.sleep(2) # Sleep 2 seconds
-                    
-                    try:
-                         # Retry ONCE with same settings (maybe it was a blip)
-                         # Or maybe try to fetch ONLY auto subs?
-                         # Let's just retry exact same first.
-                         title = perform_download(ydl_opts)
-                         self.finished.emit(str(title), self.url)
-                         get_logger().log(f"Download finished (retry success): {title}")
-                         return # Exit
-                    except Exception as e2:
-                        # Second failure
-                        self.log.emit("UYARI: Altyazı indirilemedi. Video altyazısız indiriliyor...")
-                        
-                        # Disable subtitles
+                if not self.is_running:
+                    raise
+                error_class, retry_after = classify_error(e)
+                if error_class in (ERROR_RATE_LIMIT, ERROR_AUTH):
+                    get_host_pacer().record_throttle(self.host, retry_after)
+                phase = self._phase
+                policy = RETRY_POLICIES.get(error_class)
+                if error_class == ERROR_AUTH and 'cookiesfrombrowser' not in ydl_opts:
+                    policy = None # Nothing to refresh
+                attempt = attempts.get(error_class, 0) + 1
+
+                if policy is None or attempt > policy.max_retries:
+                    if phase == PHASE_SUBTITLES and _subtitles_requested(ydl_opts):
+                        # Subtitles are optional: give up on them and download the video
+                        self.on_log("UYARI: Altyazı indirilemedi. Video altyazısız indiriliyor...")
+                        self._report_retry(error_class, phase, attempt, 0.0, e)
                         ydl_opts['writesubtitles'] = False
                         ydl_opts['writeautomaticsub'] = False
-                        if 'subtitleslangs' in ydl_opts: del ydl_opts['subtitleslangs']
-                        
-                        # Retry without subs
-                        title = perform_download(ydl_opts)
-                        self.finished.emit(str(title), self.url)
-                        get_logger().log(f"Download finished (no subs): {title}")
-
-                # CASE 2: SSL / Certificate Errors
-                elif "ssl" in err_str or "certificate" in err_str or "cert" in err_str:
-                    fallback_mode = True
-                    self.log.emit("Güvenli bağlantı hatası, Ağ Toleransı Modu devreye giriyor...")
-                    
-                    # Enable No Check Certificate
+                        ydl_opts.pop('subtitleslangs', None)
+                        subtitles_pending = False
+                        continue
+                    if cookies_dropped:
+                        # If it fails even without cookies (e.g. valid private video), show error
+                        raise Exception(
+                            f"İndirme başarısız:\n{str(e)}\n\n"
+                            "Not: Çerez hatası tarayıcının açık olmasından kaynaklanabilir. Lütfen tarayıcıyı kapatıp tekrar deneyin."
+                        )
+                    raise
+
+                attempts[error_class] = attempt
+                delay = policy.delay(attempt, retry_after)
+
+                # Class specific recovery
+                if error_class == ERROR_SSL:
                     ydl_opts['nocheckcertificate'] = True
-                    
-                    # Retry
-                    title = perform_download(ydl_opts)
-                    self.finished.emit(str(title), self.url)
-                    get_logger().log(f"Download finished (fallback mode): {title}")
-
-                # CASE 3: Browser Cookie / DPAPI Error
-                # CASE 3: Browser Cookie / DPAPI Error
-                elif "dpapi" in err_str or "decrypt" in err_str or "cookie" in err_str:
-                     self.log.emit("UYARI: Tarayıcı çerezleri okunamadı (DPAPI/Kilitli).")
-                     self.log.emit("Çerez olmadan tekrar deneniyor...")
-                     
-                     # Disable cookies for retry
-                     if 'cookiesfrombrowser' in ydl_opts:
-                         del ydl_opts['cookiesfrombrowser']
-                     
-                     try:
-                         # Retry without cookies
-                         title = perform_download(ydl_opts)
-                         self.finished.emit(str(title), self.url)
-                         get_logger().log(f"Download finished (retry without cookies): {title}")
-                         return
-                     except Exception as e3:
-                         # If it fails even without cookies (e.g. valid private video), show error
-                         self.error.emit(
-                             f"İndirme başarısız:\n{str(e3)}\n\n"
-                             "Not: Çerez hatası tarayıcının açık olmasından kaynaklanabilir. Lütfen tarayıcıyı kapatıp tekrar deneyin."
-                         )
-                         return 
+                    self.on_log("Güvenli bağlantı hatası, Ağ Toleransı Modu devreye giriyor...")
+                elif error_class == ERROR_COOKIES:
+                    ydl_opts.pop('cookiesfrombrowser', None)
+                    cookies_dropped = True
+                    self.on_log("UYARI: Tarayıcı çerezleri okunamadı (DPAPI/Kilitli). Çerez olmadan tekrar deneniyor...")
+                elif error_class == ERROR_AUTH:
+                    get_cookie_cache().invalidate(ydl_opts['cookiesfrombrowser'])
+                    self.on_log("Oturum çerezleri yenileniyor...")
+                subtitles_pending = phase == PHASE_SUBTITLES
 
-                else:
-                    # Re-raise other errors
-                    raise e
-                    
-        except Exception as e:
-            get_logger().error(f"Download Error: {str(e)}")
-            # Avoid sending double error signals if we already handled specific cases
-            # We can check if is_running is false? No, let's just emit generic if not handled above.
-            # But the above 'except' catches e from perform_download.
-            # If we re-raise e, it comes here.
-            self.error.emit(str(e)) # Show actual error to user
-        finally:
-            self.is_running = False
+                self._report_retry(error_class, phase, attempt, delay, e)
+                self.on_log(f"{ERROR_LABELS[error_class]}: {delay:.0f} sn sonra tekrar denenecek ({attempt}/{policy.max_retries})")
+                if not wait_interruptible(delay, lambda: self.is_running):
+                    raise Exception("İndirme kullanıcı tarafından iptal edildi.")
 
+    def _direct_extension(self):
+        """Extension of a direct media link this job can save as is, else None."""
+        if self.playlist_mode or self.trim_opts.get('enabled') or self.sub_opts.get('enabled'):
+            return None
+        ext = direct_media_extension(self.url)
+        if ext == self.fmt or (self.fmt == 'mp4' and ext in DIRECT_VIDEO_EXTENSIONS):
+            return ext
+        return None
 
-    def _parse_time(self, time_str):
+    def _direct_download(self):
         """
-        Parses 'MM:SS' or 'HH:MM:SS' or 'SS' into seconds (float).
-        Returns None if parsing fails or empty.
+        Fast path for direct media links (https://.../file.mp4): no extraction,
+        the file is fetched in byte ranges over several connections.
+        Returns the title, None if the link has to go through yt-dlp.
         """
-        if not time_str:
+        ext = self._direct_extension()
+        if not ext:
             return None
-        
+        self._wait_for_host()
         try:
-            parts = [float(p) for p in time_str.split(':')]
-            if len(parts) == 1:
-                return parts[0]
-            elif len(parts) == 2: # MM:SS
-                return parts[0] * 60 + parts[1]
-            elif len(parts) == 3: # HH:MM:SS
-                return parts[0] * 3600 + parts[1] * 60 + parts[2]
-        except:
+            info = probe(self.url)
+        except Exception as e:
+            get_logger().log(f"Direct probe failed, using yt-dlp: {e}")
             return None
-        return None
+        if 'html' in info['content_type']:
+            return None # A page, not a file
+
+        title, ext = direct_filename(self.url, info, ext)
+        name = f"{self.playlist_index} - {title}.{ext}" if self.playlist_index else f"{title}.{ext}"
+        path = os.path.join(self.output_folder or os.getcwd(), name)
+        if info['size'] and os.path.isfile(path) and os.path.getsize(path) == info['size']:
+            self.output_path = path
+            self.on_log(f"Zaten indirilmiş, atlanıyor: {title}")
+            return title
+
+        self._phase = PHASE_DOWNLOAD
+        self.stream_files = [path]
+        self.on_log(f"İndiriliyor: {title}... (doğrudan bağlantı)")
+        # Throttled hosts get a single connection
+        connections = 1 if get_host_pacer().delay(self.host) else DEFAULT_CONNECTIONS
+        download = SegmentedDownload(
+            self.url, path, connections,
+            on_progress=self._direct_progress,
+            throttle=lambda nbytes: get_bandwidth_governor().acquire(self._bandwidth, nbytes, lambda: self.is_running),
+            should_continue=lambda: self.is_running,
+            probe_info=info
+        )
+        try:
+            size = download.run()
+        except DirectDownloadError as e:
+            if not self.is_running:
+                raise Exception("İndirme kullanıcı tarafından iptal edildi.") # Partial file is kept for resuming
+            # yt-dlp would resume from the preallocated .part: start it clean
+            remove_files(partial_files_for(path))
+            self.stream_files = []
+            get_logger().log(f"Direct download failed, using yt-dlp: {e}")
+            return None
+
+        self.output_path = path
+        self._flush_progress()
+        self.on_progress(ProgressEvent(PHASE_DOWNLOAD, 100.0, size, size))
+        get_host_pacer().record_success(self.host)
+        return title
+
+    def _direct_progress(self, downloaded, total, speed):
+        """Progress of the segmented downloader (called from its connection threads)."""
+        now = time.monotonic()
+        with self._progress_lock:
+            self._pending_progress = {
+                'downloaded_bytes': downloaded, 'total_bytes': total, 'speed': speed,
+                'eta': (total - downloaded) / speed if total and speed else None,
+            }
+            if now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+        self._flush_progress()
+
+    def _archived_entry(self):
+        if not self.archive_profile or self.playlist_mode:
+            return None
+        return get_download_archive().lookup(archive_id_for_url(self.url), self.archive_profile)
+
+    def _record_archive(self, title):
+        if not self.archive_profile or self.playlist_mode:
+            return
+        archive_id = archive_id_for_info(self._info) if self._info else archive_id_for_url(self.url)
+        if not self.output_path:
+            # Skipped by yt-dlp's own archive check (id was only known after extraction)
+            entry = get_download_archive().lookup(archive_id, self.archive_profile)
+            if entry:
+                self.output_path = entry['path']
+                self.on_log(f"Zaten indirilmiş, atlanıyor: {title}")
+            return
+        get_download_archive().add(archive_id, self.archive_profile, title, self.output_path)
+
+    def _wait_for_host(self):
+        """Waits for the host's next request slot (shared by all jobs)."""
+        if not get_host_pacer().wait(self.host, lambda: self.is_running):
+            raise Exception("İndirme kullanıcı tarafından iptal edildi.")
+
+    def _report_retry(self, error_class, phase, attempt, delay, error):
+        get_logger().log(f"Retry [{error_class}] phase={phase} attempt={attempt} delay={delay:.1f}s: {error}")
+        self.on_retry({
+            'error_class': error_class,
+            'phase': phase,
+            'attempt': attempt,
+            'delay': round(delay, 2),
+            'error': str(error).replace('\r', '')[:300],
+        })
 
     def stop(self):
         """Stops the download process."""
@@ -315,19 +587,202 @@ class DownloadWorker(QThread):
         if not self.is_running:
             raise Exception("İndirme kullanıcı tarafından iptal edildi.")
 
+        # Subtitle files go through the same hook, their info_dict has no video id
+        if 'id' not in d.get('info_dict', {}):
+            return
+
         if d['status'] == 'downloading':
-            try:
-                # Calculate percentage
-                p = d.get('_percent_str', '0%').replace('%','')
-                # Remove ANSI escape codes that might be present
-                p = ANSI_ESCAPE_PATTERN.sub('', p)
-                self.progress.emit(float(p))
-                
-                # Check speed
-                s = d.get('_speed_str', 'N/A')
-                self.log.emit(f"İndiriliyor... Hız: {s} - {p}%")
-            except Exception:
-                pass
+            self._phase = PHASE_DOWNLOAD
+            if d.get('fragment_count'):
+                self._fragment_count = d['fragment_count']
+            self._throttle(d)
+            
+            # Keep only the latest sample, report it at most every PROGRESS_INTERVAL
+            now = time.monotonic()
+            with self._progress_lock:
+                if d.get('filename') and d['filename'] not in self.stream_files:
+                    self.stream_files.append(d['filename'])
+                self._pending_progress = self._combined_progress(d)
+                if now - self._last_report < PROGRESS_INTERVAL:
+                    return
+                self._last_report = now
+            self._flush_progress()
         elif d['status'] == 'finished':
-            self.progress.emit(100)
-            self.log.emit("İndirme tamamlandı, işleniyor...")
+            with self._progress_lock:
+                combined = self._combined_progress(d)
+                # Another stream of the item is still downloading
+                downloading = any(s.get('status') == 'downloading' for s in self._streams.values())
+                self._pending_progress = combined if downloading else None
+            self.output_path = d.get('filename') or self.output_path
+            if self._fragment_count:
+                self._tune_fragments(d)
+            if downloading:
+                self._flush_progress()
+                return
+            size = combined.get('total_bytes') or combined.get('downloaded_bytes')
+            self.on_progress(ProgressEvent(PHASE_DOWNLOAD, 100.0, size, size))
+            self.on_log("İndirme tamamlandı, işleniyor...")
+
+    def _combined_progress(self, d):
+        """
+        Progress of the item (called under _progress_lock): the streams of a merge
+        (video + audio, downloading side by side) are reported as one download.
+        """
+        item = d['info_dict']['id']
+        if item != self._streams_item:
+            self._streams_item = item
+            self._streams = {}
+        self._streams[d.get('filename')] = d
+        if len(self._streams) == 1:
+            return d
+
+        samples = list(self._streams.values())
+        totals = [s.get('total_bytes') or s.get('total_bytes_estimate') for s in samples]
+        downloaded = sum(s.get('downloaded_bytes') or 0 for s in samples)
+        total = sum(totals) if all(totals) else None
+        speed = sum(s.get('speed') or 0 for s in samples if s.get('status') == 'downloading') or None
+        combined = {
+            'status': d['status'], 'filename': d.get('filename'),
+            'downloaded_bytes': downloaded, 'total_bytes': total, 'speed': speed,
+            'eta': (total - downloaded) / speed if total and speed else None,
+        }
+        if total is None and all(s.get('fragment_count') for s in samples):
+            # HLS / DASH streams without sizes: share of the fragments
+            combined['fragment_index'] = sum(s.get('fragment_index') or 0 for s in samples)
+            combined['fragment_count'] = sum(s['fragment_count'] for s in samples)
+        return combined
+
+    def _flush_progress(self):
+        """Reports the latest pending progress sample (if any)."""
+        with self._progress_lock:
+            d, self._pending_progress = self._pending_progress, None
+        if d is None:
+            return
+        
+        # Read the numbers directly (no parsing of yt-dlp's formatted strings)
+        downloaded = d.get('downloaded_bytes') or 0
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        if total:
+            percent = downloaded * 100.0 / total
+        elif d.get('fragment_count'):
+            percent = (d.get('fragment_index') or 0) * 100.0 / d['fragment_count']
+        else:
+            percent = 0.0
+        percent = min(max(percent, 0.0), 100.0)
+        
+        self.on_progress(ProgressEvent(
+            PHASE_DOWNLOAD, percent, downloaded, total,
+            speed=d.get('speed'), eta=d.get('eta'),
+            fragment_index=d.get('fragment_index'), fragment_count=d.get('fragment_count')
+        ))
+
+    def _throttle(self, d):
+        """Waits for the global bandwidth governor before the next block is received."""
+        if not self._bandwidth:
+            return
+        with self._bw_lock:
+            # Fragment threads report the shared total of their stream, parallel streams have their own
+            filename = d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            paid = self._bw_bytes.get(filename, 0)
+            if downloaded < paid:
+                paid = 0
+            delta = downloaded - paid
+            self._bw_bytes[filename] = downloaded
+        
+        if not get_bandwidth_governor().acquire(self._bandwidth, delta, lambda: self.is_running):
+            raise Exception("İndirme kullanıcı tarafından iptal edildi.")
+
+    def _tune_fragments(self, d):
+        """Reports a finished HLS/DASH stream to the tuner, the next stream (e.g. audio) uses the new value."""
+        level = get_fragment_tuner().record(
+            self.host, self._fragment_level,
+            d.get('total_bytes') or d.get('downloaded_bytes') or 0,
+            d.get('elapsed') or 0,
+            self._fragment_monitor.take_errors(),
+            self._fragment_count
+        )
+        self._fragment_count = 0
+        self._fragment_level = level
+        if self._ydl:
+            # Downloaders read this from the shared params dict for every stream
+            self._ydl.params['concurrent_fragment_downloads'] = level
+
+    def _postprocessor_hook(self, d):
+        if d.get('status') == 'started':
+            phase = PHASE_MERGE if d.get('postprocessor') == 'Merger' else PHASE_POSTPROCESS
+            self._phase = phase
+            path = d.get('info_dict', {}).get('filepath')
+            # Post-processing stage: share of the steps done, inline: step started
+            percent = self._pp_done * 100.0 / self._pp_steps if self._pp_steps else 100.0
+            self.on_progress(ProgressEvent(phase, min(percent, 100.0), filename=os.path.basename(path) if path else None,
+                                           fragment_index=self._pp_done + 1 if self._pp_steps else None,
+                                           fragment_count=self._pp_steps or None))
+        
+        # Track the final file path after merge / conversion
+        if d.get('status') == 'finished':
+            self._pp_done += 1
+            path = d.get('info_dict', {}).get('filepath')
+            if path:
+                self.output_path = path
+
+
+class DownloadWorker(QThread):
+    """
+    Worker thread that runs a DownloadTask.
+    Communicates with the UI via Signals.
+    """
+    progress = Signal(object)    # ProgressEvent
+    finished = Signal(str, str)  # Success message (Title, URL)
+    downloaded = Signal()        # Streams are down, post-processing continues in the post-processing pool
+    error = Signal(str)          # Error message
+    log = Signal(str)            # Status log messages
+    retry = Signal(dict)         # Retry record (error_class, phase, attempt, delay, error)
+
+    def __init__(self, url, fmt='mp4', quality='max', sub_opts=None, trim_opts=None, output_folder=None, playlist_mode=False, browser=None,
+                 playlist_index=None, defer_postprocess=False):
+        super().__init__()
+        self.url = url
+        self.task = DownloadTask(url, fmt, quality, sub_opts, trim_opts, output_folder, playlist_mode, browser, playlist_index,
+                                 defer_postprocess, on_progress=self.progress.emit, on_log=self.log.emit, on_retry=self.retry.emit)
+
+    @property
+    def output_path(self):
+        return self.task.output_path
+
+    @property
+    def stream_files(self):
+        return list(self.task.stream_files)
+
+    @property
+    def is_running(self):
+        return self.task.is_running
+
+    def run(self):
+        """
+        Main execution method for the thread.
+        """
+        try:
+            title = self.task.run()
+            if self.task.postprocess_pending:
+                # The thread ends here, ffmpeg runs in the post-processing pool
+                self.task.wait_postprocess()
+                self.downloaded.emit()
+                get_postprocess_pool().submit(self._post_process)
+                return
+            self.finished.emit(str(title), self.url)
+        except Exception as e:
+            get_logger().error(f"Download Error: {str(e)}")
+            self.error.emit(str(e)) # Show actual error to user
+
+    def _post_process(self):
+        try:
+            title = self.task.finish_postprocess()
+            self.finished.emit(str(title), self.url)
+        except Exception as e:
+            get_logger().error(f"Post-processing Error: {str(e)}")
+            self.error.emit(str(e))
+
+    def stop(self):
+        """Stops the download process."""
+        self.task.stop()
@@ -0,0 +1,141 @@
+import threading
+from src.core.logger import get_logger
+
+# Fragment concurrency limits (yt-dlp 'concurrent_fragment_downloads')
+START_FRAGMENTS = 2
+MIN_FRAGMENTS = 1
+DEFAULT_HOST_CAP = 6
+
+# Per-host caps: sites that tolerate (or punish) many parallel connections
+HOST_CAPS = {
+    'youtube.com': 8,
+    'youtu.be': 8,
+    'twitch.tv': 8,
+    'vimeo.com': 6,
+    'dailymotion.com': 4,
+    'twitter.com': 4,
+    'x.com': 4,
+}
+
+# Tuning
+MIN_SAMPLE_BYTES = 2 * 1024 * 1024  # Smaller streams say nothing about throughput
+MIN_SAMPLE_SECONDS = 1.0
+ERROR_RATE_LIMIT = 0.05             # More failed fragments than this -> halve concurrency
+GAIN_THRESHOLD = 1.10               # A step up must bring at least +10% throughput
+PROBE_AFTER = 8                     # Samples before probing above a plateau again
+EWMA_WEIGHT = 0.5
+
+
+class _HostState:
+    def __init__(self, level):
+        self.level = level
+        self.throughput = {}   # level -> smoothed bytes/sec
+        self.ceiling = None    # Level that did not pay off (not probed until PROBE_AFTER samples)
+        self.samples = 0
+
+
+class FragmentTuner:
+    """
+    Chooses the fragment concurrency for HLS/DASH downloads per host.
+    Starts small, steps up while throughput keeps improving, steps back on a
+    plateau and halves on fragment errors (additive increase / multiplicative decrease).
+    One instance is shared by all jobs of the session.
+    """
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host_cap(self, host):
+        for domain, cap in HOST_CAPS.items():
+            if host == domain or host.endswith('.' + domain):
+                return cap
+        return DEFAULT_HOST_CAP
+
+    def recommend(self, host):
+        """Fragment concurrency to use for the next stream from this host."""
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.level if state else min(START_FRAGMENTS, self.host_cap(host))
+
+    def record(self, host, level, downloaded_bytes, elapsed, errors=0, fragments=0):
+        """
+        Feeds the result of one fragmented stream and returns the new level.
+        level: concurrency the stream was downloaded with.
+        """
+        with self._lock:
+            cap = self.host_cap(host)
+            state = self._hosts.setdefault(host, _HostState(min(START_FRAGMENTS, cap)))
+            error_rate = errors / fragments if fragments else 0.0
+
+            if error_rate > ERROR_RATE_LIMIT:
+                new_level = max(MIN_FRAGMENTS, level // 2)
+                state.ceiling = level
+                state.samples = 0
+                reason = "errors"
+            elif downloaded_bytes < MIN_SAMPLE_BYTES or elapsed < MIN_SAMPLE_SECONDS:
+                return state.level # Too small to judge
+            else:
+                speed = downloaded_bytes / elapsed
+                old = state.throughput.get(level)
+                state.throughput[level] = speed if old is None else old * (1 - EWMA_WEIGHT) + speed * EWMA_WEIGHT
+                state.samples += 1
+                if state.ceiling and state.samples >= PROBE_AFTER:
+                    state.ceiling = None # Network conditions change, probe again
+
+                lower = state.throughput.get(level - 1)
+                if lower is not None and state.throughput[level] < lower * GAIN_THRESHOLD:
+                    # Plateau: the extra connection did not pay off
+                    new_level = max(MIN_FRAGMENTS, level - 1)
+                    state.ceiling = level
+                    state.samples = 0
+                    reason = "plateau"
+                elif state.ceiling is None or level + 1 < state.ceiling:
+                    new_level = min(cap, level + 1)
+                    reason = "scaling"
+                else:
+                    new_level = level
+                    reason = "stable"
+
+            state.level = new_level
+            speed = downloaded_bytes / elapsed if elapsed else 0
+            get_logger().log(
+                f"Fragment concurrency [{host}]: {level} -> {new_level} ({reason}) | "
+                f"{speed / 1024 / 1024:.2f} MB/s | errors {errors}/{fragments}"
+            )
+            return new_level
+
+
+class FragmentMonitor:
+    """
+    yt-dlp 'logger' of a single job: counts fragment retries / skips
+    (yt-dlp reports them only as screen messages) and forwards errors to our log.
+    """
+    def __init__(self):
+        self.errors = 0
+
+    def debug(self, msg):
+        if msg.startswith('[download] Got error') or 'Skipping fragment' in msg:
+            self.errors += 1
+
+    def info(self, msg):
+        pass
+
+    def warning(self, msg):
+        get_logger().debug(f"yt-dlp: {msg}")
+
+    def error(self, msg):
+        get_logger().error(f"yt-dlp: {msg}")
+
+    def take_errors(self):
+        errors, self.errors = self.errors, 0
+        return errors
+
+
+# Global Access
+_tuner = None
+
+def get_fragment_tuner():
+    global _tuner
+    if _tuner is None:
+        _tuner = FragmentTuner()
+    return _tuner
@@ -1,166 +1,254 @@
 import os
 import sys
 import subprocess
+import time
 import traceback
 from PySide6.QtCore import QThread, Signal
 from src.core.logger import get_logger
+from src.core.bandwidth import get_bandwidth_governor
+from src.core.cookie_jar import get_cookie_cache
+from src.core.host_pacer import get_host_pacer
+from src.core.download_archive import get_download_archive
+from src.utils import get_host
+from src.core.progress import ProgressEvent, PHASE_EXTRACT, PHASE_DOWNLOAD, PHASE_POSTPROCESS
 
-class GalleryWorker(QThread):
+
+class GalleryError(Exception):
+    """gallery-dl finished with an error code."""
+
+
+def build_gallery_command(url, options=None, on_log=None):
     """
-    Worker for downloading image galleries using gallery-dl via Subprocess (CLI).
+    Builds the gallery-dl command line for a job.
+    Shared by the UI worker and the headless CLI.
     """
-    progress = Signal(str)      # Progress messages
-    finished = Signal(str)      # Completion message
-    error = Signal(str)         # Error message
-    log = Signal(str)           # detailed logs
+    options = options if options else {}
+    on_log = on_log or (lambda msg: None)
 
-    def __init__(self, url, options=None):
-        super().__init__()
+    # Priority: Local gallery-dl.exe -> System gallery-dl
+    gdl_path = os.path.join(os.getcwd(), 'gallery-dl.exe')
+    if os.path.exists(gdl_path):
+        cmd = [gdl_path]
+    # Fallback to python module if exe not found
+    # We use '-u' for unbuffered output to update UI real-time
+    else:
+         # Check if we are running in a PyInstaller bundle
+         if getattr(sys, 'frozen', False):
+             # In PyInstaller, sys.executable is the app itself. We need system Python.
+             # However, a standalone app shouldn't rely on system python. 
+             # But if we must fallback, let's try 'python' from PATH.
+             python_exe = "python"
+         else:
+             python_exe = sys.executable
+             
+         cmd = [python_exe, "-u", "-m", "gallery_dl"]
+         on_log("⚠️ gallery-dl.exe bulunamadı, Python modülü kullanılıyor.")
+    
+    on_log(f"⚙️ Motor: {cmd[0]}")
+    
+    # Destination (Base Folder)
+    dest_dir = options.get('download_folder')
+    if dest_dir:
+        cmd.extend(["--destination", dest_dir]) # -d
+    
+    # Directory Structure: "Instagram_Username"
+    # We use --filename to force specific subfolder structure relative to destination
+    # format: {category}_{username}/{filename}.{extension}
+    cmd.extend(["--filename", "{category}_{username}/{filename}.{extension}"])
+    
+    # Browser cookies (session cache export, see GalleryTask.run)
+    if options.get('cookies_file'):
+        cmd.extend(["--cookies", options['cookies_file']])
+
+    # Bandwidth share (bytes/sec, from the global governor)
+    if options.get('limit_rate'):
+        cmd.extend(["--limit-rate", f"{max(1, options['limit_rate'] // 1024)}k"])
+        on_log(f"🚦 Hız sınırı: {options['limit_rate'] // 1024} KB/s")
+
+    # Shared download archive: files recorded there are skipped
+    if options.get('archive_file'):
+        cmd.extend(["--download-archive", options['archive_file']])
+
+    # Request spacing for throttled hosts (per-host pacer)
+    if options.get('sleep_request'):
+        cmd.extend(["--sleep-request", f"{options['sleep_request']:.1f}"])
+        on_log(f"⏳ İstek aralığı: {options['sleep_request']:.1f} sn")
+
+    # Range
+    if 'range' in options:
+        r = options['range']
+        # Use --range=R format to avoid negative numbers being interpreted as flags
+        cmd.append(f"--range={r}")
+        on_log(f"📥 Aralık: {r}")
+
+    # Filter (Date, Type)
+    # Combine filters if multiple
+    filter_parts = []
+    
+    # Date
+    if 'date_after' in options:
+        try:
+            y, m, d = options['date_after'].split('-')
+            # proper python expr for gallery-dl filter
+            filter_parts.append(f"date >= datetime({int(y)}, {int(m)}, {int(d)})")
+        except:
+            pass
+    
+    # Type
+    if 'filter_type' in options:
+        ft = options['filter_type']
+        filter_parts.append(f"type == '{ft}'")
+        
+    if filter_parts:
+        full_filter = " and ".join([f"({p})" for p in filter_parts])
+        cmd.extend(["--filter", full_filter])
+        on_log(f"🔧 Filtre: {full_filter}")
+
+    # URL always last (convention)
+    cmd.append(url)
+    return cmd
+
+
+class GalleryTask:
+    """
+    Runs gallery-dl via Subprocess (CLI) for a single gallery URL.
+    Qt-free (reports through plain callbacks), so it is shared by the
+    GalleryWorker thread and the headless CLI.
+    """
+    def __init__(self, url, options=None, on_log=None, on_progress=None):
         self.url = url
         self.options = options if options else {}
         self.process = None
         self.is_running = True
+        self.on_log = on_log or (lambda msg: None)
+        self.on_progress = on_progress or (lambda event: None) # ProgressEvent
 
     def run(self):
+        """
+        Runs gallery-dl. Returns a completion message, raises GalleryError
+        for failing exit codes (other exceptions are engine errors).
+        """
+        self.on_log("🔍 Galeri motoru başlatılıyor (CLI Modu)...")
+        self.on_progress(ProgressEvent(PHASE_EXTRACT))
+        
+        # 1. Prepare Command
+        # gallery-dl can't be throttled from outside: it gets a fixed fair share of the limit
+        governor = get_bandwidth_governor()
+        consumer = governor.register(self.url)
+        cookies_file = self._export_cookies()
         try:
-            self.log.emit("🔍 Galeri motoru başlatılıyor (CLI Modu)...")
-            
-            # 1. Prepare Command
-            # Priority: Local gallery-dl.exe -> System gallery-dl
-            
-            gdl_path = os.path.join(os.getcwd(), 'gallery-dl.exe')
-            if os.path.exists(gdl_path):
-                cmd = [gdl_path]
-            # Fallback to python module if exe not found
-            # We use '-u' for unbuffered output to update UI real-time
-            else:
-                 # Check if we are running in a PyInstaller bundle
-                 if getattr(sys, 'frozen', False):
-                     # In PyInstaller, sys.executable is the app itself. We need system Python.
-                     # However, a standalone app shouldn't rely on system python. 
-                     # But if we must fallback, let's try 'python' from PATH.
-                     python_exe = "python"
-                 else:
-                     python_exe = sys.executable
-                     
-                 cmd = [python_exe, "-u", "-m", "gallery_dl"]
-                 self.log.emit("⚠️ gallery-dl.exe bulunamadı, Python modülü kullanılıyor.")
-            
-            self.log.emit(f"⚙️ Motor: {cmd[0]}")
-            
-            # Destination (Base Folder)
-            dest_dir = self.options.get('download_folder')
-            if dest_dir:
-                cmd.extend(["--destination", dest_dir]) # -d
-            
-            # Directory Structure: "Instagram_Username"
-            # We use --filename to force specific subfolder structure relative to destination
-            # format: {category}_{username}/{filename}.{extension}
-            cmd.extend(["--filename", "{category}_{username}/{filename}.{extension}"])
-            
-            # Range
-            if 'range' in self.options:
-                r = self.options['range']
-                # Use --range=R format to avoid negative numbers being interpreted as flags
-                cmd.append(f"--range={r}")
-                self.log.emit(f"📥 Aralık: {r}")
-
-            # Filter (Date, Type)
-            # Combine filters if multiple
-            filter_parts = []
-            
-            # Date
-            if 'date_after' in self.options:
-                try:
-                    y, m, d = self.options['date_after'].split('-')
-                    # proper python expr for gallery-dl filter
-                    filter_parts.append(f"date >= datetime({int(y)}, {int(m)}, {int(d)})")
-                except:
-                    pass
-            
-            # Type
-            if 'filter_type' in self.options:
-                ft = self.options['filter_type']
-                filter_parts.append(f"type == '{ft}'")
-                
-            if filter_parts:
-                full_filter = " and ".join([f"({p})" for p in filter_parts])
-                cmd.extend(["--filter", full_filter])
-                self.log.emit(f"🔧 Filtre: {full_filter}")
-
-            # URL always last (convention)
-            cmd.append(self.url)
-
-            # Log command for debug
-            # self.log.emit(f"CMD: {' '.join(cmd)}")
-
-            # 2. Execute Subprocess
-            # Hide window on Windows
+            host = get_host(self.url)
+            if not get_host_pacer().wait(host, lambda: self.is_running):
+                return "İşlem durduruldu veya iptal edildi."
+            options = dict(self.options, limit_rate=governor.reserve_share(consumer), cookies_file=cookies_file,
+                           sleep_request=get_host_pacer().delay(host), archive_file=get_download_archive().path)
+            cmd = build_gallery_command(self.url, options, self.on_log)
+            return self._execute(cmd)
+        finally:
+            governor.unregister(consumer)
+            if cookies_file and os.path.exists(cookies_file):
+                os.remove(cookies_file)
+
+    def _export_cookies(self):
+        """Browser cookies from the session cache as a temporary cookie file (None if disabled or unreadable)."""
+        browser = self.options.get('browser')
+        if not browser or browser == 'disabled':
+            return None
+        try:
+            path = get_cookie_cache().export(browser)
+            self.on_log(f"🍪 Tarayıcı çerezleri kullanılıyor: {browser}")
+            return path
+        except Exception as e:
+            get_logger().error(f"Gallery cookies skipped: {e}")
+            self.on_log("⚠️ Tarayıcı çerezleri okunamadı, çerezsiz devam ediliyor.")
+            return None
+
+    def _execute(self, cmd):
+        """Runs the gallery-dl process and streams its output."""
+        dest_dir = self.options.get('download_folder')
+
+        # Log command for debug
+        # self.on_log(f"CMD: {' '.join(cmd)}")
+
+        # 2. Execute Subprocess
+        # Hide window on Windows
+        startupinfo = None
+        creationflags = 0
+        if os.name == 'nt':
             startupinfo = subprocess.STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+            creationflags = 0x08000000 # CREATE_NO_WINDOW
+        
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, # Merge stderr to stdout
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            startupinfo=startupinfo,
+            creationflags=creationflags
+        )
+        
+        # 3. Read Output Real-time
+        # gallery-dl prints the path of every downloaded file: count files and bytes
+        started = time.monotonic()
+        file_count = 0
+        total_bytes = 0
+        while True:
+            line = self.process.stdout.readline()
+            if not line and self.process.poll() is not None:
+                break
             
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT, # Merge stderr to stdout
-                text=True,
-                encoding='utf-8',
-                errors='replace',
-                startupinfo=startupinfo,
-                creationflags=0x08000000 # CREATE_NO_WINDOW
-            )
-            
-            # 3. Read Output Real-time
-            while True:
-                line = self.process.stdout.readline()
-                if not line and self.process.poll() is not None:
-                    break
-                
+            if line:
+                line = line.strip()
                 if line:
-                    line = line.strip()
-                    if line:
-                        # Log everything to file via logger
-                        get_logger().info(f"GDL: {line}")
-                        
-                        # UI Feedback
-                        if line.startswith('#'):
-                            self.log.emit(f"ℹ️ {line}")
-                        elif "http" in line and "//" in line:
-                             pass # Skip raw URLs
-                        else:
-                             # Show filename or status
-                             # If line is a path, show only filename
-                             if "\\" in line or "/" in line:
-                                 fname = os.path.basename(line)
-                                 self.log.emit(f"⬇️ {fname}")
-                             else:
-                                 self.log.emit(line)
-
-            # 4. Finish
-            ret_code = self.process.poll()
-            
-            if ret_code == 0:
-                self.log.emit("✅ İndirme tamamlandı. Dönüştürme kontrol ediliyor...")
-                if dest_dir:
-                    self._convert_images(dest_dir)
-                self.finished.emit("İşlem başarıyla tamamlandı.")
-            else:
-                # If killed (-9 or 1), it might be user stop
-                if ret_code == 1 or ret_code == -9:
-                     self.finished.emit("İşlem durduruldu veya iptal edildi.")
-                else:
-                     self.error.emit(f"İşlem hata koduyla bitti: {ret_code}")
+                    # Log everything to file via logger
+                    get_logger().info(f"GDL: {line}")
+                    
+                    # UI Feedback
+                    if line.startswith('#'):
+                        self.on_log(f"ℹ️ {line}")
+                    elif "http" in line and "//" in line:
+                         pass # Skip raw URLs
+                    else:
+                         # Show filename or status
+                         # If line is a path, show only filename
+                         if "\\" in line or "/" in line:
+                             file_count += 1
+                             try:
+                                 total_bytes += os.path.getsize(line)
+                             except OSError:
+                                 pass
+                             elapsed = time.monotonic() - started
+                             self.on_progress(ProgressEvent(
+                                 PHASE_DOWNLOAD, 0.0, total_bytes,
+                                 speed=total_bytes / elapsed if elapsed > 0 else None,
+                                 fragment_index=file_count, filename=os.path.basename(line)
+                             ))
+                         else:
+                             self.on_log(line)
 
-        except Exception as e:
-            get_logger().error(f"Gallery Worker Error:\n{traceback.format_exc()}")
-            self.error.emit(f"Motor Hatası: {str(e)}")
+        # 4. Finish
+        ret_code = self.process.poll()
+        
+        if ret_code == 0:
+            self.on_log("✅ İndirme tamamlandı. Dönüştürme kontrol ediliyor...")
+            if dest_dir:
+                self._convert_images(dest_dir)
+            return "İşlem başarıyla tamamlandı."
+        
+        # If killed (-9 or 1), it might be user stop
+        if ret_code == 1 or ret_code == -9:
+             return "İşlem durduruldu veya iptal edildi."
+        raise GalleryError(f"İşlem hata koduyla bitti: {ret_code}")
 
     def stop(self):
         """Force kill the process."""
         self.is_running = False
         if self.process:
             try:
-                self.log.emit("🛑 İşlem durduruluyor...")
+                self.on_log("🛑 İşlem durduruluyor...")
                 self.process.kill()
             except:
                 pass
@@ -176,12 +264,14 @@ class GalleryWorker(QThread):
                 subprocess.run(['ffmpeg', '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
                 ffmpeg_path = 'ffmpeg'
             except (subprocess.CalledProcessError, FileNotFoundError):
-                self.log.emit("⚠️ FFmpeg bulunamadı, dönüştürme atlanıyor.")
+                self.on_log("⚠️ FFmpeg bulunamadı, dönüştürme atlanıyor.")
                 return
 
-        self.log.emit("⚙️ WebP dosyaları JPG formatına dönüştürülüyor...")
+        self.on_log("⚙️ WebP dosyaları JPG formatına dönüştürülüyor...")
+        self.on_progress(ProgressEvent(PHASE_POSTPROCESS, 100.0))
         
         count = 0
+        creationflags = 0x08000000 if os.name == 'nt' else 0
 
         for root, dirs, files in os.walk(root_dir):
             for file in files:
@@ -200,7 +290,7 @@ class GalleryWorker(QThread):
                             jpg_path
                         ]
                         
-                        subprocess.run(cmd, check=True, creationflags=0x08000000)
+                        subprocess.run(cmd, check=True, creationflags=creationflags)
                         
                         # Delete original
                         os.remove(webp_path)
@@ -210,4 +300,37 @@ class GalleryWorker(QThread):
                         pass
         
         if count > 0:
-             self.log.emit(f"✅ {count} görsel JPG formatına dönüştürüldü.")
+             self.on_log(f"✅ {count} görsel JPG formatına dönüştürüldü.")
+
+
+class GalleryWorker(QThread):
+    """
+    Worker for downloading image galleries using gallery-dl via Subprocess (CLI).
+    """
+    progress = Signal(object)   # ProgressEvent
+    finished = Signal(str)      # Completion message
+    error = Signal(str)         # Error message
+    log = Signal(str)           # detailed logs
+
+    def __init__(self, url, options=None):
+        super().__init__()
+        self.url = url
+        self.options = options if options else {}
+        self.task = GalleryTask(url, self.options, on_log=self.log.emit, on_progress=self.progress.emit)
+
+    @property
+    def is_running(self):
+        return self.task.is_running
+
+    def run(self):
+        try:
+            self.finished.emit(self.task.run())
+        except GalleryError as e:
+            self.error.emit(str(e))
+        except Exception as e:
+            get_logger().error(f"Gallery Worker Error:\n{traceback.format_exc()}")
+            self.error.emit(f"Motor Hatası: {str(e)}")
+
+    def stop(self):
+        """Force kill the process."""
+        self.task.stop()
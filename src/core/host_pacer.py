@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from src.settings_manager import get_app_data_dir
+from src.core.logger import get_logger
+from src.core.retry import wait_interruptible
+
+# Request spacing per host (seconds between job requests)
+MIN_DELAY = 0.05          # Below this the host is not paced at all
+THROTTLE_DELAY = 1.0      # Spacing after the first 429/403 of a healthy host
+MAX_DELAY = 30.0
+
+# Tuning
+BACKOFF_FACTOR = 2.0      # Multiplicative increase on 429/403
+RECOVERY_FACTOR = 0.7     # Multiplicative decrease per healthy pass
+ERROR_EWMA_WEIGHT = 0.3
+ERROR_RATE_HOLD = 0.15    # No recovery while the smoothed throttle rate is above this
+IDLE_HALF_LIFE = 3600     # Stored delays halve per hour without traffic
+SAVE_INTERVAL = 5.0       # Min seconds between writes of the state file
+
+
+class _HostPace:
+    def __init__(self, delay=0.0, error_rate=0.0, updated=None):
+        self.delay = delay
+        self.error_rate = error_rate  # Smoothed share of passes that were throttled
+        self.updated = updated or time.time()
+        self.next_slot = 0.0          # Monotonic time the next request may start
+
+
+class HostPacer:
+    """
+    Spaces requests to a host across all jobs of the session.
+    Healthy hosts are not delayed at all; a 429/403 starts spacing requests and
+    repeated throttling doubles the spacing, which then shrinks again while
+    responses stay healthy (multiplicative increase / decrease).
+    The state is kept in AppData/Orbit/host_pacing.json between sessions.
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_app_data_dir(), "host_pacing.json")
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+
+    def delay(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            return state.delay if state else 0.0
+
+    def wait(self, host, should_continue=None):
+        """
+        Blocks until this host's next request slot. Concurrent jobs get
+        consecutive slots, so the spacing holds for the host as a whole.
+        Returns False if should_continue() turned False while waiting.
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state.delay < MIN_DELAY:
+                return True
+            now = time.monotonic()
+            slot = max(now, state.next_slot)
+            state.next_slot = slot + state.delay
+            wait = slot - now
+        if wait <= 0:
+            return True
+        return wait_interruptible(wait, should_continue or (lambda: True))
+
+    def record_success(self, host):
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                return
+            state.error_rate *= (1 - ERROR_EWMA_WEIGHT)
+            if state.error_rate < ERROR_RATE_HOLD and state.delay:
+                old = state.delay
+                state.delay = state.delay * RECOVERY_FACTOR
+                if state.delay < MIN_DELAY:
+                    state.delay = 0.0
+                self._changed(host, state, old, "healthy")
+
+    def record_throttle(self, host, retry_after=None):
+        """A 429/403 from this host (retry_after: server's Retry-After, if any)."""
+        with self._lock:
+            state = self._hosts.setdefault(host, _HostPace())
+            state.error_rate = state.error_rate * (1 - ERROR_EWMA_WEIGHT) + ERROR_EWMA_WEIGHT
+            old = state.delay
+            state.delay = min(MAX_DELAY, max(state.delay * BACKOFF_FACTOR, THROTTLE_DELAY, retry_after or 0.0))
+            self._changed(host, state, old, "throttled")
+
+    def _changed(self, host, state, old, reason):
+        state.updated = time.time()
+        self._dirty = True
+        get_logger().log(
+            f"Host pacing [{host}]: {old:.2f}s -> {state.delay:.2f}s ({reason}) | throttle rate {state.error_rate:.2f}"
+        )
+        if time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self._save_locked()
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
+
+    def _save_locked(self):
+        data = {
+            host: {'delay': round(s.delay, 3), 'error_rate': round(s.error_rate, 3), 'updated': s.updated}
+            for host, s in self._hosts.items() if s.delay or s.error_rate >= 0.01
+        }
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._last_save = time.monotonic()
+        except OSError as e:
+            get_logger().error(f"Host pacing state could not be saved: {e}")
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for host, item in data.items():
+            try:
+                updated = float(item.get('updated', now))
+                # Throttling fades while we don't talk to the host
+                decay = 0.5 ** (max(0.0, now - updated) / IDLE_HALF_LIFE)
+                delay = min(MAX_DELAY, float(item.get('delay', 0.0)) * decay)
+                self._hosts[host] = _HostPace(
+                    delay if delay >= MIN_DELAY else 0.0,
+                    float(item.get('error_rate', 0.0)) * decay,
+                    updated
+                )
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+
+# Global Access
+_pacer = None
+_pacer_lock = threading.Lock()
+
+def get_host_pacer():
+    global _pacer
+    with _pacer_lock:
+        if _pacer is None:
+            _pacer = HostPacer()
+        return _pacer
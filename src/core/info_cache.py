@@ -0,0 +1,185 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse, parse_qs
+from src.settings_manager import get_app_data_dir
+from src.core.logger import get_logger
+from src.core.url_router import route_url
+
+# Defaults
+DEFAULT_TTL = 6 * 3600              # Seconds an entry lives without signed URLs
+MAX_CACHE_BYTES = 64 * 1024 * 1024  # Compressed size limit (LRU eviction above this)
+EXPIRY_MARGIN = 10 * 60             # Drop entries this long before stream URLs expire
+
+# YouTube style signed URLs: ...&expire=1700000000&... or .../expire/1700000000/...
+EXPIRE_PATH_PATTERN = re.compile(r'/expire/(\d+)')
+
+
+def cache_key_for_url(url):
+    """
+    Maps a URL to "<ExtractorKey>:<video id>" without any network request.
+    Returns None if the id can't be derived from the URL alone.
+    """
+    route = route_url(url)
+    if not route.video_id:
+        return None
+    return f"{route.extractor}:{route.video_id}"
+
+
+def cache_key_for_info(info):
+    extractor = info.get('extractor_key') or info.get('ie_key')
+    video_id = info.get('id')
+    if extractor and video_id:
+        return f"{extractor}:{video_id}"
+    return None
+
+
+def _url_expiry(url):
+    """Returns the unix time a signed URL stops working (or None)."""
+    if not url:
+        return None
+    try:
+        query = parse_qs(urlparse(url).query)
+        if 'expire' in query:
+            return int(query['expire'][0])
+        match = EXPIRE_PATH_PATTERN.search(url)
+        if match:
+            return int(match.group(1))
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def info_expiry(info, default_ttl=DEFAULT_TTL):
+    """Earliest expiry of the stream URLs in an info dict, capped by default_ttl."""
+    expires_at = time.time() + default_ttl
+    urls = [info.get('url')]
+    for f in info.get('formats') or []:
+        urls.append(f.get('url'))
+        urls.append(f.get('manifest_url'))
+    for url in urls:
+        expiry = _url_expiry(url)
+        if expiry:
+            expires_at = min(expires_at, expiry - EXPIRY_MARGIN)
+    return expires_at
+
+
+class InfoCache:
+    """
+    On-disk cache of sanitized yt-dlp extraction results (AppData/Orbit/info_cache.db).
+    - Keyed by canonical video id ("Youtube:dQw4w9WgXcQ")
+    - Entries expire with their signed stream URLs
+    - Size-bounded, least recently used entries are evicted first
+    """
+    def __init__(self, db_path=None, max_bytes=MAX_CACHE_BYTES, default_ttl=DEFAULT_TTL):
+        self.db_path = db_path or os.path.join(get_app_data_dir(), "info_cache.db")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS info (
+                    key TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_info_access ON info(last_access)")
+
+    def get(self, key):
+        """Returns a cached info dict or None (expired entries count as a miss)."""
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT data, expires_at FROM info WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > now:
+                with self.conn:
+                    self.conn.execute("UPDATE info SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+            else:
+                if row:
+                    with self.conn:
+                        self.conn.execute("DELETE FROM info WHERE key = ?", (key,))
+                self.misses += 1
+                row = None
+        
+        get_logger().debug(f"Info cache {'hit' if row else 'miss'}: {key} ({self.hits} hit / {self.misses} miss)")
+        if not row:
+            return None
+        try:
+            return json.loads(zlib.decompress(row[0]))
+        except Exception:
+            return None
+
+    def put(self, key, info):
+        """Stores a sanitized copy of a single video info dict."""
+        if not key or not info:
+            return
+        expires_at = info_expiry(info, self.default_ttl)
+        now = time.time()
+        if expires_at <= now:
+            return
+
+        try:
+            import yt_dlp
+            clean = yt_dlp.YoutubeDL.sanitize_info(info)
+            # Never keep session cookies on disk
+            for f in clean.get('formats') or []:
+                f.pop('cookies', None)
+            clean.pop('cookies', None)
+            blob = zlib.compress(json.dumps(clean, ensure_ascii=False).encode('utf-8'))
+        except Exception as e:
+            get_logger().debug(f"Info cache skip ({key}): {e}")
+            return
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO info (key, data, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), expires_at, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        # 1. Expired entries
+        self.conn.execute("DELETE FROM info WHERE expires_at <= ?", (now,))
+        # 2. Least recently used until under the size limit
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM info").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.conn.execute("SELECT key, size FROM info ORDER BY last_access").fetchall():
+            self.conn.execute("DELETE FROM info WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM info").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM info")
+
+
+_info_cache = None
+_info_cache_lock = threading.Lock()
+
+# Global Access
+def get_info_cache():
+    global _info_cache
+    with _info_cache_lock:
+        if _info_cache is None:
+            _info_cache = InfoCache()
+        return _info_cache
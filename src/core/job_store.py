@@ -0,0 +1,241 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from src.settings_manager import get_app_data_dir
+
+# Job states that still have work left (resumed on next start)
+# 'waiting': playlist parent whose entries are still downloading
+UNFINISHED_STATES = ('queued', 'running', 'waiting')
+
+# 'paused': cancelled by the user with its partial files kept (resumed on request)
+PAUSED_STATE = 'paused'
+
+# Retry history kept per job (newest records)
+MAX_RETRY_RECORDS = 20
+
+
+class JobStore:
+    """
+    Crash-safe download queue stored in SQLite (AppData/Orbit/queue.db).
+    Every state change is committed immediately, so an interrupted batch
+    (crash, close, shutdown) can be resumed on the next start.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_app_data_dir(), "queue.db")
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL,
+                    kind TEXT NOT NULL DEFAULT 'video',
+                    options TEXT NOT NULL DEFAULT '{}',
+                    state TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    output_path TEXT,
+                    title TEXT,
+                    error TEXT,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    parent_id INTEGER,
+                    retries TEXT,
+                    partials TEXT
+                )
+            """)
+            # Older databases were created without parent_id (playlist children)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]
+            if 'parent_id' not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN parent_id INTEGER")
+            # ...and without the retry history
+            if 'retries' not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN retries TEXT")
+            # ...and without the partial files of paused jobs
+            if 'partials' not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN partials TEXT")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_parent ON jobs(parent_id)")
+
+    def _now(self):
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _to_dict(self, row):
+        job = dict(row)
+        try:
+            job['options'] = json.loads(job['options'])
+        except (TypeError, ValueError):
+            job['options'] = {}
+        try:
+            job['retries'] = json.loads(job.get('retries') or '[]')
+        except ValueError:
+            job['retries'] = []
+        try:
+            job['partials'] = json.loads(job.get('partials') or '[]')
+        except ValueError:
+            job['partials'] = []
+        return job
+
+    def add_job(self, url, kind='video', options=None, parent_id=None):
+        now = self._now()
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO jobs (url, kind, options, state, created_at, updated_at, parent_id) VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (url, kind, json.dumps(options or {}, ensure_ascii=False), now, now, parent_id)
+            )
+            return cur.lastrowid
+
+    def update(self, job_id, **fields):
+        """Updates the given columns (state, attempts, output_path, title, error...)."""
+        if not fields:
+            return
+        if 'options' in fields:
+            fields['options'] = json.dumps(fields['options'], ensure_ascii=False)
+        if fields.get('partials') is not None:
+            fields['partials'] = json.dumps(fields['partials'], ensure_ascii=False)
+        fields['updated_at'] = self._now()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def increment_attempts(self, job_id):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE jobs SET attempts = attempts + 1, updated_at = ? WHERE id = ?", (self._now(), job_id))
+
+    def record_retry(self, job_id, info):
+        """Appends a retry record (error class, phase, attempt, delay) to the job's history."""
+        with self._lock, self.conn:
+            row = self.conn.execute("SELECT retries FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            try:
+                retries = json.loads(row[0] or '[]')
+            except ValueError:
+                retries = []
+            retries.append(dict(info, time=self._now()))
+            self.conn.execute(
+                "UPDATE jobs SET retries = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(retries[-MAX_RETRY_RECORDS:], ensure_ascii=False), self._now(), job_id)
+            )
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_unfinished(self):
+        """Jobs that were queued or running when the app last stopped (queue order)."""
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs WHERE state IN ({placeholders}) ORDER BY id", UNFINISHED_STATES
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def get_children(self, parent_id):
+        """All entries of an expanded playlist job, in any state."""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM jobs WHERE parent_id = ? ORDER BY id", (parent_id,)).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def get_paused(self):
+        """Top-level jobs the user paused (playlist entries are paused with their playlist)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE state = ? AND parent_id IS NULL ORDER BY id", (PAUSED_STATE,)
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def kept_partials(self, states=UNFINISHED_STATES + (PAUSED_STATE, )):
+        """Stream files of paused / unfinished jobs (their partials are kept for resuming)."""
+        placeholders = ", ".join("?" for _ in states)
+        with self._lock:
+            rows = self.conn.execute(f"SELECT partials FROM jobs WHERE state IN ({placeholders})", states).fetchall()
+        paths = []
+        for (value,) in rows:
+            try:
+                paths.extend(json.loads(value or '[]'))
+            except ValueError:
+                continue
+        return paths
+
+    def stale_partials(self):
+        """Stream files of jobs that can't be resumed any more (failed, cancelled): {job id: paths}."""
+        states = UNFINISHED_STATES + (PAUSED_STATE, 'finished')
+        placeholders = ", ".join("?" for _ in states)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, partials FROM jobs WHERE partials IS NOT NULL AND state NOT IN ({placeholders})", states
+            ).fetchall()
+        stale = {}
+        for job_id, value in rows:
+            try:
+                stale[job_id] = json.loads(value or '[]')
+            except ValueError:
+                continue
+        return stale
+
+    def clear_partials(self, job_ids):
+        if not job_ids:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("UPDATE jobs SET partials = NULL WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    def resume_paused(self):
+        """
+        Queues all paused jobs again. Returns the number of jobs.
+        Expanded playlists go back to 'waiting' (their entries are already known).
+        """
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                """UPDATE jobs SET updated_at = ?, state = CASE
+                       WHEN kind = 'playlist' AND EXISTS (SELECT 1 FROM jobs c WHERE c.parent_id = jobs.id) THEN 'waiting'
+                       ELSE 'queued' END
+                   WHERE state = ?""",
+                (self._now(), PAUSED_STATE)
+            )
+            return cur.rowcount
+
+    def discard_paused(self):
+        """Cancels all paused jobs for good. Returns their stream files (to be deleted)."""
+        paths = self.kept_partials((PAUSED_STATE, ))
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = 'cancelled', partials = NULL, updated_at = ? WHERE state = ?",
+                (self._now(), PAUSED_STATE)
+            )
+        return paths
+
+    def has_unfinished(self):
+        placeholders = ", ".join("?" for _ in UNFINISHED_STATES)
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT 1 FROM jobs WHERE state IN ({placeholders}) LIMIT 1", UNFINISHED_STATES
+            ).fetchone()
+        return row is not None
+
+    def purge_done(self):
+        """
+        Removes jobs that reached a final state (keeps the database small).
+        Paused jobs and finished entries of a playlist that is still running or paused are kept,
+        as are failed / cancelled jobs with partial files left (the janitor clears those records).
+        """
+        kept = UNFINISHED_STATES + (PAUSED_STATE, )
+        placeholders = ", ".join("?" for _ in kept)
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"""DELETE FROM jobs WHERE state NOT IN ({placeholders}) AND partials IS NULL
+                    AND (parent_id IS NULL OR parent_id NOT IN (SELECT id FROM jobs WHERE state IN ({placeholders})))""",
+                kept * 2
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -2,7 +2,7 @@ import logging
 import os
 import sys
 from logging.handlers import RotatingFileHandler
-from src.settings_manager import get_settings
+from src.settings_manager import get_settings, get_app_data_dir
 
 class OrbitLogger:
     _instance = None
@@ -24,10 +24,7 @@ class OrbitLogger:
 
     def setup_handlers(self):
         # 1. Determine Path (AppData/Roaming/Orbit)
-        app_data = os.getenv('APPDATA') # Returns Roaming on Windows
-        log_dir = os.path.join(app_data, 'Orbit')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        log_dir = get_app_data_dir()
         
         self.log_file = os.path.join(log_dir, 'orbit_debug.log')
         
@@ -0,0 +1,144 @@
+import threading
+import time
+from PySide6.QtCore import QThread, Signal
+from yt_dlp.utils import format_bytes
+from src.core.logger import get_logger
+from src.core.progress import format_eta
+from src.core.info_cache import get_info_cache, cache_key_for_url, cache_key_for_info
+from src.core.ydl_pool import get_ydl_pool
+
+# Seconds a download waits for a prefetch of the same video that is still running
+PREFETCH_WAIT = 30
+
+# Extractions in flight: cache key -> Event set when the result is in the info cache (or failed)
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def wait_for_prefetch(cache_key, should_continue=None, timeout=PREFETCH_WAIT):
+    """
+    Blocks while a prefetch of cache_key is running, so the download takes its
+    result from the info cache instead of extracting the same video again.
+    """
+    with _inflight_lock:
+        event = _inflight.get(cache_key) if cache_key else None
+    if event is None:
+        return
+    deadline = time.monotonic() + timeout
+    while not event.wait(0.2):
+        if time.monotonic() > deadline or (should_continue and not should_continue()):
+            return
+
+
+def prefetch_info(url, browser=None):
+    """
+    Extracts a single video's metadata (no download) into the info cache.
+    Returns the info dict, None if the URL is no single video or is already being fetched.
+    A cached result is returned without a network request.
+    """
+    cache_key = cache_key_for_url(url)
+    if not cache_key:
+        return None # Generic URLs aren't cached: the download couldn't reuse the result
+    info = get_info_cache().get(cache_key)
+    if info is not None:
+        return info
+
+    with _inflight_lock:
+        if cache_key in _inflight:
+            return None
+        event = _inflight[cache_key] = threading.Event()
+    try:
+        opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'noplaylist': True,
+        }
+        if browser and browser != 'disabled':
+            opts['cookiesfrombrowser'] = (browser, )
+
+        started = time.monotonic()
+        with get_ydl_pool().session(opts) as ydl:
+            # Same call as DownloadTask: the raw result is what its cache lookup expects
+            info = ydl.extract_info(url, download=False, process=False)
+        if info.get('_type', 'video') != 'video':
+            return None
+        get_info_cache().put(cache_key_for_info(info), info)
+        get_logger().log(f"Prefetched metadata in {time.monotonic() - started:.1f}s: {cache_key}")
+        return info
+    finally:
+        with _inflight_lock:
+            _inflight.pop(cache_key, None)
+        event.set()
+
+
+def _estimated_size(f, duration):
+    size = f.get('filesize') or f.get('filesize_approx')
+    if not size and f.get('tbr') and duration:
+        size = f['tbr'] * 1000 / 8 * duration # tbr is kbit/s
+    return int(size) if size else None
+
+
+def format_summary(info):
+    """
+    Resolutions on offer with their estimated download size (video + best audio):
+    {'title', 'duration', 'resolutions': [(height, bytes or None), ...] highest first, 'audio': bytes or None}
+    """
+    duration = info.get('duration')
+    formats = info.get('formats') or [info]
+    audio_sizes = [_estimated_size(f, duration) or 0 for f in formats
+                   if f.get('vcodec') == 'none' and f.get('acodec') not in (None, 'none')]
+    audio = max(audio_sizes, default=0) or None
+
+    sizes = {}
+    for f in formats:
+        height = f.get('height')
+        if not height or f.get('vcodec') == 'none':
+            continue
+        size = _estimated_size(f, duration)
+        if size and f.get('acodec') == 'none':
+            size += audio or 0 # Video only: merged with the audio stream
+        sizes[height] = max(sizes.get(height) or 0, size or 0) or None
+    return {
+        'title': info.get('title'),
+        'duration': duration,
+        'resolutions': sorted(sizes.items(), reverse=True),
+        'audio': audio,
+    }
+
+
+def describe_formats(summary, limit=4):
+    """Turkish one-liner for the UI (e.g. 'Başlık (03:12) • 1080p ~85.20MiB • 720p ~41.00MiB • Ses ~3.10MiB')."""
+    title = summary.get('title') or ''
+    if summary.get('duration'):
+        title = f"{title} ({format_eta(summary['duration'])})"
+    parts = [title] if title else []
+    for height, size in summary['resolutions'][:limit]:
+        parts.append(f"{height}p ~{format_bytes(size)}" if size else f"{height}p")
+    if summary.get('audio'):
+        parts.append(f"Ses ~{format_bytes(summary['audio'])}")
+    return ' • '.join(parts)
+
+
+class PrefetchWorker(QThread):
+    """
+    Resolves a pasted URL's metadata and format list while the user is still
+    choosing options. The result goes to the info cache, the download reuses it.
+    """
+    finished = Signal(str, dict)  # URL, format_summary()
+    error = Signal(str, str)      # URL, error message
+
+    def __init__(self, url, browser=None):
+        super().__init__()
+        self.url = url
+        self.browser = browser
+
+    def run(self):
+        try:
+            info = prefetch_info(self.url, self.browser)
+            if info is not None:
+                self.finished.emit(self.url, format_summary(info))
+        except Exception as e:
+            # Speculative: the download reports its own errors
+            get_logger().debug(f"Prefetch failed ({self.url}): {e}")
+            self.error.emit(self.url, str(e))
@@ -0,0 +1,103 @@
+import os
+from yt_dlp.postprocessor import FFmpegMergerPP, FFmpegPostProcessor
+from yt_dlp.postprocessor.common import PostProcessor
+from yt_dlp.globals import postprocessors
+from yt_dlp.utils import ISO639Utils, prepend_extension
+
+
+def _subtitle_inputs(pp, info):
+    """(lang, name, path) of the downloaded subtitles an MP4 can carry."""
+    subtitles = []
+    for lang, sub_info in (info.get('requested_subtitles') or {}).items():
+        path = sub_info.get('filepath')
+        if not path or not os.path.exists(path):
+            pp.report_warning(f'Skipping embedding {lang} subtitle because the file is missing')
+        elif sub_info.get('ext') == 'json':
+            pp.report_warning('JSON subtitles cannot be embedded')
+        else:
+            subtitles.append((lang, sub_info.get('name'), path))
+    return subtitles
+
+
+def _subtitle_args(subtitles, first_input):
+    args = []
+    for i, (lang, name, _) in enumerate(subtitles):
+        args += ['-map', f'{first_input + i}:0', f'-metadata:s:s:{i}', f'language={ISO639Utils.short2long(lang) or lang}']
+        if name:
+            args += [f'-metadata:s:s:{i}', f'handler_name={name}', f'-metadata:s:s:{i}', f'title={name}']
+    if subtitles:
+        args += ['-c:s', 'mov_text']
+    return args
+
+
+class OrbitMergerPP(FFmpegMergerPP):
+    """
+    FFmpegMerger for MP4 jobs that also muxes the subtitles ('embedsubtitles')
+    in the same ffmpeg run. The chained way merges, then rewrites the merged
+    file to add the subtitles; every ffmpeg output is written faststart by
+    yt-dlp (-movflags +faststart), which costs a second write of the file per run.
+    Other containers are merged as usual.
+    """
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        if info['ext'] != 'mp4':
+            return super().run(info)
+
+        filename = info['filepath']
+        temp_filename = prepend_extension(filename, 'temp')
+        inputs = list(info['__files_to_merge'])
+        args = ['-c', 'copy']
+        audio_streams = 0
+        for i, fmt in enumerate(info['requested_formats']):
+            if fmt.get('acodec') != 'none':
+                args += ['-map', f'{i}:a:0']
+                if fmt['protocol'].startswith('m3u8') and self.get_audio_codec(fmt['filepath']) == 'aac':
+                    args += [f'-bsf:a:{audio_streams}', 'aac_adtstoasc']
+                audio_streams += 1
+            if fmt.get('vcodec') != 'none':
+                args += ['-map', f'{i}:v:0']
+
+        subtitles = _subtitle_inputs(self, info) if self.get_param('embedsubtitles') else []
+        args += _subtitle_args(subtitles, len(inputs))
+        inputs += [path for _, _, path in subtitles]
+
+        self.to_screen(f'Merging formats into "{filename}"' + (f' with {len(subtitles)} subtitles' if subtitles else ''))
+        self.run_ffmpeg_multiple_files(inputs, temp_filename, args)
+        os.replace(temp_filename, filename)
+        info['__subtitles_embedded'] = bool(subtitles)
+        return inputs, info
+
+
+class OrbitMp4SubtitlesPP(FFmpegPostProcessor):
+    """
+    Subtitle embedding for MP4 files that weren't merged (single file formats).
+    Merged files got theirs from OrbitMergerPP.
+    """
+    @PostProcessor._restrict_to(images=False)
+    def run(self, info):
+        if info['ext'] != 'mp4' or info.get('__subtitles_embedded') is not None:
+            return [], info
+        subtitles = _subtitle_inputs(self, info)
+        if not subtitles:
+            return [], info
+
+        filename = info['filepath']
+        temp_filename = prepend_extension(filename, 'temp')
+        args = [*self.stream_copy_opts(ext='mp4'), '-map', '-0:s', *_subtitle_args(subtitles, 1)]
+        self.to_screen(f'Embedding subtitles in "{filename}"')
+        self.run_ffmpeg_multiple_files([filename, *(path for _, _, path in subtitles)], temp_filename, args)
+        os.replace(temp_filename, filename)
+        info['__subtitles_embedded'] = True
+        return [path for _, _, path in subtitles], info
+
+
+def use_single_pass_merger(ydl, info):
+    """Swaps yt-dlp's merger of this download for OrbitMergerPP (called before post-processing)."""
+    pps = info.get('__postprocessors')
+    if not pps:
+        return
+    info['__postprocessors'] = [OrbitMergerPP(ydl) if type(pp) is FFmpegMergerPP else pp for pp in pps]
+
+
+# Resolved through yt-dlp's postprocessor registry ({'key': 'OrbitMp4Subtitles'})
+postprocessors.value.setdefault('OrbitMp4SubtitlesPP', OrbitMp4SubtitlesPP)
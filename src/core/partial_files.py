@@ -0,0 +1,96 @@
+import glob
+import os
+import threading
+import time
+from src.core.logger import get_logger
+
+# Janitor limits for partial files of jobs that can't be resumed any more
+MAX_PARTIAL_AGE_DAYS = 7                    # Older partials are removed
+MAX_PARTIAL_BYTES = 20 * 1024 * 1024 * 1024 # Above this total the oldest ones go first
+
+
+def temp_name(path):
+    """yt-dlp's intermediate name of an output: x.mp4 -> x.temp.mp4 (prepend_extension)"""
+    name, ext = os.path.splitext(path)
+    return f"{name}.temp{ext}"
+
+
+def partial_files_for(stream_path, include_stream=True):
+    """
+    Files a (possibly unfinished) stream left on disk: x.mp4.part, x.mp4.ytdl,
+    x.mp4.part-Frag12, x.temp.mp4, x.mp4.part.segments (+ the stream file itself).
+    Only names yt-dlp derives from this path, nothing else in its folder.
+    """
+    if not stream_path:
+        return []
+    base = glob.escape(stream_path)
+    candidates = [stream_path] if include_stream else []
+    candidates += [stream_path + '.part', stream_path + '.ytdl', stream_path + '.part.segments', temp_name(stream_path)]
+    candidates += glob.glob(base + '.part-Frag*')
+    return [path for path in candidates if os.path.isfile(path)]
+
+
+def remove_files(paths):
+    removed = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+class PartialJanitor:
+    """
+    Removes stale partial files of jobs that can't be resumed any more
+    (failed, cancelled), as recorded in the job store: files older than
+    max_age_days, then the oldest ones while the total is above max_bytes.
+    Only intermediate files derived from the recorded stream paths are
+    touched; the download folder isn't scanned and partials of paused /
+    queued jobs are left to the user.
+    """
+    def __init__(self, store, max_age_days=MAX_PARTIAL_AGE_DAYS, max_bytes=MAX_PARTIAL_BYTES):
+        self.store = store
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_bytes
+
+    def run(self):
+        """Returns (removed file count, freed bytes)."""
+        recorded = self.store.stale_partials()
+        now = time.time()
+
+        partials = [] # (mtime, size, path)
+        for paths in recorded.values():
+            for stream_path in paths:
+                for path in partial_files_for(stream_path, include_stream=False):
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    partials.append((st.st_mtime, st.st_size, path))
+
+        stale = [p for p in partials if now - p[0] > self.max_age]
+        kept = sorted((p for p in partials if now - p[0] <= self.max_age), key=lambda p: p[0])
+        total = sum(p[1] for p in kept)
+        for item in kept:
+            if total <= self.max_bytes:
+                break
+            stale.append(item)
+            total -= item[1]
+
+        removed = remove_files([p[2] for p in stale])
+        freed = sum(p[1] for p in stale)
+        if stale:
+            get_logger().log(f"Partial janitor: removed {removed} files ({freed / 1024 / 1024:.1f} MB)")
+
+        # Records with nothing left on disk are done
+        done = [job_id for job_id, paths in recorded.items()
+                if not any(partial_files_for(path, include_stream=False) for path in paths)]
+        self.store.clear_partials(done)
+        return removed, freed
+
+    def run_async(self):
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,100 @@
+import traceback
+import yt_dlp
+from PySide6.QtCore import QThread, Signal
+from src.core.logger import get_logger
+from src.core.ydl_pool import get_ydl_pool
+
+# Max number of url -> url redirects followed while resolving a playlist
+MAX_URL_HOPS = 3
+
+
+def expand_playlist(url, browser=None, on_entry=None, should_continue=None, on_log=None):
+    """
+    Flat-extracts a playlist lazily (no per-video extraction) and reports every
+    entry through on_entry({'url', 'title', 'index'}) as soon as it is known.
+    Returns (playlist title, entry count).
+    """
+    on_entry = on_entry or (lambda entry: None)
+    should_continue = should_continue or (lambda: True)
+    on_log = on_log or (lambda msg: None)
+
+    opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'noprogress': True,
+        'noplaylist': False,
+        'extract_flat': 'in_playlist',
+        'lazy_playlist': True,
+    }
+    if browser and browser != 'disabled':
+        opts['cookiesfrombrowser'] = (browser, )
+
+    with get_ydl_pool().session(opts) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        
+        # Watch URLs with '&list=' first redirect to the playlist extractor
+        hops = 0
+        while info.get('_type') in ('url', 'url_transparent') and hops < MAX_URL_HOPS:
+            info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+            hops += 1
+
+        title = info.get('title') or url
+        if info.get('_type', 'video') == 'video':
+            # Not a playlist after all: a single child job
+            on_entry({'url': url, 'title': title, 'index': '1'})
+            return title, 1
+
+        on_log(f"Oynatma listesi açılıyor: {title}")
+        playlist_count = info.get('playlist_count')
+        width = len(str(playlist_count)) if playlist_count else 2
+        
+        count = 0
+        for position, entry in enumerate(info.get('entries') or [], 1):
+            if not should_continue():
+                break
+            if not entry:
+                continue
+            entry_url = entry.get('url') or entry.get('webpage_url')
+            if not entry_url or not entry_url.startswith('http'):
+                continue
+            
+            count += 1
+            on_entry({
+                'url': entry_url,
+                'title': entry.get('title') or entry_url,
+                'index': str(entry.get('playlist_index') or position).zfill(width),
+            })
+        return title, count
+
+
+class PlaylistWorker(QThread):
+    """
+    Expands a playlist into its entries (flat extraction) so every entry
+    can run as a separate job.
+    """
+    entry_found = Signal(dict)    # {'url', 'title', 'index'}
+    finished = Signal(str, int)   # Playlist title, entry count
+    error = Signal(str)
+    log = Signal(str)
+
+    def __init__(self, url, browser=None):
+        super().__init__()
+        self.url = url
+        self.browser = browser
+        self.is_running = True
+
+    def run(self):
+        try:
+            self.log.emit(f"Oynatma listesi analiz ediliyor: {self.url}")
+            title, count = expand_playlist(self.url, self.browser,
+                                           on_entry=self.entry_found.emit,
+                                           should_continue=lambda: self.is_running,
+                                           on_log=self.log.emit)
+            get_logger().log(f"Playlist expanded: {title} ({count} entries)")
+            self.finished.emit(str(title), count)
+        except Exception as e:
+            get_logger().error(f"Playlist Error:\n{traceback.format_exc()}")
+            self.error.emit(str(e))
+
+    def stop(self):
+        self.is_running = False
@@ -0,0 +1,57 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.core.logger import get_logger
+
+
+def default_workers():
+    """ffmpeg already uses several threads per run: half of the cores, at most 4."""
+    return max(1, min(4, (os.cpu_count() or 2) // 2))
+
+
+class PostProcessPool:
+    """
+    Second stage of the download pipeline: merge, audio conversion, thumbnail
+    and metadata steps run here, so a download slot is free for the next job
+    while ffmpeg works on the finished one.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or default_workers()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="postprocess")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def submit(self, fn, *args):
+        with self._lock:
+            self._pending += 1
+            pending = self._pending
+        get_logger().log(f"Post-processing queued ({pending} pending, {self.workers} workers)")
+        return self._executor.submit(self._run, fn, *args)
+
+    def pending(self):
+        """Jobs waiting for or in post-processing."""
+        with self._lock:
+            return self._pending
+
+    def _run(self, fn, *args):
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self):
+        """Drops queued jobs (app exit), running ffmpeg steps are killed with the external processes."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global Access
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_postprocess_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PostProcessPool()
+        return _pool
@@ -0,0 +1,82 @@
+from yt_dlp.utils import format_bytes
+
+# Job phases reported in progress events
+PHASE_EXTRACT = 'extract'
+PHASE_SUBTITLES = 'subtitles'
+PHASE_DOWNLOAD = 'download'
+PHASE_MERGE = 'merge'
+PHASE_POSTPROCESS = 'postprocess'
+PHASE_POSTPROCESS_WAIT = 'postprocess_wait' # Downloaded, waiting for a post-processing worker
+
+# Phases of the post-processing stage (after the download slot is released)
+POSTPROCESS_PHASES = (PHASE_POSTPROCESS_WAIT, PHASE_MERGE, PHASE_POSTPROCESS)
+
+PHASE_LABELS = {
+    PHASE_EXTRACT: "Analiz ediliyor",
+    PHASE_SUBTITLES: "Altyazılar indiriliyor",
+    PHASE_DOWNLOAD: "İndiriliyor",
+    PHASE_MERGE: "Birleştiriliyor",
+    PHASE_POSTPROCESS: "İşleniyor",
+    PHASE_POSTPROCESS_WAIT: "İşlem sırası bekleniyor",
+}
+
+
+class ProgressEvent:
+    """
+    Typed progress sample emitted by DownloadWorker, GalleryWorker and ConverterWorker.
+    All values are plain numbers (None when unknown), formatting is left to the consumer.
+    - percent: 0-100
+    - downloaded_bytes / total_bytes: bytes of the current file (gallery: all files so far)
+    - speed: bytes/sec, eta: seconds
+    - fragment_index / fragment_count: HLS/DASH fragment (gallery: file number)
+    - job_id: filled in by the scheduler
+    """
+    __slots__ = ('job_id', 'phase', 'percent', 'downloaded_bytes', 'total_bytes',
+                 'speed', 'eta', 'fragment_index', 'fragment_count', 'filename')
+
+    def __init__(self, phase, percent=0.0, downloaded_bytes=None, total_bytes=None, speed=None, eta=None,
+                 fragment_index=None, fragment_count=None, filename=None, job_id=None):
+        self.job_id = job_id
+        self.phase = phase
+        self.percent = percent
+        self.downloaded_bytes = downloaded_bytes
+        self.total_bytes = total_bytes
+        self.speed = speed
+        self.eta = eta
+        self.fragment_index = fragment_index
+        self.fragment_count = fragment_count
+        self.filename = filename
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__ if getattr(self, key) is not None}
+
+    def __repr__(self):
+        return f"ProgressEvent({self.to_dict()})"
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return None
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+def format_event(event):
+    """Turkish status line for the UI (e.g. 'İndiriliyor... 12.00MiB / 40.00MiB - 2.10MiB/s - Kalan 00:13')."""
+    parts = []
+    if event.phase == PHASE_DOWNLOAD:
+        if event.downloaded_bytes is not None and event.total_bytes:
+            parts.append(f"{format_bytes(event.downloaded_bytes)} / {format_bytes(event.total_bytes)}")
+        elif event.downloaded_bytes:
+            parts.append(format_bytes(event.downloaded_bytes))
+        if event.speed:
+            parts.append(f"{format_bytes(event.speed)}/s")
+    if event.eta is not None:
+        parts.append(f"Kalan {format_eta(event.eta)}")
+    if event.filename and not event.total_bytes:
+        parts.append(event.filename)
+    elif event.percent:
+        parts.append(f"%{event.percent:.0f}")
+    label = f"{PHASE_LABELS.get(event.phase, event.phase)}..."
+    return f"{label} {' - '.join(parts)}" if parts else label
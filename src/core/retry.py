@@ -0,0 +1,153 @@
+import random
+import re
+import ssl
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from yt_dlp.utils import (DownloadCancelled, ExtractorError, GeoRestrictedError, UnsupportedError,
+                          UnavailableVideoError, ContentTooShortError)
+from yt_dlp.networking.exceptions import HTTPError, TransportError, SSLError, CertificateVerifyError, IncompleteRead
+
+try:
+    from yt_dlp.cookies import CookieLoadError
+except ImportError: # Older yt-dlp
+    CookieLoadError = None
+
+# Error classes
+ERROR_RATE_LIMIT = 'rate_limit'   # HTTP 429
+ERROR_SERVER = 'server'           # HTTP 5xx
+ERROR_NETWORK = 'network'         # Timeouts, resets, truncated responses
+ERROR_SSL = 'ssl'                 # Certificate / TLS problems
+ERROR_COOKIES = 'cookies'         # Browser cookies could not be loaded (locked DB, DPAPI)
+ERROR_AUTH = 'auth'               # HTTP 401 / 403 (expired session cookies)
+ERROR_CANCELLED = 'cancelled'
+ERROR_FATAL = 'fatal'             # Private, removed, geo-blocked, unsupported... (no retry)
+
+ERROR_LABELS = {
+    ERROR_RATE_LIMIT: "Sunucu yoğun (429)",
+    ERROR_SERVER: "Sunucu hatası",
+    ERROR_NETWORK: "Bağlantı hatası",
+    ERROR_SSL: "Güvenli bağlantı hatası",
+    ERROR_COOKIES: "Tarayıcı çerezleri okunamadı",
+    ERROR_AUTH: "Yetkilendirme hatası",
+    ERROR_CANCELLED: "İptal edildi",
+    ERROR_FATAL: "Hata",
+}
+
+# Longest Retry-After we are willing to wait for
+MAX_RETRY_AFTER = 300
+
+# yt-dlp's downloaders give up with a text-only report (the exception is not attached):
+# "[download] Got error: HTTP Error 503: ..." / "[download] Got error: <transport error>"
+GAVE_UP_PATTERN = re.compile(r'\[download\] Got error: (?:HTTP Error (\d{3}))?')
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter: base * 2^(attempt-1), capped at max_delay."""
+    def __init__(self, max_retries, base_delay=0.0, max_delay=0.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), MAX_RETRY_AFTER)
+        if not self.base_delay:
+            return 0.0
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        # Equal jitter: parallel jobs that failed together don't retry together
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+RETRY_POLICIES = {
+    ERROR_RATE_LIMIT: RetryPolicy(4, 5.0, 120.0),
+    ERROR_SERVER: RetryPolicy(3, 3.0, 60.0),
+    ERROR_NETWORK: RetryPolicy(4, 2.0, 30.0),
+    ERROR_SSL: RetryPolicy(1),      # Retried once with certificate checks disabled
+    ERROR_COOKIES: RetryPolicy(1),  # Retried once without browser cookies
+    ERROR_AUTH: RetryPolicy(1),     # Retried once with freshly read browser cookies
+}
+
+
+def iter_causes(exc):
+    """Yields the exception and everything it wraps (DownloadError.exc_info, ExtractorError.cause, __cause__)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc_info = getattr(exc, 'exc_info', None)
+        if exc_info and exc_info[1] is not None and exc_info[1] is not exc:
+            exc = exc_info[1]
+        elif isinstance(getattr(exc, 'cause', None), BaseException):
+            exc = exc.cause
+        else:
+            exc = exc.__cause__ or exc.__context__
+
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or HTTP date) -> seconds, None if missing/invalid."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(exc):
+    """
+    Classifies a yt-dlp exception by the types it wraps.
+    Returns (error class, Retry-After seconds or None).
+    """
+    for err in iter_causes(exc):
+        if isinstance(err, DownloadCancelled):
+            return ERROR_CANCELLED, None
+        if CookieLoadError is not None and isinstance(err, CookieLoadError):
+            return ERROR_COOKIES, None
+        if isinstance(err, (CertificateVerifyError, SSLError, ssl.SSLError)):
+            return ERROR_SSL, None
+        if isinstance(err, HTTPError):
+            headers = getattr(err.response, 'headers', None) or {}
+            retry_after = parse_retry_after(headers.get('Retry-After'))
+            if err.status == 429:
+                return ERROR_RATE_LIMIT, retry_after
+            if err.status >= 500:
+                return ERROR_SERVER, retry_after
+            if err.status in (401, 403):
+                return ERROR_AUTH, None
+            return ERROR_FATAL, None # 404 / 410: retrying won't help
+        if isinstance(err, (IncompleteRead, ContentTooShortError, TransportError, TimeoutError, ConnectionError)):
+            return ERROR_NETWORK, None
+        if isinstance(err, (GeoRestrictedError, UnsupportedError, UnavailableVideoError)):
+            return ERROR_FATAL, None
+        if isinstance(err, ExtractorError) and err.expected and err.cause is None:
+            return ERROR_FATAL, None # Private / removed / login required
+
+    match = GAVE_UP_PATTERN.search(str(exc))
+    if match:
+        status = int(match.group(1) or 0)
+        if status == 429:
+            return ERROR_RATE_LIMIT, None
+        if status in (401, 403):
+            return ERROR_AUTH, None
+        if 400 <= status < 500:
+            return ERROR_FATAL, None
+        return (ERROR_SERVER if status else ERROR_NETWORK), None
+    return ERROR_FATAL, None
+
+
+def wait_interruptible(seconds, should_continue):
+    """Sleeps in small steps, returns False as soon as should_continue() is False."""
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        if not should_continue():
+            return False
+        time.sleep(max(0.0, min(0.2, end - time.monotonic())))
+    return should_continue()
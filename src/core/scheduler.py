@@ -0,0 +1,409 @@
+from functools import partial
+from PySide6.QtCore import QObject, Signal
+from src.core.downloader import DownloadWorker
+from src.core.gallery_worker import GalleryWorker
+from src.core.playlist_worker import PlaylistWorker
+from src.core.logger import get_logger
+from src.core.progress import POSTPROCESS_PHASES
+from src.utils import get_host
+
+# Default limits (overridable from Settings)
+DEFAULT_MAX_CONCURRENT = 3
+DEFAULT_MAX_PER_HOST = 2
+
+# States in which a job won't do any more work
+FINAL_STATES = ('finished', 'failed', 'cancelled')
+
+
+class DownloadJob:
+    """
+    A single queued item (video, gallery or playlist) tracked by the scheduler.
+    States: queued -> running (-> processing) -> finished / failed / cancelled
+    'processing' jobs are downloaded and wait for / run their ffmpeg steps in
+    the post-processing pool without using a download slot (the store keeps
+    them 'running', so an interrupted merge runs again on restore).
+    Playlist jobs only expand their entries into child jobs, then stay
+    'waiting' (without using a slot) until every child is done.
+    """
+    def __init__(self, job_id, url, kind='video', options=None, parent_id=None):
+        self.id = job_id
+        self.url = url
+        self.kind = kind # 'video', 'gallery' or 'playlist'
+        self.options = options if options else {}
+        self.host = get_host(url)
+        self.state = 'queued'
+        self.progress = 0.0
+        self.title = None
+        self.error = None
+        self.worker = None
+        self.parent_id = parent_id
+        self.children = []          # Child job ids (playlist jobs)
+        self.child_indices = set()  # Playlist indices already queued (no duplicates on resume)
+
+
+class DownloadScheduler(QObject):
+    """
+    Runs queued download jobs concurrently.
+    - Global limit: max_concurrent workers at once
+    - Per-host limit: max_per_host workers for the same site
+    Every job reports its own state through the job_* signals.
+    """
+    job_started = Signal(int)            # job id
+    job_progress = Signal(int, float)    # job id, 0-100 (playlists: aggregate of their entries)
+    job_event = Signal(object)           # ProgressEvent with job_id set
+    job_log = Signal(int, str)           # job id, status message
+    job_finished = Signal(int, str)      # job id, title / message
+    job_failed = Signal(int, str)        # job id, error message
+    all_finished = Signal()
+
+    def __init__(self, max_concurrent=DEFAULT_MAX_CONCURRENT, max_per_host=DEFAULT_MAX_PER_HOST, store=None, parent=None):
+        super().__init__(parent)
+        self.store = store  # Optional JobStore for crash-safe persistence
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_per_host = max(1, int(max_per_host))
+        self.jobs = {}      # id -> DownloadJob (insertion order = queue order)
+        self._next_id = 1
+        self._active = False
+        self._retired = []
+
+    # --- Queue Management ---
+
+    def add_job(self, url, kind='video', options=None, parent_id=None):
+        if self.store:
+            job_id = self.store.add_job(url, kind, options, parent_id)
+        else:
+            job_id = self._next_id
+        self._next_id = max(self._next_id, job_id) + 1
+        
+        job = DownloadJob(job_id, url, kind, options, parent_id)
+        self.jobs[job.id] = job
+        self._attach_child(job)
+        if self._active:
+            self._pump()
+        return job.id
+
+    def restore_job(self, record):
+        """
+        Re-queues a job loaded from the store (interrupted by a crash or close).
+        Playlists that were already expanded keep their entries: finished ones
+        are not downloaded again, the rest are restored as their own records.
+        """
+        job = DownloadJob(record['id'], record['url'], record['kind'], record['options'], record.get('parent_id'))
+        job.title = record.get('title')
+        self._next_id = max(self._next_id, job.id + 1)
+        self.jobs[job.id] = job
+        self._attach_child(job)
+
+        if job.kind == 'playlist' and self.store:
+            for child in self.store.get_children(job.id):
+                job.child_indices.add(child['options'].get('playlist_index'))
+                if child['state'] in FINAL_STATES:
+                    done = DownloadJob(child['id'], child['url'], child['kind'], child['options'], job.id)
+                    done.state = child['state']
+                    done.title = child.get('title')
+                    done.progress = 100.0
+                    self.jobs[done.id] = done
+                    job.children.append(done.id)
+            if record['state'] == 'waiting':
+                job.state = 'waiting'
+                return job.id
+
+        self._set_state(job, 'queued')
+        return job.id
+
+    def children_of(self, job_id):
+        job = self.jobs.get(job_id)
+        return [self.jobs[c] for c in job.children if c in self.jobs] if job else []
+
+    def clear(self):
+        """Forgets all jobs. Only valid while idle."""
+        if not self.is_busy():
+            # Keep references to workers that are still winding down after a cancel,
+            # destroying a running QThread crashes the application.
+            self._retired = [w for w in self._retired if w.isRunning()]
+            self._retired += [j.worker for j in self.jobs.values() if j.worker and j.worker.isRunning()]
+            self.jobs = {}
+
+    def set_limits(self, max_concurrent, max_per_host):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_per_host = max(1, int(max_per_host))
+        if self._active:
+            self._pump()
+
+    def start(self):
+        self._active = True
+        get_logger().log(f"Scheduler started: {len(self.jobs)} jobs | Limit: {self.max_concurrent} (per host: {self.max_per_host})")
+        # Restored playlists whose entries all finished before the restart
+        for job in list(self.jobs.values()):
+            if job.state == 'waiting':
+                self._update_parent(job.id)
+        self._pump()
+
+    def running_jobs(self):
+        """Jobs using a download slot."""
+        return [j for j in self.jobs.values() if j.state == 'running']
+
+    def active_jobs(self):
+        """Jobs with a live worker (downloading or post-processing)."""
+        return [j for j in self.jobs.values() if j.state in ('running', 'processing')]
+
+    def count(self, state, include_children=False):
+        """Number of jobs in a state (top-level jobs only unless include_children)."""
+        return sum(1 for j in self.jobs.values()
+                   if j.state == state and (include_children or j.parent_id is None))
+
+    def is_busy(self):
+        return any(j.state in ('queued', 'running', 'processing', 'waiting') for j in self.jobs.values())
+
+    def overall_progress(self):
+        """Average progress of the top-level jobs in the current run (0-100)."""
+        top_level = [j for j in self.jobs.values() if j.parent_id is None]
+        if not top_level:
+            return 0.0
+        total = 0.0
+        for job in top_level:
+            if job.state in FINAL_STATES:
+                total += 100
+            else:
+                total += job.progress
+        return total / len(top_level)
+
+    def cancel_all(self, persist_state='cancelled'):
+        """
+        Stops running workers and drops queued jobs.
+        persist_state: state written to the store ('queued' resumes the jobs on next start,
+        'paused' keeps them and their partial files until the user resumes or discards them).
+        Returns the stream files of the stopped jobs.
+        """
+        self._active = False
+        running = []
+        for job in self.jobs.values():
+            if job.state not in ('queued', 'running', 'processing', 'waiting'):
+                continue
+            was_running = job.state in ('running', 'processing')
+            # An expanded playlist stays 'waiting' so its entries aren't listed again
+            state = 'waiting' if job.state == 'waiting' and persist_state == 'queued' else persist_state
+            job.state = 'cancelled'
+            if self.store:
+                self.store.update(job.id, state=state)
+            if was_running:
+                if job.worker and hasattr(job.worker, 'stop'):
+                    job.worker.stop()
+                running.append(job)
+
+        # Give workers a chance to exit gracefully
+        stopped_files = []
+        for job in running:
+            if job.worker:
+                job.worker.wait(2000)
+                # Partial files a paused job resumes from (yt-dlp continues at their byte offset),
+                # recorded for cancelled jobs too: the partial janitor removes only recorded files
+                stream_files = getattr(job.worker, 'stream_files', None)
+                if self.store and stream_files:
+                    self.store.update(job.id, partials=stream_files)
+                stopped_files.extend(stream_files or [])
+        return stopped_files
+
+    def stop_all(self):
+        """Called on application exit. Unfinished jobs stay queued in the store."""
+        self.cancel_all(persist_state='queued')
+        for job in self.jobs.values():
+            worker = job.worker
+            if worker and worker.isRunning():
+                try:
+                    worker.terminate()
+                    worker.wait(1000)
+                except Exception as e:
+                    print(f"Worker stop error: {e}")
+
+    # --- Internal ---
+
+    def _pump(self):
+        """Starts as many queued jobs as the limits allow."""
+        if not self._active:
+            return
+
+        running = self.running_jobs()
+        per_host = {}
+        for job in running:
+            per_host[job.host] = per_host.get(job.host, 0) + 1
+
+        for job in self.jobs.values():
+            if len(running) >= self.max_concurrent:
+                break
+            if job.state != 'queued':
+                continue
+            if per_host.get(job.host, 0) >= self.max_per_host:
+                continue
+
+            self._start_job(job)
+            running.append(job)
+            per_host[job.host] = per_host.get(job.host, 0) + 1
+
+        if not self.is_busy():
+            self._active = False
+            get_logger().log("Scheduler finished all jobs.")
+            self.all_finished.emit()
+
+    def _set_state(self, job, state, **fields):
+        job.state = state
+        if self.store:
+            self.store.update(job.id, state=state, **fields)
+
+    def _start_job(self, job):
+        self._set_state(job, 'running')
+        if self.store:
+            self.store.increment_attempts(job.id)
+        job.progress = 0.0
+        job.worker = self._create_worker(job)
+        get_logger().log(f"Job #{job.id} started ({job.kind}): {job.url}")
+        self.job_started.emit(job.id)
+        job.worker.start()
+
+    def _create_worker(self, job):
+        if job.kind == 'playlist':
+            worker = PlaylistWorker(job.url, job.options.get('browser'))
+            worker.entry_found.connect(partial(self._on_entry, job.id))
+            worker.finished.connect(partial(self._on_expanded, job.id))
+        elif job.kind == 'gallery':
+            worker = GalleryWorker(job.url, job.options)
+            worker.progress.connect(partial(self._on_progress, job.id))
+            worker.finished.connect(partial(self._on_finished, job.id))
+        else:
+            worker = DownloadWorker(job.url, defer_postprocess=True, **job.options)
+            worker.progress.connect(partial(self._on_progress, job.id))
+            worker.finished.connect(lambda title, url, jid=job.id: self._on_finished(jid, title))
+            worker.downloaded.connect(partial(self._on_downloaded, job.id))
+            worker.retry.connect(partial(self._on_retry, job.id))
+
+        worker.log.connect(partial(self._on_log, job.id))
+        worker.error.connect(partial(self._on_error, job.id))
+        return worker
+
+    def _attach_child(self, job):
+        parent = self.jobs.get(job.parent_id) if job.parent_id else None
+        if parent:
+            parent.children.append(job.id)
+            parent.child_indices.add(job.options.get('playlist_index'))
+
+    def _is_live(self, job_id):
+        job = self.jobs.get(job_id)
+        return job is not None and job.state in ('running', 'processing')
+
+    def _on_entry(self, job_id, entry):
+        """A playlist entry was found: queue it as a child job right away."""
+        if not self._is_live(job_id):
+            return
+        parent = self.jobs[job_id]
+        if entry['index'] in parent.child_indices:
+            return # Already queued before a restart
+        
+        options = dict(parent.options, playlist_mode=False, playlist_index=entry['index'])
+        child_id = self.add_job(entry['url'], 'video', options, parent_id=job_id)
+        self.jobs[child_id].title = entry.get('title')
+
+    def _on_expanded(self, job_id, title, count):
+        if not self._is_live(job_id):
+            return
+        job = self.jobs[job_id]
+        job.title = title
+        get_logger().log(f"Job #{job_id} expanded into {len(job.children)} entries: {title}")
+        if not job.children:
+            self._on_error(job_id, "Oynatma listesinde indirilecek öğe bulunamadı.")
+            return
+        
+        # The parent doesn't use a slot while its entries download
+        self._set_state(job, 'waiting', title=title)
+        self.job_log.emit(job_id, f"Oynatma listesi: {title} ({len(job.children)} öğe)")
+        self._update_parent(job_id)
+        self._pump()
+
+    def _update_parent(self, parent_id):
+        """Aggregates the progress of a playlist job and completes it once every entry is done."""
+        parent = self.jobs.get(parent_id)
+        if parent is None or parent.state not in ('running', 'waiting'):
+            return
+        children = self.children_of(parent_id)
+        if not children:
+            return
+        
+        total = sum(100.0 if c.state in FINAL_STATES else c.progress for c in children)
+        parent.progress = total / len(children)
+        self.job_progress.emit(parent_id, parent.progress)
+        
+        if parent.state != 'waiting' or any(c.state not in FINAL_STATES for c in children):
+            return
+        
+        succeeded = sum(1 for c in children if c.state == 'finished')
+        if succeeded == 0:
+            msg = f"Oynatma listesindeki hiçbir öğe indirilemedi ({len(children)} öğe)."
+            parent.error = msg
+            self._set_state(parent, 'failed', error=msg)
+            self.job_failed.emit(parent_id, msg)
+        else:
+            title = f"{parent.title or parent.url} ({succeeded}/{len(children)})"
+            self._set_state(parent, 'finished', title=parent.title, error=None)
+            self.job_finished.emit(parent_id, title)
+
+    def _on_progress(self, job_id, event):
+        if not self._is_live(job_id):
+            return
+        job = self.jobs[job_id]
+        event.job_id = job_id
+        self.job_event.emit(event)
+        
+        # Galleries don't know their total, keep their bar where it is.
+        # Post-processing reports its own stage progress through job_event only.
+        if job.kind == 'gallery' or event.phase in POSTPROCESS_PHASES:
+            return
+        job.progress = float(event.percent)
+        self.job_progress.emit(job_id, job.progress)
+        if job.parent_id:
+            self._update_parent(job.parent_id)
+
+    def _on_log(self, job_id, msg):
+        if self._is_live(job_id):
+            self.job_log.emit(job_id, msg)
+
+    def _on_downloaded(self, job_id):
+        """Download stage done: the slot goes to the next job while ffmpeg works on this one."""
+        if not self._is_live(job_id):
+            return
+        job = self.jobs[job_id]
+        job.state = 'processing' # Not persisted, see DownloadJob
+        job.progress = 100.0
+        self.job_progress.emit(job_id, job.progress)
+        if job.parent_id:
+            self._update_parent(job.parent_id)
+        self._pump()
+
+    def _on_retry(self, job_id, info):
+        if self.store and self._is_live(job_id):
+            self.store.record_retry(job_id, info)
+
+    def _on_finished(self, job_id, title):
+        if not self._is_live(job_id):
+            return
+        job = self.jobs[job_id]
+        job.progress = 100.0
+        job.title = title
+        self._set_state(job, 'finished', title=title, output_path=getattr(job.worker, 'output_path', None), error=None, partials=None)
+        self.job_finished.emit(job_id, title)
+        if job.parent_id:
+            self._update_parent(job.parent_id)
+        self._pump()
+
+    def _on_error(self, job_id, msg):
+        if not self._is_live(job_id):
+            return
+        job = self.jobs[job_id]
+        job.error = msg
+        fields = {'error': msg}
+        stream_files = getattr(job.worker, 'stream_files', None)
+        if stream_files:
+            fields['partials'] = stream_files # Left to the partial janitor
+        self._set_state(job, 'failed', **fields)
+        self.job_failed.emit(job_id, msg)
+        if job.parent_id:
+            self._update_parent(job.parent_id)
+        self._pump()
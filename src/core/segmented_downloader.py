@@ -0,0 +1,302 @@
+import http.client
+import json
+import os
+import queue
+import re
+import ssl
+import threading
+import time
+from urllib.parse import urlparse, unquote
+from urllib.request import Request, urlopen
+from yt_dlp.utils import sanitize_filename
+from yt_dlp.utils.networking import std_headers
+from src.core.logger import get_logger
+
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+# Direct media links that need no extraction (file extension of the URL path)
+DIRECT_VIDEO_EXTENSIONS = ('mp4', 'mkv', 'webm', 'mov', 'm4v', 'avi')
+DIRECT_AUDIO_EXTENSIONS = ('m4a', 'mp3', 'flac', 'wav', 'ogg', 'opus', 'aac')
+
+# Segmentation
+DEFAULT_CONNECTIONS = 4
+SEGMENT_SIZE = 8 * 1024 * 1024      # Work unit handed to a connection
+MIN_SPLIT_SIZE = 2 * 1024 * 1024    # Smaller files use one connection
+READ_SIZE = 64 * 1024
+SEGMENT_RETRIES = 3
+TIMEOUT = 20
+
+# Resume state next to the .part file (completed segment offsets)
+SEGMENTS_SUFFIX = '.segments'
+
+
+class DirectDownloadError(Exception):
+    """The direct download failed (caller may fall back to yt-dlp)."""
+
+
+def direct_media_extension(url):
+    """'mp4' for https://host/path/file.mp4?x=1, None if the URL isn't a direct media file."""
+    try:
+        path = urlparse(url).path
+    except ValueError:
+        return None
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return ext if ext in DIRECT_VIDEO_EXTENSIONS + DIRECT_AUDIO_EXTENSIONS else None
+
+
+def _ssl_context():
+    return ssl.create_default_context(cafile=certifi.where() if certifi else None)
+
+
+def _headers(extra=None):
+    headers = {'User-Agent': std_headers['User-Agent'], 'Accept': '*/*', 'Accept-Encoding': 'identity'}
+    headers.update(extra or {})
+    return headers
+
+
+def probe(url):
+    """
+    Resolves redirects and reads size / range support with a 1-byte range request.
+    Returns {'url', 'size', 'ranges', 'content_type', 'filename'}.
+    """
+    request = Request(url, headers=_headers({'Range': 'bytes=0-0'}))
+    with urlopen(request, timeout=TIMEOUT, context=_ssl_context()) as response:
+        headers = response.headers
+        size, ranges = None, False
+        content_range = headers.get('Content-Range', '')
+        match = re.match(r'bytes\s+0-0/(\d+)', content_range)
+        if response.status == 206 and match:
+            size, ranges = int(match.group(1)), True
+        elif headers.get('Content-Length'):
+            size = int(headers['Content-Length'])
+
+        filename = None
+        disposition = headers.get('Content-Disposition', '')
+        match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition)
+        if match:
+            filename = unquote(match.group(1))
+        return {
+            'url': response.geturl(),
+            'size': size,
+            'ranges': ranges,
+            'content_type': headers.get('Content-Type', ''),
+            'filename': filename,
+        }
+
+
+class _Connection:
+    """One keep-alive connection of the pool (reused for every segment a thread takes)."""
+    def __init__(self, url):
+        parts = urlparse(url)
+        self.path = parts.path + ('?' + parts.query if parts.query else '')
+        if parts.scheme == 'https':
+            self.conn = http.client.HTTPSConnection(parts.netloc, timeout=TIMEOUT, context=_ssl_context())
+        else:
+            self.conn = http.client.HTTPConnection(parts.netloc, timeout=TIMEOUT)
+
+    def get(self, headers):
+        self.conn.request('GET', self.path, headers=_headers(headers))
+        return self.conn.getresponse()
+
+    def reset(self):
+        self.conn.close() # Reconnects on the next request
+
+    def close(self):
+        self.conn.close()
+
+
+class SegmentedDownload:
+    """
+    Downloads a direct media URL over several pooled connections.
+    The file is split into SEGMENT_SIZE byte ranges that the connections take
+    from a shared queue, written in place into a preallocated .part file and
+    checked against the announced size before it is renamed.
+    Completed segments are kept in a .segments file, so a paused download
+    continues where it stopped.
+    - on_progress(downloaded_bytes, total_bytes, speed)
+    - throttle(nbytes): blocks for the bandwidth governor, False = cancelled
+    - should_continue(): False cancels
+    """
+    def __init__(self, url, path, connections=DEFAULT_CONNECTIONS, on_progress=None, throttle=None,
+                 should_continue=None, probe_info=None):
+        self.url = url
+        self.path = path
+        self.part_path = path + '.part'
+        self.state_path = self.part_path + SEGMENTS_SUFFIX
+        self.connections = max(1, connections)
+        self.on_progress = on_progress or (lambda downloaded, total, speed: None)
+        self.throttle = throttle or (lambda nbytes: True)
+        self.should_continue = should_continue or (lambda: True)
+        self.info = probe_info
+
+        self._lock = threading.Lock()
+        self._downloaded = 0
+        self._done = set()   # Start offsets of completed segments
+        self._offsets = {}   # Write position of unfinished segments (start -> offset)
+        self._error = None
+        self._cancelled = False
+
+    def run(self):
+        """Downloads the file. Returns the number of bytes, raises DirectDownloadError."""
+        if self.info is None:
+            try:
+                self.info = probe(self.url)
+            except Exception as e:
+                raise DirectDownloadError(f"Probe failed: {e}")
+        size = self.info['size']
+        url = self.info['url']
+
+        if not size or not self.info['ranges'] or size < MIN_SPLIT_SIZE:
+            segments = [(0, size - 1 if size else None)]
+            connections = 1
+        else:
+            segments = [(start, min(start + SEGMENT_SIZE, size) - 1) for start in range(0, size, SEGMENT_SIZE)]
+            connections = min(self.connections, len(segments))
+
+        self._prepare(size, len(segments) > 1)
+        pending = queue.Queue()
+        for segment in segments:
+            if segment[0] not in self._done:
+                pending.put(segment)
+
+        started = time.monotonic()
+        self._start_bytes = self._downloaded
+        self._started = started
+        threads = [threading.Thread(target=self._worker, args=(url, pending), daemon=True) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._cancelled or self._error:
+            self._save_state(size) # Unfinished segments continue from their last write position
+        if self._cancelled:
+            raise DirectDownloadError("İndirme kullanıcı tarafından iptal edildi.")
+        if self._error:
+            raise DirectDownloadError(str(self._error))
+
+        # Verify before the file takes its final name
+        written = os.path.getsize(self.part_path)
+        if size and (written != size or self._downloaded != size):
+            raise DirectDownloadError(f"Size mismatch: expected {size}, got {self._downloaded} ({written} on disk)")
+        os.replace(self.part_path, self.path)
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+
+        elapsed = time.monotonic() - started
+        get_logger().log(
+            f"Segmented download: {self._downloaded / 1024 / 1024:.1f} MB in {elapsed:.1f}s "
+            f"over {connections} connections ({len(segments)} segments)"
+        )
+        return self._downloaded
+
+    def _prepare(self, size, resumable):
+        """Preallocates the .part file, or reuses it with the completed segments of a paused run."""
+        if resumable and os.path.exists(self.part_path) and os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('size') == size and os.path.getsize(self.part_path) == size:
+                    self._done = set(state.get('done', []))
+                    self._offsets = {int(start): offset for start, offset in state.get('offsets', {}).items()}
+                    self._downloaded = sum(min(SEGMENT_SIZE, size - start) for start in self._done)
+                    self._downloaded += sum(offset - start for start, offset in self._offsets.items())
+                    get_logger().log(
+                        f"Segmented download resumed at {self._downloaded / 1024 / 1024:.1f} MB "
+                        f"({len(self._done)} segments done)"
+                    )
+                    return
+            except (OSError, ValueError):
+                pass
+        with open(self.part_path, 'wb') as f:
+            if size:
+                f.truncate(size)
+        self._save_state(size)
+
+    def _save_state(self, size):
+        try:
+            with open(self.state_path, 'w', encoding='utf-8') as f:
+                json.dump({'size': size, 'done': sorted(self._done), 'offsets': dict(self._offsets)}, f)
+        except OSError:
+            pass
+
+    def _worker(self, url, pending):
+        connection = _Connection(url)
+        try:
+            with open(self.part_path, 'r+b') as out:
+                while not self._error and not self._cancelled:
+                    try:
+                        segment = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    self._fetch_segment(connection, out, segment)
+        except Exception as e:
+            with self._lock:
+                self._error = self._error or e
+        finally:
+            connection.close()
+
+    def _fetch_segment(self, connection, out, segment):
+        start, end = segment
+        offset = self._offsets.get(start, start) if end is not None else start
+        for attempt in range(SEGMENT_RETRIES + 1):
+            try:
+                headers = {}
+                if end is not None:
+                    headers['Range'] = f'bytes={offset}-{end}'
+                response = connection.get(headers)
+                if response.status not in (200, 206) or (end is not None and response.status != 206 and offset):
+                    response.read()
+                    raise DirectDownloadError(f"HTTP Error {response.status}")
+
+                out.seek(offset)
+                while True:
+                    if not self.should_continue():
+                        self._cancelled = True
+                        return
+                    block = response.read(READ_SIZE)
+                    if not block:
+                        break
+                    if not self.throttle(len(block)):
+                        self._cancelled = True
+                        return
+                    out.write(block)
+                    offset += len(block)
+                    if end is not None:
+                        self._offsets[start] = offset
+                    self._report(len(block))
+
+                if end is not None and offset != end + 1:
+                    raise DirectDownloadError(f"Segment {start}-{end} incomplete at {offset}")
+                out.flush() # On disk before the state file calls it done
+                with self._lock:
+                    self._done.add(start)
+                    self._offsets.pop(start, None)
+                    self._save_state(self.info['size'])
+                return
+            except (OSError, http.client.HTTPException, DirectDownloadError) as e:
+                connection.reset()
+                if attempt == SEGMENT_RETRIES or end is None:
+                    raise
+                get_logger().log(f"Segment {start}-{end} retry {attempt + 1}: {e}")
+                time.sleep(1 + attempt)
+
+    def _report(self, nbytes):
+        with self._lock:
+            self._downloaded += nbytes
+            downloaded = self._downloaded
+        elapsed = time.monotonic() - self._started
+        speed = (downloaded - self._start_bytes) / elapsed if elapsed > 0 else None
+        self.on_progress(downloaded, self.info['size'], speed)
+
+
+def direct_filename(url, probe_info, ext):
+    """File name for a direct download: server supplied name or the URL's last path part."""
+    name = probe_info.get('filename') if probe_info else None
+    if not name:
+        name = unquote(os.path.basename(urlparse(url).path)) or 'download'
+    stem = os.path.splitext(name)[0] or 'download'
+    return sanitize_filename(stem), ext
@@ -0,0 +1,182 @@
+import re
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from PySide6.QtCore import QThread, Signal
+from src.core.logger import get_logger
+from src.core.url_router import route_url
+
+# Query parameters that never change what a link points to
+TRACKING_PARAMS = frozenset((
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'igsh', 'mc_cid', 'mc_eid',
+    'si', 'feature', 'pp', 'ab_channel', 'ref_src', 'ref_url', 'spm', '_ga',
+))
+TRACKING_PREFIXES = ('utm_',)
+# Host prefixes of the same site
+HOST_ALIASES = ('www.', 'm.', 'mobile.')
+
+# YouTube links carry the video id in the URL itself: resolved without the router
+YOUTUBE_DOMAINS = ('youtube.com', 'youtube-nocookie.com')
+YOUTUBE_PATH_PREFIXES = ('/shorts/', '/embed/', '/live/', '/v/', '/e/')
+YOUTUBE_ID = re.compile(r'[0-9A-Za-z_-]{11}')
+YOUTUBE_WATCH_ID = re.compile(r'(?:^|[&;])v=([^&;#]*)')
+
+
+def canonical_url(url):
+    """
+    Normalised form of a link: https, host without www./m., no tracking
+    parameters (utm_*, fbclid, si ...), sorted query, no trailing '/' or fragment.
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    try:
+        parts = urlsplit(url)
+        host = (parts.hostname or '').rstrip('.')
+        port = parts.port
+    except ValueError:
+        return url # Not a URL we can take apart: compared as it is
+    for alias in HOST_ALIASES:
+        if host.startswith(alias):
+            host = host[len(alias):]
+            break
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query = parts.query and sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith(TRACKING_PREFIXES)
+    )
+    # '#!/...' and '#/...' are routes of single page sites, other fragments are anchors
+    fragment = parts.fragment if parts.fragment.startswith(('!', '/')) else ''
+    return urlunsplit(('https', host, parts.path.rstrip('/'), urlencode(query) if query else '', fragment))
+
+
+def youtube_video_id(url):
+    """Video id of a YouTube link (watch, youtu.be, shorts, embed, live; playlist members too), else None."""
+    if '://' not in url:
+        url = 'https://' + url
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or '').rstrip('.')
+    except ValueError:
+        return None
+    path = parts.path
+    if host == 'youtu.be':
+        candidate = path[1:].split('/', 1)[0]
+    elif host in YOUTUBE_DOMAINS or host.endswith(tuple('.' + d for d in YOUTUBE_DOMAINS)):
+        if path.rstrip('/') == '/watch':
+            match = YOUTUBE_WATCH_ID.search(parts.query) # First v= counts, like in yt-dlp
+            candidate = match.group(1) if match else ''
+        elif path.startswith(YOUTUBE_PATH_PREFIXES):
+            candidate = path.split('/', 3)[2]
+        else:
+            return None
+    else:
+        return None
+    return candidate if YOUTUBE_ID.fullmatch(candidate) else None
+
+
+def quick_key(url):
+    """
+    Hash key available without the extractor router: ('Youtube', id) for
+    YouTube links, ('url', canonical_url) for the rest.
+    """
+    video_id = youtube_video_id(url) if 'youtu' in url else None
+    if video_id:
+        return ('Youtube', video_id)
+    return ('url', canonical_url(url))
+
+
+def canonical_key(url):
+    """
+    (extractor, id) of the item a link points to, the key yt-dlp's archive
+    and info cache use. ('url', canonical_url) when the id isn't in the URL.
+    """
+    key = quick_key(url)
+    if key[0] != 'url':
+        return key
+    route = route_url(url.strip())
+    if route.extractor and route.video_id:
+        return (route.extractor, route.video_id)
+    return key
+
+
+class UrlIndex:
+    """
+    Hash index of the batch list: canonical key -> first URL with that key.
+    add() checks the quick key at insert time (O(1) per line, also for large
+    pastes); resolve() adds the extractor key found later by CanonicalWorker.
+    """
+    def __init__(self):
+        self._owners = {}  # key -> URL that holds it
+        self._keys = {}    # URL -> its keys
+        self._lock = threading.Lock()
+
+    def add(self, url):
+        """Registers a URL. Returns the URL already in the list with the same key, else None."""
+        key = quick_key(url)
+        with self._lock:
+            owner = self._owners.get(key)
+            if owner is not None:
+                return owner
+            self._owners[key] = url
+            self._keys[url] = [key]
+            return None
+
+    def resolve(self, url, key):
+        """Adds the extractor key of a listed URL. Returns the URL it duplicates, else None."""
+        with self._lock:
+            keys = self._keys.get(url)
+            if keys is None or key in keys:
+                return None # Removed meanwhile or known already
+            owner = self._owners.get(key)
+            if owner is not None:
+                return owner
+            self._owners[key] = url
+            keys.append(key)
+            return None
+
+    def discard(self, url):
+        with self._lock:
+            for key in self._keys.pop(url, ()):
+                if self._owners.get(key) == url:
+                    del self._owners[key]
+
+    def clear(self):
+        with self._lock:
+            self._owners.clear()
+            self._keys.clear()
+
+    def __contains__(self, url):
+        return url in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class CanonicalWorker(QThread):
+    """
+    Maps the URLs of a paste to (extractor, id) through the URL router in
+    the background, finds duplicates the quick key can't see
+    (e.g. player.vimeo.com/video/1 and vimeo.com/1).
+    """
+    finished = Signal(list)  # [(url, canonical key)] of URLs with an extractor id
+
+    def __init__(self, urls):
+        super().__init__()
+        self.urls = urls
+
+    def run(self):
+        resolved = []
+        for url in self.urls:
+            if self.isInterruptionRequested():
+                break
+            if quick_key(url)[0] != 'url':
+                continue # Extractor key known at insert time
+            try:
+                key = canonical_key(url)
+            except Exception as e:
+                get_logger().debug(f"Canonical key failed ({url}): {e}")
+                continue
+            if key[0] != 'url':
+                resolved.append((url, key))
+        self.finished.emit(resolved)
@@ -0,0 +1,330 @@
+import re
+import threading
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+from src.core.logger import get_logger
+
+try:
+    from gallery_dl import extractor as gallery_extractors
+except ImportError:
+    gallery_extractors = None # Usually shipped as gallery-dl.exe, not as a module
+
+ENGINE_VIDEO = "video"
+ENGINE_GALLERY = "gallery"
+
+# Sites that go to gallery-dl: registrable domains, matched on whole host labels
+GALLERY_DOMAINS = frozenset((
+    'instagram.com',
+    'twitter.com',
+    'x.com',
+    'deviantart.com',
+    'imgur.com',
+    'tiktok.com',
+))
+# Brands with a domain per country (pinterest.com, pinterest.co.uk, pinterest.de ...):
+# the brand has to be the registrable label, followed by a public suffix
+GALLERY_BRANDS = frozenset(('pinterest',))
+# Second-level labels of country suffixes (co.uk, com.br, ne.jp ...)
+SUFFIX_SECOND_LEVELS = frozenset(('co', 'com', 'net', 'org', 'ac', 'gov', 'edu', 'or', 'ne', 'gob'))
+
+# Host labels that say nothing about the site (never used as index keys)
+COMMON_LABELS = frozenset((
+    'www', 'm', 'com', 'net', 'org', 'co', 'tv', 'io', 'me', 'info',
+    'de', 'fr', 'uk', 'jp', 'ru', 'it', 'es', 'br', 'pl', 'nl', 'be', 'cz', 'at', 'ch',
+))
+
+# engine: "video" / "gallery", extractor: yt-dlp extractor key (gallery-dl category
+# for sites only gallery-dl knows), video_id: id yt-dlp will give the item. None if unknown.
+UrlRoute = namedtuple('UrlRoute', 'engine extractor video_id')
+
+HOST_END = re.compile(r'[/?#\\]')
+
+# _VALID_URL scanning
+ESCAPE_OR_CLASS = re.compile(r'\\.|\[(?:\\.|[^\]\\])*\]', re.S)
+VERBOSE_COMMENT = re.compile(r'(?<!\\)#[^\n]*')
+SCHEME_SEPARATOR = re.compile(r'(?<!\\)//|\\/\\/')
+OPTIONAL_PATH_GROUP = re.compile(r'\((?:\?:)?')
+# Pattern that starts with its own scheme (':ytfav', 'ytsearch10:...')
+LEADING_WORD = re.compile(r'(?:\(\?[a-z]+\))?\^?:?([a-z0-9-]+)')
+# Host text that isn't a list of whole labels: 'bili(?:bili|...)', 'tiktokv?', '[^/]+\.' ...
+PARTIAL_LABEL = re.compile(r'[a-z0-9-][(~?*+{]|[a-z0-9-]\)[?*+]?[a-z0-9-]|~[?*+{}\d,]*(?:[a-z0-9-(]|$)')
+LABEL = re.compile(r'[a-z0-9-]+')
+
+
+def url_host(url):
+    """Lowercase host of a URL ('https://' is assumed when the scheme is missing)."""
+    _, sep, rest = url.partition('://')
+    netloc = HOST_END.split(rest if sep else url, 1)[0]
+    return netloc.rpartition('@')[2].split(':')[0].strip().rstrip('.').lower()
+
+
+def _is_public_suffix(labels):
+    """'com', 'de', 'co.uk', 'com.br' ... (a TLD, or a known second level under a country code)."""
+    if len(labels) == 1:
+        return labels[0].isalpha() and len(labels[0]) >= 2
+    if len(labels) == 2:
+        return labels[0] in SUFFIX_SECOND_LEVELS and labels[1].isalpha() and len(labels[1]) == 2
+    return False
+
+
+def is_gallery_host(host):
+    labels = host.split('.')
+    for i in range(len(labels) - 1):
+        if '.'.join(labels[i:]) in GALLERY_DOMAINS:
+            return True
+        if labels[i] in GALLERY_BRANDS and _is_public_suffix(labels[i + 1:]):
+            return True
+    return False
+
+
+def _host_span(src, i):
+    """
+    (start, end) of the host after a '//' of a masked pattern.
+    None if the host doesn't end at a path '/' (or a path is part of a host alternative).
+    """
+    start = i
+    depth = 0
+    opened = None
+    while i < len(src):
+        c = src[i]
+        if i == start and c in '|)':
+            # End of a scheme group such as (?:https?://|//)
+            i = src.find(')', i) + 1
+            if not i:
+                return None
+            start = i
+            continue
+        if c == '\\':
+            i += 2
+            continue
+        if c == '(':
+            if depth == 0:
+                opened = i
+            depth += 1
+        elif c == ')':
+            if depth == 0:
+                return None
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return None
+        elif c == '/':
+            if depth == 0:
+                return start, i
+            if depth == 1 and OPTIONAL_PATH_GROUP.fullmatch(src, opened, i):
+                return start, opened # Optional path after the host: (?:/in)?
+            return None
+        i += 1
+    return None
+
+
+def _host_labels(host):
+    """Whole labels every host matching this (masked) host text has, None if it has partial or wildcard labels."""
+    host = re.sub(r'\s+', '', host.lower())
+    host = re.sub(r'\(\?[!=<][^()]*\)', '', host) # Lookarounds
+    host = re.sub(r'\(\?p<\w+>|\(\?:', '(', host)
+    host = re.sub(r'(?<!\\)\.[*+?]|\\[wdsS]', '~', host)
+    host = host.replace('\\.', '.').replace('\\-', '-').replace('^', '')
+    if PARTIAL_LABEL.search(host):
+        return None
+    return {label for label in LABEL.findall(host) if label not in COMMON_LABELS}
+
+
+def _pattern_hosts(pattern):
+    """
+    Reads the hosts out of one _VALID_URL pattern: (labels, host regexes).
+    labels is None when the hosts have no fixed labels, both are None when the
+    hosts can't be cut out of the pattern, both are empty when it can't match http(s).
+    """
+    word = LEADING_WORD.match(pattern)
+    if word and not 'https://'.startswith(word.group(1)) and not SCHEME_SEPARATOR.search(pattern):
+        return set(), []
+
+    flags = 0
+    if re.match(r'\s*\(\?[a-z]*x', pattern):
+        flags |= re.X
+    if re.match(r'\s*\(\?[a-z]*i', pattern):
+        flags |= re.I
+    # Same length mask, so spans line up with the pattern: char classes and comments can't end a host
+    masked = ESCAPE_OR_CLASS.sub(lambda m: m.group(0) if m.group(0)[0] == '\\' else '~' * len(m.group(0)), pattern)
+    if flags & re.X:
+        masked = VERBOSE_COMMENT.sub(lambda m: ' ' * len(m.group(0)), masked)
+
+    labels, regexes = set(), []
+    for separator in SCHEME_SEPARATOR.finditer(masked):
+        span = _host_span(masked, separator.end())
+        if span is None:
+            return None, None
+        host_labels = _host_labels(masked[span[0]:span[1]])
+        labels = labels | host_labels if labels is not None and host_labels else None
+        text = pattern[span[0]:span[1]]
+        if flags & re.X:
+            text = VERBOSE_COMMENT.sub('', text)
+        regexes.append((text + r'(?=[/?#:]|$)', flags))
+    if not regexes:
+        return None, None
+    return labels, regexes
+
+
+def extractor_hosts(valid_url):
+    """_pattern_hosts for a whole _VALID_URL (a pattern or a list of them)."""
+    patterns = valid_url if isinstance(valid_url, (list, tuple)) else [valid_url]
+    labels, regexes = set(), []
+    for pattern in patterns:
+        if not pattern or not isinstance(pattern, str):
+            return None, None
+        pattern_labels, pattern_regexes = _pattern_hosts(pattern)
+        if pattern_regexes is None:
+            return None, None
+        labels = labels | pattern_labels if labels is not None and pattern_labels is not None else None
+        regexes += pattern_regexes
+    return labels, regexes
+
+
+class ExtractorIndex:
+    """
+    yt-dlp's extractors indexed by the host labels of their _VALID_URL: a URL
+    is tested against the extractors of its host (and the few whose host can't
+    be read from the pattern) instead of all ~1800 in turn. Candidates keep
+    yt-dlp's order, so the result is the extractor yt-dlp itself would pick.
+    Built once, the extractors' own patterns are compiled when first needed.
+    """
+    def __init__(self, extractors):
+        self.extractors = extractors
+        self._by_label = defaultdict(list)
+        self._by_host = []   # (position, host regexes) for hosts with wildcard/partial labels
+        self._always = []    # Tested for every http(s) URL
+        self._matchers = {}  # position -> _VALID_URL matcher, compiled on first use
+        for pos, ie in enumerate(extractors):
+            labels, regexes = extractor_hosts(getattr(ie, '_VALID_URL', None))
+            if regexes is None:
+                self._always.append(pos)
+            elif labels:
+                for label in labels:
+                    self._by_label[label].append(pos)
+            elif regexes:
+                try:
+                    self._by_host.append((pos, [re.compile(text, flags) for text, flags in regexes]))
+                except re.error:
+                    self._always.append(pos)
+        self.host_candidates = lru_cache(maxsize=4096)(self._host_candidates)
+
+    def _host_candidates(self, netloc):
+        """(position, URL matcher) of the extractors that may take URLs of this host, in yt-dlp's order."""
+        candidates = set(self._always)
+        for label in netloc.lower().split(':')[0].split('.'):
+            candidates.update(self._by_label.get(label, ()))
+        for pos, regexes in self._by_host:
+            for regex in regexes:
+                if regex.match(netloc):
+                    candidates.add(pos)
+                    break
+        return tuple((pos, self._url_matcher(pos)) for pos in sorted(candidates))
+
+    def _url_matcher(self, pos):
+        """
+        Plain match of the extractor's _VALID_URL, the cheap part of suitable()
+        (which may refuse more, never accept more). None if there's no pattern.
+        """
+        if pos in self._matchers:
+            return self._matchers[pos]
+        valid_url = getattr(self.extractors[pos], '_VALID_URL', None)
+        match = None
+        try:
+            if isinstance(valid_url, str):
+                match = re.compile(valid_url).match
+            elif isinstance(valid_url, (list, tuple)) and valid_url:
+                patterns = [re.compile(p) for p in valid_url]
+                match = lambda url: any(p.match(url) for p in patterns)
+        except (re.error, TypeError):
+            pass
+        self._matchers[pos] = match
+        return match
+
+    def find(self, url):
+        """The extractor class yt-dlp would use for this URL (Generic as the last resort)."""
+        scheme, sep, rest = url.partition('://')
+        if sep and scheme.lower() in ('http', 'https'):
+            candidates = self.host_candidates(HOST_END.split(rest, 1)[0])
+        else:
+            candidates = self.all_candidates()
+        for pos, match in candidates:
+            if (match is None or match(url)) and self.extractors[pos].suitable(url):
+                return self.extractors[pos]
+        return None
+
+    @lru_cache(maxsize=1)
+    def all_candidates(self):
+        """Every extractor: URLs without a http(s) scheme ('ytsearch:...', schemeless links)."""
+        return tuple((pos, self._url_matcher(pos)) for pos in range(len(self.extractors)))
+
+
+# Global Access
+_index = None
+_index_lock = threading.Lock()
+
+def get_extractor_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            from yt_dlp.extractor import gen_extractor_classes
+            _index = ExtractorIndex(list(gen_extractor_classes()))
+            get_logger().debug(
+                f"URL router: {len(_index.extractors)} extractors, "
+                f"{len(_index._by_label)} host labels, {len(_index._always)} tested for every URL"
+            )
+        return _index
+
+
+def _gallery_category(url):
+    """gallery-dl extractor category for the URL, None if gallery-dl isn't importable or doesn't know it."""
+    if gallery_extractors is None:
+        return None
+    try:
+        found = gallery_extractors.find(url)
+    except Exception:
+        return None
+    return found.category if found else None
+
+
+@lru_cache(maxsize=4096)
+def route_url(url):
+    """
+    Engine, extractor and canonical id of a URL, without any network request:
+    UrlRoute('video', 'Youtube', 'dQw4w9WgXcQ'), UrlRoute('gallery', 'Instagram', 'C1x2y3z4'),
+    UrlRoute('video', 'Generic', None) ...
+    Gallery sites come from the domain table; a site yt-dlp has no extractor
+    for goes to gallery-dl if gallery-dl knows it.
+    """
+    if not url:
+        return UrlRoute(ENGINE_VIDEO, None, None)
+    engine = ENGINE_GALLERY if is_gallery_host(url_host(url)) else ENGINE_VIDEO
+    try:
+        ie = get_extractor_index().find(url)
+    except Exception as e:
+        get_logger().debug(f"URL router failed ({url}): {e}")
+        ie = None
+    if ie is None or ie.ie_key() == 'Generic':
+        category = _gallery_category(url)
+        if category:
+            return UrlRoute(ENGINE_GALLERY, category, None)
+        return UrlRoute(engine, ie and 'Generic', None)
+    try:
+        video_id = ie.get_temp_id(url)
+    except Exception:
+        video_id = None
+    return UrlRoute(engine, ie.ie_key(), str(video_id) if video_id else None)
+
+
+def url_engine(url, resolve=False):
+    """
+    "gallery" or "video" from the domain table, cheap enough for every keystroke.
+    resolve: for a submitted link, sites only an importable gallery-dl knows
+    are looked up too (builds the extractor index on first use).
+    """
+    if not url:
+        return ENGINE_VIDEO
+    if is_gallery_host(url_host(url)):
+        return ENGINE_GALLERY
+    if not resolve or gallery_extractors is None:
+        return ENGINE_VIDEO
+    return route_url(url).engine
@@ -0,0 +1,401 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+import yt_dlp
+from yt_dlp.utils import prepend_extension
+from src.core.logger import get_logger
+from src.core.cookie_jar import get_cookie_cache
+from src.core.download_archive import ArchiveView
+from src.core.mp4_postprocessor import use_single_pass_merger
+
+# Limits
+MAX_IDLE_INSTANCES = 4   # Idle YoutubeDL instances kept for reuse
+IDLE_TIMEOUT = 10 * 60   # Seconds an idle instance is kept
+
+# Options yt-dlp reads at run time: they change per job without a new instance.
+# Everything else (format selector, postprocessors, cookies, network settings)
+# is fixed when YoutubeDL is created and therefore part of the pool key.
+JOB_PARAMS = (
+    'outtmpl', 'paths', 'noplaylist', 'skip_download', 'overwrites',
+    'writesubtitles', 'writeautomaticsub', 'subtitleslangs', 'subtitlesformat', 'embedsubtitles',
+    'download_ranges', 'force_keyframes_at_cuts', 'concurrent_fragment_downloads', 'sleep_interval_requests',
+    'parallel_streams',
+)
+
+# Per job callbacks, routed through the pooled instance's trampolines
+CALLBACK_PARAMS = ('progress_hooks', 'postprocessor_hooks', 'logger')
+
+# Read by the pool itself, never passed to yt-dlp
+# - defer_postprocess: post-processing is recorded and run later (see take_deferred)
+POOL_PARAMS = ('defer_postprocess',)
+
+
+def pool_key(opts):
+    """Key of the option set that is baked into a YoutubeDL instance."""
+    fixed = {k: v for k, v in opts.items() if k not in JOB_PARAMS + CALLBACK_PARAMS + POOL_PARAMS}
+    return json.dumps(fixed, sort_keys=True, default=repr)
+
+
+class StreamAborted(Exception):
+    """Raised in the other streams of a parallel download once one of them failed."""
+
+
+class OrbitYoutubeDL(yt_dlp.YoutubeDL):
+    """
+    YoutubeDL that merges MP4 downloads with OrbitMergerPP (merge + subtitles + faststart in one pass).
+    With 'parallel_streams' the formats of a merge (bestvideo+bestaudio) are downloaded
+    at the same time: yt-dlp's loop downloads them one after the other, here the first
+    call starts the others in threads and the later calls collect their results.
+    Download archive entries carry the final file path; while post-processing is
+    deferred (defer_archive) none are written, the item isn't complete yet.
+    """
+    def __init__(self, params=None, auto_init=True):
+        super().__init__(params, auto_init)
+        self.defer_archive = False # Set by the pool for jobs with deferred post-processing
+        self._filepath = None      # Final file of the item last post-processed
+        self._merge_info = None    # Item being processed when its formats are merged
+        self._stream_jobs = {}     # filename -> background download of a format
+        self._stream_error = None  # Stops the other streams once one of them failed
+        self.add_progress_hook(self._stream_abort_hook)
+
+    def process_info(self, info_dict):
+        if self.params.get('parallel_streams') and len(info_dict.get('requested_formats') or []) > 1:
+            self._merge_info = info_dict
+        try:
+            return super().process_info(info_dict)
+        except StreamAborted:
+            # Reported like yt-dlp reports a failed download, with the error of the failed stream
+            error = self._stream_error
+            self._join_streams()
+            self.report_error(f'unable to download video data: {error}')
+        finally:
+            self._merge_info = None
+            self._join_streams()
+
+    def dl(self, name, info, subtitle=False, test=False):
+        job = self._stream_jobs.pop(name, None)
+        if job:
+            return self._collect_stream(job)
+        merge_info = self._merge_info
+        if merge_info and not subtitle and not test and name != '-' and 'requested_formats' not in info:
+            self._merge_info = None # First format of the item, the others start now
+            self._start_streams(name, info, merge_info)
+        return super().dl(name, info, subtitle, test)
+
+    def post_process(self, filename, info, files_to_move=None):
+        use_single_pass_merger(self, info)
+        info = super().post_process(filename, info, files_to_move)
+        self._filepath = info.get('filepath')
+        return info
+
+    def record_download_archive(self, info_dict):
+        if self.defer_archive:
+            return # DownloadTask records the item once its merge / conversion succeeded
+        archive = self.params.get('download_archive')
+        if isinstance(archive, ArchiveView):
+            archive.add(self._make_archive_id(info_dict), path=info_dict.get('filepath') or self._filepath)
+            return
+        super().record_download_archive(info_dict)
+
+    def _start_streams(self, name, info, merge_info):
+        formats = merge_info['requested_formats']
+        # yt-dlp names the format files prepend_extension(correct_ext(<name>, ext), f<format_id>),
+        # in the order of requested_formats: the first one gives the common stem
+        suffix = f".f{formats[0]['format_id']}.{info['ext']}"
+        if info.get('format_id') != formats[0]['format_id'] or not name.endswith(suffix):
+            return
+        base = name[:-len(suffix)]
+        self._stream_error = None
+        for f in formats[1:]:
+            new_info = {k: v for k, v in merge_info.items() if k != 'requested_formats'}
+            new_info.update(f)
+            filename = prepend_extension(f"{base}.{new_info['ext']}", f"f{f['format_id']}", new_info['ext'])
+            job = {'result': None, 'error': None}
+            job['thread'] = threading.Thread(target=self._stream_worker, args=(filename, new_info, job),
+                                             name="stream", daemon=True)
+            self._stream_jobs[filename] = job
+            job['thread'].start()
+        get_logger().log(f"Parallel streams: {len(formats)} formats downloading at once ({merge_info.get('id')})")
+
+    def _stream_worker(self, name, info, job):
+        try:
+            job['result'] = super().dl(name, info)
+        except BaseException as e:
+            job['error'] = e
+            self._stream_error = self._stream_error or e
+
+    def _collect_stream(self, job):
+        job['thread'].join()
+        if job['error']:
+            raise job['error']
+        return job['result']
+
+    def _join_streams(self):
+        """Streams yt-dlp didn't collect (the item failed): stopped at their next block and waited for."""
+        jobs, self._stream_jobs = list(self._stream_jobs.values()), {}
+        if jobs:
+            self._stream_error = self._stream_error or StreamAborted("Stream download aborted")
+        for job in jobs:
+            job['thread'].join()
+        self._stream_error = None
+
+    def _stream_abort_hook(self, d):
+        # Runs in every stream of the item: the first failure ends the others too
+        if self._stream_error is not None:
+            raise StreamAborted(str(self._stream_error))
+
+
+class PooledYoutubeDL:
+    """
+    A YoutubeDL instance that outlives a single job.
+    Hooks and logger are fixed at creation, so they forward to the callbacks
+    of the job currently holding the instance.
+    """
+    def __init__(self, key, opts):
+        self.key = key
+        self.progress_hooks = []
+        self.postprocessor_hooks = []
+        self.logger = None
+        self.last_used = time.monotonic()
+        self.deferred = [] # (filename, info, files_to_move) per downloaded file
+        self.held = False  # Checked out by a DeferredPostProcess after its job's session
+
+        params = {k: v for k, v in opts.items() if k not in CALLBACK_PARAMS + POOL_PARAMS}
+        params['progress_hooks'] = [self._progress_hook]
+        params['postprocessor_hooks'] = [self._postprocessor_hook]
+        params['logger'] = self
+        browser = params.pop('cookiesfrombrowser', None)
+        self.ydl = OrbitYoutubeDL(params)
+        if browser:
+            # Session wide jar instead of reading and decrypting the browser database per instance
+            try:
+                self.ydl.__dict__['cookiejar'] = get_cookie_cache().get(browser)
+            except Exception:
+                self.ydl.close()
+                raise
+
+    def attach(self, opts):
+        """Prepares the instance for a job: its run time options and callbacks."""
+        params = self.ydl.params
+        for key in JOB_PARAMS:
+            params.pop(key, None)
+        params.update({k: v for k, v in opts.items() if k in JOB_PARAMS})
+        self.ydl._parse_outtmpl() # Normalises outtmpl to yt-dlp's dict form
+
+        # Per job counters (max_downloads, return code)
+        self.ydl._num_downloads = 0
+        self.ydl._download_retcode = 0
+
+        self.progress_hooks = list(opts.get('progress_hooks', []))
+        self.postprocessor_hooks = list(opts.get('postprocessor_hooks', []))
+        self.logger = opts.get('logger')
+
+        self.deferred = []
+        self.held = False
+        self.ydl.defer_archive = bool(opts.get('defer_postprocess'))
+        self.ydl._filepath = None
+        if opts.get('defer_postprocess'):
+            # yt-dlp calls post_process once per downloaded file, right after the download
+            self.ydl.post_process = self._defer_post_process
+        else:
+            self.ydl.__dict__.pop('post_process', None)
+
+    def detach(self):
+        self.progress_hooks = []
+        self.postprocessor_hooks = []
+        self.logger = None
+        self.deferred = []
+        self.held = False
+        self.ydl.defer_archive = False
+        self.ydl.__dict__.pop('post_process', None)
+        self.last_used = time.monotonic()
+
+    def _defer_post_process(self, filename, info, files_to_move=None):
+        """Records the merge / conversion of a downloaded file instead of running it."""
+        info['filepath'] = filename
+        self.deferred.append((filename, info, files_to_move))
+        return info
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception as e:
+            get_logger().error(f"YoutubeDL close error: {e}")
+
+    # Trampolines
+    def _progress_hook(self, d):
+        for hook in self.progress_hooks:
+            hook(d)
+
+    def _postprocessor_hook(self, d):
+        for hook in self.postprocessor_hooks:
+            hook(d)
+
+    # Logger interface (yt-dlp 'logger' param)
+    def debug(self, msg):
+        if self.logger:
+            self.logger.debug(msg)
+
+    def info(self, msg):
+        if self.logger:
+            self.logger.info(msg)
+
+    def warning(self, msg):
+        if self.logger:
+            self.logger.warning(msg)
+
+    def error(self, msg):
+        if self.logger:
+            self.logger.error(msg)
+
+
+class YoutubeDLPool:
+    """
+    Session wide pool of YoutubeDL instances keyed by their effective options.
+    A reused instance keeps its extractor instances (player JS cache), cookie jar
+    and open HTTP connections, so a batch from one site pays the setup once.
+    An instance is used by one job at a time.
+    """
+    def __init__(self, max_idle=MAX_IDLE_INSTANCES, idle_timeout=IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = [] # Most recently used last
+        self._in_use = {} # id(ydl) -> PooledYoutubeDL checked out by a job
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    @contextmanager
+    def session(self, opts):
+        """
+        with get_ydl_pool().session(opts) as ydl: ...
+        The instance goes back to the pool when the block succeeds; after an
+        error it is closed, so a broken connection or cookie state isn't reused.
+        """
+        pooled = self._acquire(opts)
+        with self._lock:
+            self._in_use[id(pooled.ydl)] = pooled
+        try:
+            yield pooled.ydl
+        except BaseException:
+            self._forget(pooled)
+            pooled.detach()
+            pooled.close()
+            raise
+        else:
+            if not pooled.held:
+                self._forget(pooled)
+                self._release(pooled)
+
+    def take_deferred(self, ydl):
+        """
+        Post-processing a 'defer_postprocess' job recorded on this instance, None if there is none.
+        The instance stays with the job (its hooks still report to it) until
+        the returned DeferredPostProcess is released.
+        """
+        with self._lock:
+            pooled = self._in_use.get(id(ydl))
+        if pooled is None or not pooled.deferred:
+            return None
+        pooled.held = True
+        return DeferredPostProcess(self, pooled)
+
+    def _forget(self, pooled):
+        with self._lock:
+            self._in_use.pop(id(pooled.ydl), None)
+
+    def _acquire(self, opts):
+        key = pool_key(opts)
+        pooled = None
+        expired = []
+        now = time.monotonic()
+        with self._lock:
+            for item in list(self._idle):
+                if now - item.last_used > self.idle_timeout:
+                    self._idle.remove(item)
+                    expired.append(item)
+            for item in reversed(self._idle):
+                if item.key == key:
+                    self._idle.remove(item)
+                    pooled = item
+                    self.reused += 1
+                    break
+        for item in expired:
+            item.close()
+
+        if pooled is None:
+            pooled = PooledYoutubeDL(key, opts)
+            with self._lock:
+                self.created += 1
+            get_logger().log(f"YoutubeDL pool: new instance ({self.created} created, {self.reused} reused)")
+        pooled.attach(opts)
+        return pooled
+
+    def _release(self, pooled):
+        pooled.detach()
+        evicted = []
+        with self._lock:
+            self._idle.append(pooled)
+            while len(self._idle) > self.max_idle:
+                evicted.append(self._idle.pop(0))
+        for item in evicted:
+            item.close()
+
+    def close_all(self):
+        """Closes idle instances (app exit)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for item in idle:
+            item.close()
+
+
+class DeferredPostProcess:
+    """
+    Merge / conversion / tagging steps yt-dlp would have run right after a
+    download, run later by the post-processing stage on the same instance.
+    """
+    def __init__(self, pool, pooled):
+        self.pool = pool
+        self.pooled = pooled
+        self.files = [item[0] for item in pooled.deferred]
+        # Postprocessor runs, for stage progress (merger / fixups + the configured ones)
+        ydl = pooled.ydl
+        self.steps = sum(len(info.get('__postprocessors') or []) + len(ydl._pps['post_process'])
+                         for _, info, _ in pooled.deferred)
+
+    def run(self, should_continue=None):
+        """Runs the recorded steps. Returns the final file paths."""
+        ydl = self.pooled.ydl
+        ydl.__dict__.pop('post_process', None)
+        paths = []
+        for filename, info, files_to_move in self.pooled.deferred:
+            if should_continue and not should_continue():
+                raise Exception("İndirme kullanıcı tarafından iptal edildi.")
+            info = ydl.post_process(filename, info, files_to_move)
+            paths.append(info.get('filepath') or filename)
+        return paths
+
+    def release(self, ok=True):
+        """Gives the instance back to the pool (closed after a failure)."""
+        pooled, self.pooled = self.pooled, None
+        if pooled is None:
+            return
+        self.pool._forget(pooled)
+        if ok:
+            self.pool._release(pooled)
+        else:
+            pooled.detach()
+            pooled.close()
+
+
+# Global Access
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_ydl_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = YoutubeDLPool()
+        return _pool
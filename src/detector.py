@@ -1,38 +1,17 @@
-from urllib.parse import urlparse
+from src.core.url_router import url_engine
 
-def get_url_type(url: str) -> str:
+def get_url_type(url: str, resolve: bool = False) -> str:
     """
     Detects if the URL is for a gallery (Instagram, Pinterest, etc.) or video.
     Returns "gallery" or "video".
+    Host labels are matched against the router's domain table, so
+    'notinstagram.com' stays a video site (see src.core.url_router).
+    resolve=True (submitted links only) also asks the extractor router.
     """
     if not url:
         return "video"
-    
+
     try:
-        # Normalize and extract domain
-        if not url.startswith('http'):
-            url = 'https://' + url
-            
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        gallery_domains = [
-            'instagram.com', 
-            'pinterest.', 
-            'twitter.com', 
-            'x.com', 
-            'deviantart.com', 
-            'imgur.com',
-            'tiktok.com' # TikTok can be both, but user list puts it in gallery usually? 
-                         # Wait, prompt list: Instagram, Pinterest, Twitter/X, DeviantArt, Imgur.
-                         # YouTube, Twitch, Vimeo -> Video.
-                         # TikTok is often video but can be images. Let's stick to prompt list.
-        ]
-        
-        if any(d in domain for d in gallery_domains):
-            return "gallery"
-            
-        return "video"
-        
+        return url_engine(url.strip(), resolve)
     except Exception:
         return "video"
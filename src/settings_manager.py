@@ -14,3 +14,14 @@ def get_default_download_folder():
     Returns the centralized path for default downloads.
     """
     return os.path.join(os.path.expanduser("~"), "Desktop", "Orbit İndirilenler")
+
+def get_app_data_dir():
+    """
+    Returns the Orbit data directory (created if missing).
+    Path: %APPDATA%/Orbit
+    """
+    base = os.getenv('APPDATA') or os.path.expanduser("~")
+    path = os.path.join(base, "Orbit")
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
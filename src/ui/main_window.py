@@ -8,7 +8,7 @@ from PySide6.QtGui import QDesktopServices
 from qfluentwidgets import FluentWindow, NavigationItemPosition, FluentIcon as FIF, setTheme, Theme, InfoBar, InfoBarPosition, PushButton
 import os
 import subprocess
-from src.settings_manager import get_settings, get_default_download_folder
+from src.settings_manager import get_settings
 from src.version import VERSION
 from src.core.app_updater import AppUpdateManager
 
@@ -49,6 +49,9 @@ class MainWindow(FluentWindow):
         from PySide6.QtCore import QTimer
         QTimer.singleShot(100, self.center_window)
 
+        # Remove stale partial downloads (background)
+        QTimer.singleShot(5000, self.clean_incomplete_downloads)
+
     def customize_title_bar(self):
         # Set a standard slim height
         bar_height = 32
@@ -194,29 +197,26 @@ class MainWindow(FluentWindow):
             self.converter_view.stop_workers()
             
         from src.utils import kill_external_processes
+        from src.core.ydl_pool import get_ydl_pool
+        from src.core.host_pacer import get_host_pacer
+        from src.core.postprocess_pool import get_postprocess_pool
+        get_postprocess_pool().shutdown()
         kill_external_processes()
-        self.clean_incomplete_downloads()
+        get_ydl_pool().close_all()
+        get_host_pacer().save()
+        # Partial files are kept: paused / queued jobs resume from them
         super().closeEvent(event)
 
     def clean_incomplete_downloads(self):
         """
-        Deletes .part, .ytdl and temporary files from the download folder.
+        Runs the partial file janitor (background thread): stale partial files
+        the job store recorded for failed / cancelled jobs are removed by age
+        and total size. Paused / queued jobs keep theirs.
         """
         try:
-            settings = get_settings()
-            default_path = get_default_download_folder()
-            download_folder = settings.value("download_folder", default_path)
-            
-            if os.path.exists(download_folder):
-                for fname in os.listdir(download_folder):
-                    # Check for temporary extensions
-                    if fname.endswith(('.part', '.ytdl', '.temp', '.lock')):
-                        full_path = os.path.join(download_folder, fname)
-                        try:
-                            if os.path.isfile(full_path):
-                                os.remove(full_path)
-                                print(f"Temizlendi: {fname}")
-                        except Exception as e:
-                            print(f"Silme hatası ({fname}): {e}")
+            from src.core.partial_files import PartialJanitor
+            store = getattr(self.home_view, 'job_store', None)
+            if store:
+                PartialJanitor(store).run_async()
         except Exception as e:
             print(f"Temizlik hatası: {e}")
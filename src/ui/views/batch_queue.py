@@ -0,0 +1,147 @@
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from qfluentwidgets import FluentIcon
+
+# Row icon per job state (scheduler / job store states, 'pending' = not queued yet)
+STATE_ICONS = {
+    'pending': FluentIcon.DATE_TIME,
+    'queued': FluentIcon.DATE_TIME,
+    'waiting': FluentIcon.SYNC,
+    'running': FluentIcon.SYNC,
+    'processing': FluentIcon.SYNC,
+    'finished': FluentIcon.ACCEPT,
+    'failed': FluentIcon.CANCEL,
+    'cancelled': FluentIcon.CANCEL,
+    'paused': FluentIcon.PAUSE,
+}
+
+UrlRole = Qt.UserRole
+JobIdRole = Qt.UserRole + 1
+StateRole = Qt.UserRole + 2
+
+
+class BatchQueueModel(QAbstractListModel):
+    """
+    Rows of the batch list: URL, job id (once queued) and job state.
+    Texts ("12. https://...") and icons are produced when the view paints a
+    row, so numbering needs no rewrite after a delete and only visible rows
+    cost anything. A job's row is found through a dict: a state change
+    repaints that single row.
+    The JobStore stays the record of the queue: rows are loaded from its
+    records (append_jobs) and follow the scheduler's state changes, which
+    the store receives too. Pasted links aren't jobs yet, so the rows are
+    kept here rather than read from SQLite on every paint.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._urls = []
+        self._job_ids = []
+        self._states = []
+        self._rows = {}   # job id -> row
+        self._icons = {}  # state -> QIcon, built once
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._urls)
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        if not index.isValid() or row >= len(self._urls):
+            return None
+        if role == Qt.DisplayRole:
+            return f"{row + 1}. {self._urls[row]}"
+        if role == Qt.DecorationRole:
+            return self._icon(self._states[row])
+        if role in (UrlRole, Qt.ToolTipRole):
+            return self._urls[row]
+        if role == JobIdRole:
+            return self._job_ids[row]
+        if role == StateRole:
+            return self._states[row]
+        return None
+
+    def _icon(self, state):
+        icon = self._icons.get(state)
+        if icon is None:
+            icon = self._icons[state] = STATE_ICONS.get(state, FluentIcon.DATE_TIME).icon()
+        return icon
+
+    # --- Rows ---
+
+    def urls(self):
+        return list(self._urls)
+
+    def append_urls(self, urls, state='pending'):
+        """Adds rows in one insert (a large paste is a single model update)."""
+        if not urls:
+            return
+        first = len(self._urls)
+        self.beginInsertRows(QModelIndex(), first, first + len(urls) - 1)
+        self._urls.extend(urls)
+        self._job_ids.extend([None] * len(urls))
+        self._states.extend([state] * len(urls))
+        self.endInsertRows()
+
+    def append_jobs(self, records):
+        """Rows for JobStore records (id, url, state), in one insert."""
+        if not records:
+            return
+        first = len(self._urls)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        for row, record in enumerate(records, first):
+            self._urls.append(record['url'])
+            self._job_ids.append(record['id'])
+            self._states.append(record['state'])
+            self._rows[record['id']] = row
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """Removes the given rows (any order), contiguous runs go out in one step."""
+        rows = sorted(set(r for r in rows if 0 <= r < len(self._urls)), reverse=True)
+        if not rows:
+            return
+        start = end = rows[0]
+        for row in rows[1:] + [None]:
+            if row is not None and row == start - 1:
+                start = row
+                continue
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self._urls[start:end + 1]
+            del self._job_ids[start:end + 1]
+            del self._states[start:end + 1]
+            self.endRemoveRows()
+            start = end = row
+        self._rows = {job_id: row for row, job_id in enumerate(self._job_ids) if job_id is not None}
+
+    def clear(self):
+        self.beginResetModel()
+        self._urls, self._job_ids, self._states = [], [], []
+        self._rows = {}
+        self.endResetModel()
+
+    # --- Jobs ---
+
+    def set_job(self, row, job_id, state='queued'):
+        """Binds a row to the job it was queued as."""
+        old = self._job_ids[row]
+        if old is not None:
+            self._rows.pop(old, None)
+        self._job_ids[row] = job_id
+        self._rows[job_id] = row
+        self._set_row_state(row, state)
+
+    def row_of_job(self, job_id):
+        return self._rows.get(job_id)
+
+    def set_state(self, job_id, state):
+        """O(1): looks up the job's row and repaints it."""
+        row = self._rows.get(job_id)
+        if row is not None:
+            self._set_row_state(row, state)
+
+    def _set_row_state(self, row, state):
+        if self._states[row] == state:
+            return
+        self._states[row] = state
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole, StateRole])
@@ -8,6 +8,7 @@ from qfluentwidgets import (TitleLabel, BodyLabel, LineEdit, PushButton,
                             ListWidget, CardWidget, StrongBodyLabel, SubtitleLabel)
 
 from src.core.converter_worker import ConverterWorker, MediaInfoWorker
+from src.core.progress import format_event
 from src.version import VERSION
 from src.settings_manager import get_settings, get_default_download_folder
 
@@ -481,12 +482,16 @@ class ConverterView(QWidget):
         self.status_label.setText("Dönüştürücü başlatılıyor...")
         
         self.worker = ConverterWorker(input_path, output_path, opts)
-        self.worker.progress.connect(self.progress_bar.setValue)
+        self.worker.progress.connect(self.on_progress)
         self.worker.log.connect(self.status_label.setText)
         self.worker.error.connect(self.on_error)
         self.worker.finished.connect(self.on_finished)
         self.worker.start()
 
+    def on_progress(self, event):
+        self.progress_bar.setValue(int(event.percent))
+        self.status_label.setText(format_event(event))
+
     def on_error(self, msg):
         self.set_ui_busy(False)
         self.status_label.setText("Hata oluştu.")
@@ -1,7 +1,8 @@
 import os
 import subprocess
+import threading
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QButtonGroup, 
-                               QApplication, QStackedWidget, QListWidgetItem, QListWidget, QMenu)
+                               QApplication, QStackedWidget, QListView, QAbstractItemView, QMenu)
 from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtGui import QAction, QCursor
 
@@ -14,14 +15,23 @@ from PySide6.QtCore import QDate
 from src.version import VERSION
 
 # Import Core Logic
-from src.core.downloader import DownloadWorker
-from src.core.gallery_worker import GalleryWorker
+from src.core.scheduler import DownloadScheduler, DEFAULT_MAX_CONCURRENT, DEFAULT_MAX_PER_HOST
+from src.core.job_store import JobStore
+from src.core.progress import format_event
+from src.core.partial_files import partial_files_for, remove_files
+from src.core.metadata_prefetch import PrefetchWorker, describe_formats
+from src.core.url_canonical import UrlIndex, CanonicalWorker
+from src.ui.views.batch_queue import BatchQueueModel
 from src.detector import get_url_type
 from src.settings_manager import get_settings, get_default_download_folder
 from src.core.history_manager import history_manager
 from src.core.updater import AutoUpdater
 
 
+# Quiet period after the last keystroke before a pasted link is prefetched
+PREFETCH_DELAY_MS = 600
+
+
 class PlaylistDialog(MessageBoxBase):
     """ Custom Dialog for Playlist Selection """
     def __init__(self, parent=None):
@@ -63,6 +73,42 @@ class PlaylistDialog(MessageBoxBase):
         self.result_mode = None
         self.reject()
 
+class PausedJobsDialog(MessageBoxBase):
+    """ Lists paused downloads: resume, discard (deletes partial files) or decide later """
+    MAX_LISTED = 8
+
+    def __init__(self, records, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("Duraklatılmış İndirmeler", self)
+        
+        lines = [f"• {r.get('title') or r['url']}" for r in records[:self.MAX_LISTED]]
+        if len(records) > self.MAX_LISTED:
+            lines.append(f"... ve {len(records) - self.MAX_LISTED} indirme daha")
+        self.contentLabel = BodyLabel(
+            f"{len(records)} indirme yarım kaldı. Kaldığı yerden devam ettirilebilir:\n\n" + "\n".join(lines), self)
+        self.contentLabel.setWordWrap(True)
+        
+        self.yesButton.setText("Devam Et")
+        self.cancelButton.setText("Sonra")
+        
+        self.discardButton = PushButton("Sil", self)
+        self.buttonLayout.insertWidget(1, self.discardButton)
+        
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(self.contentLabel)
+        
+        self.yesButton.clicked.disconnect()
+        self.cancelButton.clicked.disconnect()
+        self.yesButton.clicked.connect(lambda: self._finish('resume'))
+        self.discardButton.clicked.connect(lambda: self._finish('discard'))
+        self.cancelButton.clicked.connect(self.reject)
+        
+        self.result_mode = None # 'resume', 'discard' or None (later)
+
+    def _finish(self, mode):
+        self.result_mode = mode
+        self.accept()
+
 class HomeView(QWidget):
     """
     Dashboard View:
@@ -161,11 +207,18 @@ class HomeView(QWidget):
         self.url_input.setClearButtonEnabled(True)
         self.input_stack.addWidget(self.url_input)
         
-        # B. Multi Line (List)
-        self.batch_list = QListWidget(self)
+        # B. Multi Line (List): view over the batch queue model, only visible rows are drawn
+        self.batch_model = BatchQueueModel(self)
+        self.batch_list = QListView(self)
+        self.batch_list.setModel(self.batch_model)
+        self.batch_list.setUniformItemSizes(True) # No per-row size query (10k+ rows)
+        self.batch_list.setLayoutMode(QListView.Batched) # Long lists are laid out in steps between events
+        self.batch_list.setBatchSize(500)
+        self.batch_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.batch_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.batch_list.setAlternatingRowColors(False) 
         self.batch_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #202020;
                 border: 1px solid #404040;
                 border-radius: 6px;
@@ -173,12 +226,12 @@ class HomeView(QWidget):
                 font-size: 12px;
                 outline: none;
             }
-            QListWidget::item {
+            QListView::item {
                 height: 30px;
                 padding-left: 8px;
                 border-bottom: 1px solid #2d2d2d;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #0078d4;
                 color: white;
             }
@@ -214,6 +267,14 @@ class HomeView(QWidget):
         
         self.form_layout.addLayout(self.input_layout)
 
+        # Prefetched title / resolutions of the pasted link
+        self.prefetch_label = CaptionLabel("", self)
+        self.prefetch_label.setAlignment(Qt.AlignCenter)
+        self.prefetch_label.setTextColor("#a0a0a0", "#a0a0a0")
+        self.prefetch_label.setWordWrap(True)
+        self.prefetch_label.hide()
+        self.form_layout.addWidget(self.prefetch_label)
+
         # 2.5 Format Selection
         self.radio_layout = QHBoxLayout()
         self.radio_layout.setSpacing(20) 
@@ -504,13 +565,25 @@ class HomeView(QWidget):
         # Init options based on default MP4 (Must be called after all widgets are created)
         self.update_format_options()
 
-        # Worker Reference
-        self.worker = None
-
-        # Batch Queue State
-        self.download_queue = []
+        # Persistent Queue (Resumed after crash / close)
+        try:
+            self.job_store = JobStore()
+        except Exception as e:
+            print(f"Kuyruk veritabanı açılamadı: {e}")
+            self.job_store = None
+
+        # Concurrent Job Scheduler
+        self.scheduler = DownloadScheduler(store=self.job_store, parent=self)
+        self.scheduler.job_started.connect(self.on_job_started)
+        self.scheduler.job_progress.connect(self.on_job_progress)
+        self.scheduler.job_log.connect(self.on_job_log)
+        self.scheduler.job_event.connect(self.on_job_event)
+        self.scheduler.job_finished.connect(self.on_job_finished)
+        self.scheduler.job_failed.connect(self.on_job_failed)
+        self.scheduler.all_finished.connect(self.on_all_finished)
+
+        # Batch Queue State (job id -> row lives in batch_model)
         self.total_batch_count = 0
-        self.current_batch_index = 0
         self.is_batch_mode = False
 
         # Auto Updater
@@ -523,11 +596,30 @@ class HomeView(QWidget):
         # Trigger update check after 2 seconds
         QTimer.singleShot(2000, self.updater.check_and_update)
 
+        # Continue jobs left unfinished by the previous session
+        QTimer.singleShot(1500, self.resume_unfinished_jobs)
+        # Offer the jobs the user paused
+        QTimer.singleShot(2500, self.show_paused_jobs)
+
         # Connect URL Change for Dynamic Mode
         self.url_input.textChanged.connect(self.on_url_changed)
 
+        # Metadata prefetch: starts once typing / pasting settles, the download reuses the result
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.setInterval(PREFETCH_DELAY_MS)
+        self.prefetch_timer.timeout.connect(self.start_prefetch)
+        self.prefetch_workers = [] # Kept until their thread ends
+        self.prefetched_url = None
+
+        # Batch list duplicates: canonical key index + background extractor lookups
+        self.batch_index = UrlIndex()
+        self.canonical_workers = []
+
     def on_url_changed(self, text):
         """Detects URL type and switches UI mode."""
+        self.prefetch_timer.start() # Restarted on every keystroke
+        self.prefetch_label.setVisible(bool(self.prefetch_label.text()) and text.strip() == self.prefetched_url)
         if not text:
             # Reset to default if empty
             # But maybe keep last state? No, default to Video makes sense.
@@ -580,6 +672,29 @@ class HomeView(QWidget):
             self.download_btn.setText("Analiz Et ve İndir")
             self.status_label.setText("İndirmeye hazır.")
 
+    def start_prefetch(self):
+        """Resolves the pasted link's metadata in the background (single video links)."""
+        url = self.url_input.text().strip()
+        if self.is_batch_mode or not url.startswith("http") or url == self.prefetched_url:
+            return
+        if get_url_type(url) != "video":
+            return
+        self.prefetched_url = url
+        self.prefetch_label.setText("")
+        self.prefetch_workers = [w for w in self.prefetch_workers if w.isRunning()]
+        worker = PrefetchWorker(url, get_settings().value("browser_cookies", "disabled"))
+        worker.finished.connect(self.on_prefetch_finished)
+        self.prefetch_workers.append(worker)
+        worker.start()
+
+    def on_prefetch_finished(self, url, summary):
+        if url != self.url_input.text().strip():
+            return # Link changed meanwhile
+        text = describe_formats(summary)
+        if text:
+            self.prefetch_label.setText(text)
+            self.prefetch_label.show()
+
     def on_update_started(self):
         self.status_label.setText("İndirme motoru güncelleniyor...")
 
@@ -649,42 +764,59 @@ class HomeView(QWidget):
         menu.exec(QCursor.pos())
 
     def delete_selected_item(self):
-        # Remove selected items
-        for item in self.batch_list.selectedItems():
-            self.batch_list.takeItem(self.batch_list.row(item))
-            
-        # Re-number items to keep them clean (1. 2. 3...)
-        self.renumber_list()
+        # Remove selected rows (numbers are drawn from the row, nothing to renumber)
+        selected = self.batch_list.selectionModel().selectedRows()
+        for index in selected:
+            self.batch_index.discard(index.data(Qt.UserRole))
+        self.batch_model.remove_rows([index.row() for index in selected])
 
     def clear_batch_list(self):
-        self.batch_list.clear()
-
-    def renumber_list(self):
-        for i in range(self.batch_list.count()):
-            item = self.batch_list.item(i)
-            text = item.text()
-            # If text has prefix like "1. https...", split and re-add
-            parts = text.split(" ", 1)
-            if len(parts) > 1:
-                clean_text = parts[1]
-                item.setText(f"{i+1}. {clean_text}")
+        self.batch_model.clear()
+        self.batch_index.clear()
 
     def paste_clipboard(self):
         text = QApplication.clipboard().text()
         if text:
             if self.is_batch_mode:
-                # Add to ListWidget
+                # Add to the batch queue, duplicates of listed links are collapsed on insert
                 lines = [line.strip() for line in text.splitlines() if line.strip()]
-                start_idx = self.batch_list.count() + 1
-                
-                for i, line in enumerate(lines):
-                    # Item with Icon
-                    item_text = f"{start_idx + i}. {line}"
-                    item = QListWidgetItem(FluentIcon.DATE_TIME.icon(), item_text) # Clock icon for waiting
-                    self.batch_list.addItem(item)
+                added = [line for line in lines if self.batch_index.add(line) is None]
+                self.batch_model.append_urls(added)
+
+                skipped = len(lines) - len(added)
+                if skipped:
+                    self._show_duplicates_info(f"{skipped} yinelenen bağlantı listeye eklenmedi.")
+                if added:
+                    # Same video under another link form (e.g. player.vimeo.com/video/1): found by the URL router
+                    self.canonical_workers = [w for w in self.canonical_workers if w.isRunning()]
+                    worker = CanonicalWorker(added)
+                    worker.finished.connect(self.on_canonical_finished)
+                    self.canonical_workers.append(worker)
+                    worker.start()
             else:
                 self.url_input.setText(text)
 
+    def on_canonical_finished(self, resolved):
+        duplicates = {url for url, key in resolved if self.batch_index.resolve(url, key) is not None}
+        if not duplicates or self.scheduler.is_busy():
+            return # Rows of a running batch are mapped to jobs: left as they are
+        rows = [row for row, url in enumerate(self.batch_model.urls()) if url in duplicates]
+        for url in duplicates:
+            self.batch_index.discard(url)
+        self.batch_model.remove_rows(rows)
+        self._show_duplicates_info(f"{len(duplicates)} yinelenen bağlantı listeden kaldırıldı.")
+
+    def _show_duplicates_info(self, content):
+        InfoBar.info(
+            title='Yinelenen Bağlantılar',
+            content=content,
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=3000,
+            parent=self
+        )
+
     def update_gallery_ui(self):
         # 1. Update Range UI
         mode = self.range_mode_combo.currentIndex()
@@ -755,7 +887,7 @@ class HomeView(QWidget):
             return
 
         # 0.1 Check if already running -> Cancel
-        if self.worker and self.worker.isRunning(): 
+        if self.scheduler.is_busy():
              self.cancel_download()
              return
 
@@ -763,17 +895,7 @@ class HomeView(QWidget):
         urls_to_process = []
         
         if self.is_batch_mode:
-            # Read from ListWidget
-            for i in range(self.batch_list.count()):
-                item = self.batch_list.item(i)
-                # Extract URL (Remove "1. " prefix)
-                # Format: "12. https://..."
-                text = item.text()
-                parts = text.split(" ", 1)
-                if len(parts) > 1:
-                    urls_to_process.append(parts[1])
-                else:
-                    urls_to_process.append(text)
+            urls_to_process = self.batch_model.urls()
         else:
             url = self.url_input.text().strip()
             if url:
@@ -791,72 +913,151 @@ class HomeView(QWidget):
             )
             return
 
-        # 2. Init Queue
-        self.download_queue = urls_to_process
-        self.total_batch_count = len(urls_to_process)
-        self.current_batch_index = 0
+        # 2. Snapshot options once (same options for every item in the batch)
+        modes = [get_url_type(u, resolve=True) for u in urls_to_process]
+        video_opts = None
+        gallery_opts = None
         
-        # 3. Start Queue Processing
-        self.set_ui_busy(True)
-        self.process_queue()
-
-    def process_queue(self):
-        """Picks the next URL from queue and starts worker."""
-        if not self.download_queue:
-            # Queue Finished!
-            self.on_all_finished()
-            return
+        if "video" in modes:
+            video_opts = self._collect_video_options()
+            if video_opts is None: # Validation failed
+                return
+        if "gallery" in modes:
+            gallery_opts = self._collect_gallery_options()
+
+        # 3. Build Jobs
+        self.scheduler.clear()
+        if self.job_store:
+            self.job_store.purge_done()
+        self.scheduler.set_limits(*self._get_concurrency_limits())
+        
+        for row, (url, mode) in enumerate(zip(urls_to_process, modes)):
+            if mode == "gallery":
+                job_id = self.scheduler.add_job(url, "gallery", dict(gallery_opts))
+            else:
+                playlist_choice = False # Default: Single video
+                if "list=" in url and "youtube.com" in url:
+                     # Only ask if NOT in batch mode (Batch defaults to Single)
+                     if not self.is_batch_mode:
+                         playlist_choice = self.ask_playlist_mode(url)
+                         if playlist_choice is None: # Cancelled
+                             self.scheduler.clear()
+                             self.status_label.setText("İşlem kullanıcı tarafından iptal edildi.")
+                             return
+                
+                opts = dict(video_opts)
+                opts['playlist_mode'] = playlist_choice
+                # Playlists are expanded first, every entry then runs as its own job
+                job_id = self.scheduler.add_job(url, "playlist" if playlist_choice else "video", opts)
+            
+            if self.is_batch_mode:
+                self.batch_model.set_job(row, job_id, 'queued')
 
-        # Get next url
-        next_url = self.download_queue.pop(0)
-        
-        # Update UI for Batch Item
-        if self.is_batch_mode:
-            item = self.batch_list.item(self.current_batch_index)
-            item.setIcon(FluentIcon.SYNC.icon()) # Spinner/Sync icon for processing
-            self.batch_list.scrollToItem(item)
-            self.batch_list.setCurrentItem(item)
+        self.total_batch_count = len(urls_to_process)
 
-        self.current_batch_index += 1
+        # Save for cleanup / open folder usage
+        if video_opts:
+            self.current_download_folder = video_opts.get('output_folder')
+        elif gallery_opts:
+            self.current_download_folder = gallery_opts.get('download_folder')
         
-        # Update Status
+        # 4. Start Scheduler
         if self.total_batch_count > 1:
-            self.status_label.setText(f"Toplu İndirme: {self.current_batch_index}/{self.total_batch_count} başlatılıyor...")
+            self.status_label.setText(f"Toplu İndirme: {self.total_batch_count} öğe sıraya alındı...")
         else:
             self.status_label.setText("İşlem başlatılıyor...")
             
-        # Check Playlist (Only for single or first item to avoid spamming? 
-        # Actually proper way is to check each, but for batch it might be annoying.
-        # Let's assume for Batch mode we default to NO playlist to be safe, or ask?
-        # User request implies per link check. But blocking UI in loop is tricky.
-        # For now, let's implement the check inside _init_worker (or before it)
-        
-        # Determine Mode
-        mode = get_url_type(next_url)
+        self.set_ui_busy(True)
+        self.scheduler.start()
+
+    def resume_unfinished_jobs(self):
+        """Restores jobs left queued/running by a crash or close and continues them."""
+        if not self.job_store or self.scheduler.is_busy():
+            return
         
-        if mode == "gallery":
-            self._init_gallery_worker(next_url)
+        try:
+            records = self.job_store.get_unfinished()
+        except Exception as e:
+            print(f"Kuyruk okunamadı: {e}")
+            return
+        if not records:
             return
 
-        # We need to act differently based on user response, so we can't just fire and forget.
-        
-        # We need to act differently based on user response, so we can't just fire and forget.
-        # Let's do the check here.
+        # Show restored jobs in the batch list
+        if not self.is_batch_mode:
+            self.batch_btn.setChecked(True)
+            self.toggle_batch_mode()
+        self.clear_batch_list()
+        
+        self.scheduler.clear()
+        rows = []
+        for record in records:
+            job_id = self.scheduler.restore_job(record)
+            if record.get('parent_id'):
+                continue # Playlist entries are shown through their playlist row
+            self.batch_index.add(record['url'])
+            rows.append(dict(record, state=self.scheduler.jobs[job_id].state))
+        self.batch_model.append_jobs(rows)
+
+        self.total_batch_count = self.batch_model.rowCount()
+        first_opts = records[0]['options']
+        self.current_download_folder = first_opts.get('output_folder') or first_opts.get('download_folder')
+
+        InfoBar.info(
+            title='Yarım Kalan İndirmeler',
+            content=f"{self.total_batch_count} indirme kaldığı yerden devam ettiriliyor.",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=4000,
+            parent=self
+        )
+
+        self.set_ui_busy(True)
+        self.scheduler.set_limits(*self._get_concurrency_limits())
+        self.scheduler.start()
+
+    def show_paused_jobs(self):
+        """Lists paused downloads and lets the user resume or discard them."""
+        if not self.job_store or self.scheduler.is_busy():
+            return
+        try:
+            records = self.job_store.get_paused()
+        except Exception as e:
+            print(f"Kuyruk okunamadı: {e}")
+            return
+        if not records:
+            return
         
-        playlist_choice = False # Default: Single video
-        if "list=" in next_url and "youtube.com" in next_url:
-             # Only ask if NOT in batch mode (Batch defaults to Single)
-             if not self.is_batch_mode:
-                 # Ask User
-                 playlist_choice = self.ask_playlist_mode(next_url)
-                 if playlist_choice is None: # Cancelled
-                     # User wants to stop/cancel check.
-                     # Stop processing, don't clear inputs.
-                     self.set_ui_busy(False)
-                     self.status_label.setText("İşlem kullanıcı tarafından iptal edildi.")
-                     return
+        dialog = PausedJobsDialog(records, self.window())
+        dialog.exec()
+        if dialog.result_mode == 'resume':
+            self.resume_paused_jobs()
+        elif dialog.result_mode == 'discard':
+            self.discard_paused_jobs()
 
-        self._init_worker(next_url, playlist_choice)
+    def resume_paused_jobs(self):
+        if not self.job_store or self.scheduler.is_busy():
+            return
+        if self.job_store.resume_paused():
+            self.resume_unfinished_jobs()
+
+    def discard_paused_jobs(self):
+        """Cancels paused jobs and deletes their partial files (in the background)."""
+        stream_files = self.job_store.discard_paused()
+        files = [f for path in stream_files for f in partial_files_for(path)]
+        if files:
+            threading.Thread(target=remove_files, args=(files, ), daemon=True).start()
+        self.status_label.setText("Duraklatılmış indirmeler silindi.")
+
+    def _get_concurrency_limits(self):
+        settings = get_settings()
+        try:
+            max_total = int(settings.value("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT))
+            max_host = int(settings.value("max_downloads_per_host", DEFAULT_MAX_PER_HOST))
+        except (TypeError, ValueError):
+            max_total, max_host = DEFAULT_MAX_CONCURRENT, DEFAULT_MAX_PER_HOST
+        return max_total, max_host
 
     def ask_playlist_mode(self, url):
         """Returns True for Playlist, False for Single, None for Cancel"""
@@ -866,9 +1067,11 @@ class HomeView(QWidget):
         else:
             return None # Cancelled
 
-    def _init_worker(self, url, download_playlist=False):
-        # Logic extracted from old start_download
-        
+    def _collect_video_options(self):
+        """
+        Builds DownloadWorker keyword arguments from the current UI state.
+        Returns None if validation fails.
+        """
         # Determine Format
         checked_id = self.format_group.checkedId()
         fmt_map = {0: 'mp4', 1: 'mp3', 2: 'm4a'}
@@ -935,10 +1138,7 @@ class HomeView(QWidget):
                     duration=3000,
                     parent=self
                 )
-                # If validating failed, we should probably stop the queue or skip?
-                # For now let's skip current
-                self.process_queue()
-                return
+                return None
 
         try:
             settings = get_settings()
@@ -958,45 +1158,27 @@ class HomeView(QWidget):
             
             if not os.path.exists(download_folder):
                 os.makedirs(download_folder)
-            
-            # Save for cleanup usage
-            self.current_download_folder = download_folder
 
         except Exception as e:
             # Fallback
             print(f"Klasör hatası: {e}")
             download_folder = None
-            self.current_download_folder = None
 
-        # Threading
-        # Subopts might need update if playlist? No, keep same.
-        # We need to pass playlist info to worker. 
-        # But DownloadWorker constructor signature needs update OR we pass in options.
-        # Since I can't easily change constructor in this step without touching core, 
-        # I will inject the option into 'trim_opts' or similar hack, OR better:
-        # Update DownloadWorker is safer. But for now let's assume I can't see DownloadWorker file in this context easily.
-        # Wait, I have to update DownloadWorker to support 'playlist_items' opt.
-        
         # Browser Cookie Check
         browser_choice = get_settings().value("browser_cookies", "disabled")
         
-        # Actually, let's pass a 'playlist' key in sub_opts for now to avoid breaking signature widely, 
-        # OR just update constructor in next step. For now let's assume constructor update comes next.
-        # I'll pass it as a keyword argument if I could, but I'll stick to updating signature in next tool call.
-        # For this step, I will just pass `playlist: download_playlist` inside a new dict or existing one.
-        # Let's assume I'll add `playlist_mode` as new arg to DownloadWorker.
-        
-        self.worker = DownloadWorker(url, selected_fmt, quality_val, sub_opts, trim_opts, output_folder=download_folder, playlist_mode=download_playlist, browser=browser_choice)
-        self.worker.progress.connect(self.update_progress)
-        self.worker.log.connect(self.update_status)
-        self.worker.finished.connect(self.on_success)
-        self.worker.error.connect(self.on_error)
-        
-        # Start Thread
-        self.worker.start()
+        return {
+            'fmt': selected_fmt,
+            'quality': quality_val,
+            'sub_opts': sub_opts,
+            'trim_opts': trim_opts,
+            'output_folder': download_folder,
+            'playlist_mode': False,
+            'browser': browser_choice,
+        }
 
-    def _init_gallery_worker(self, url):
-        # Prepare Options
+    def _collect_gallery_options(self):
+        """Builds GalleryWorker options from the current UI state."""
         opts = {}
         
         # 1. Range / Limit Options
@@ -1020,7 +1202,7 @@ class HomeView(QWidget):
             if len(d) == 10:
                 opts['date_after'] = d
             else:
-                self.worker.log.emit("⚠️ Geçersiz tarih formatı, filtre yoksayılıyor.")
+                self.update_status("⚠️ Geçersiz tarih formatı, filtre yoksayılıyor.")
         
         # 3. Type Filter (Photo/Video)
         g_type = self.gallery_type_group.checkedId()
@@ -1045,24 +1227,16 @@ class HomeView(QWidget):
                 os.makedirs(dest_folder)
             
             opts['download_folder'] = dest_folder
-            self.current_download_folder = dest_folder 
             
         except Exception:
             opts['download_folder'] = None 
 
-        from src.core.logger import get_logger
-        logger = get_logger()
-        logger.info(f"[UI] Starting Gallery Download. URL: {url}")
-        logger.info(f"[UI] Options: {opts}")
+        # Browser cookies (shared session cache)
+        opts['browser'] = get_settings().value("browser_cookies", "disabled")
 
-        self.worker = GalleryWorker(url, opts)
-        
-        self.worker.log.connect(self.update_status)
-        self.worker.finished.connect(lambda msg: self.on_success(msg, url)) 
-        self.worker.error.connect(self.on_error)
-        self.worker.progress.connect(self.update_status) 
-        
-        self.worker.start()
+        from src.core.logger import get_logger
+        get_logger().info(f"[UI] Gallery Options: {opts}")
+        return opts
 
     def _parse_time_ui(self, time_str):
         try:
@@ -1106,7 +1280,98 @@ class HomeView(QWidget):
             self.progress_bar.hide()
 
     def update_progress(self, val):
-        self.progress_bar.setValue(val)
+        self.progress_bar.setValue(int(val))
+
+    def _set_row_state(self, job_id, state):
+        """Updates the batch list row (icon) of a job."""
+        if self.is_batch_mode:
+            self.batch_model.set_state(job_id, state)
+
+    def _playlist_entry(self, job_id):
+        """Returns the job if it is an entry of an expanded playlist, else None."""
+        job = self.scheduler.jobs.get(job_id)
+        return job if job and job.parent_id else None
+
+    def on_job_started(self, job_id):
+        self._set_row_state(job_id, 'running') # Spinner/Sync icon for processing
+        
+        row = self.batch_model.row_of_job(job_id)
+        if self.is_batch_mode and row is not None:
+            self.batch_list.scrollTo(self.batch_model.index(row))
+
+        if self.total_batch_count > 1:
+            active = self.scheduler.count('running') + self.scheduler.count('processing')
+            done = self.total_batch_count - self.scheduler.count('queued') - active
+            self.status_label.setText(f"Toplu İndirme: {done}/{self.total_batch_count} tamamlandı, {active} aktif...")
+
+    def on_job_progress(self, job_id, val):
+        if self.total_batch_count > 1:
+            self.update_progress(self.scheduler.overall_progress())
+        elif not self._playlist_entry(job_id):
+            # Playlist entries: the playlist job reports the aggregate progress
+            self.update_progress(val)
+
+    def _job_prefix(self, job_id):
+        """'#row [entry] ' prefix when several jobs share the status label."""
+        prefix = ""
+        entry = self._playlist_entry(job_id)
+        if entry:
+            prefix = f"[{entry.options.get('playlist_index')}] "
+            job_id = entry.parent_id
+        if self.total_batch_count > 1:
+            prefix = f"#{(self.batch_model.row_of_job(job_id) or 0) + 1} {prefix}"
+        return prefix
+
+    def on_job_log(self, job_id, msg):
+        self.update_status(self._job_prefix(job_id) + msg)
+
+    def on_job_event(self, event):
+        # Status text is built from the numbers of the event (no string parsing)
+        msg = self._job_prefix(event.job_id) + format_event(event)
+        if len(msg) > 75:
+            msg = msg[:72] + "..."
+        self.status_label.setText(msg)
+
+    def on_job_finished(self, job_id, title):
+        job = self.scheduler.jobs.get(job_id)
+        if self._playlist_entry(job_id):
+            # Single entry of a playlist: no popup per video
+            self.status_label.setText(f"Tamamlandı: {title}")
+            history_manager.add_entry(title, job.url, "")
+            return
+        
+        self._set_row_state(job_id, 'finished') # Checkmark
+        if self.total_batch_count > 1:
+            self.update_progress(self.scheduler.overall_progress())
+        if job and job.kind == 'playlist':
+            # Entries were added to the history one by one
+            self.status_label.setText(f"Tamamlandı: {title}")
+            InfoBar.success(
+                title='Oynatma Listesi Tamamlandı',
+                content=f"{title}",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP_RIGHT,
+                duration=3000,
+                parent=self
+            )
+            if not self.is_batch_mode:
+                self._check_and_open_folder()
+            return
+        self.on_success(title, job.url if job else "")
+
+    def on_job_failed(self, job_id, err_msg):
+        entry = self._playlist_entry(job_id)
+        if entry:
+            from src.core.logger import get_logger
+            get_logger().error(f"Playlist entry failed ({entry.url}): {err_msg}")
+            self.update_status(f"[{entry.options.get('playlist_index')}] Hata: {err_msg}")
+            return
+        
+        self._set_row_state(job_id, 'failed') # X icon
+        if self.total_batch_count > 1:
+            self.update_progress(self.scheduler.overall_progress())
+        self.on_error(err_msg)
 
     def update_status(self, msg):
         # Translate some specific technical status messages if needed, 
@@ -1128,14 +1393,6 @@ class HomeView(QWidget):
         
         self.status_label.setText(f"Tamamlandı: {title}")
         
-        # Update Batch Item Icon
-        if self.is_batch_mode and self.current_batch_index > 0:
-            # Index is 1-based in counter, but 0-based in list
-            # current_batch_index was incremented in process_queue BEFORE worker start
-            # So item index is (current_batch_index - 1)
-            item = self.batch_list.item(self.current_batch_index - 1)
-            item.setIcon(FluentIcon.ACCEPT.icon()) # Checkmark
-        
         # Add to History
         history_manager.add_entry(title, url, "")
         
@@ -1155,9 +1412,6 @@ class HomeView(QWidget):
         # For batch, we open it once at the end.
         if not self.is_batch_mode:
             self._check_and_open_folder()
-        
-        # Trigger Next
-        self.process_queue()
 
     def on_all_finished(self):
         """Called when queue is empty"""
@@ -1206,14 +1460,17 @@ class HomeView(QWidget):
             self.set_ui_busy(False)
             return
 
-        # 2. Cancel Download Worker
-        if self.worker:
+        # 2. Cancel Running Jobs
+        if self.scheduler.is_busy():
             self.status_label.setText("İndirme iptal ediliyor...")
             
-            # Safe Stop logic
-            if hasattr(self.worker, 'stop'):
-                 self.worker.stop()
-                 self.worker.wait(2000) # Give it 2 seconds to gracefully stop
+            running_ids = [job.id for job in self.scheduler.active_jobs()]
+            
+            # Resume mode: jobs are paused and keep their partial files
+            keep_partials = get_settings().value("keep_partials_on_cancel", "true") == "true" and self.job_store
+            
+            # Safe Stop logic (stops workers and drops the rest of the queue)
+            stream_files = self.scheduler.cancel_all(persist_state='paused' if keep_partials else 'cancelled')
             
             # Force Kill Processes to unlock files immediately
             try:
@@ -1228,37 +1485,53 @@ class HomeView(QWidget):
             except:
                 pass
 
-            # Clear Queue
-            self.download_queue = []
-            
             # Reset UI
             self.set_ui_busy(False)
+            
+            if keep_partials:
+                self.status_label.setText("İndirme duraklatıldı. Kaldığı yerden devam ettirilebilir.")
+                for job_id in running_ids:
+                    self._set_row_state(job_id, 'paused')
+                self._show_resume_bar()
+                return
+            
             self.status_label.setText("İndirme iptal edildi.")
             
-            # If batch mode, mark current as cancelled
-            if self.is_batch_mode and self.current_batch_index > 0:
-                 item = self.batch_list.item(self.current_batch_index - 1)
-                 item.setIcon(FluentIcon.CANCEL.icon())
+            # If batch mode, mark running items as cancelled
+            for job_id in running_ids:
+                self._set_row_state(job_id, 'cancelled')
             
             # Trigger Cleanup (Delayed to allow thread to release locks)
-            QTimer.singleShot(2000, self._cleanup_after_cancel)
+            QTimer.singleShot(2000, lambda: self._cleanup_after_cancel(stream_files))
 
-    def _cleanup_after_cancel(self):
-        """Removes partial files after cancellation (Recursively)"""
+    def _show_resume_bar(self):
+        info_bar = InfoBar(
+            icon=FluentIcon.PAUSE,
+            title="İndirme Duraklatıldı",
+            content="Yarım dosyalar korunuyor.",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP_RIGHT,
+            duration=8000,
+            parent=self
+        )
+        btn = PushButton("Devam Et")
+        btn.setFixedWidth(90)
+        btn.clicked.connect(self.resume_paused_jobs)
+        btn.clicked.connect(info_bar.close)
+        info_bar.addWidget(btn)
+        info_bar.show()
+
+    def _cleanup_after_cancel(self, stream_files):
+        """
+        Removes the partial files of the cancelled jobs (.part, .ytdl, fragments, .temp).
+        Only names derived from their streams: partials of paused jobs stay.
+        """
         try:
-            folder = getattr(self, 'current_download_folder', None)
-            if not folder or not os.path.exists(folder):
-                return
-            
-            # Walk through all subdirectories to find trash
-            for root, dirs, files in os.walk(folder):
-                for fname in files:
-                    if fname.endswith(('.part', '.ytdl', '.temp')):
-                        try:
-                            os.remove(os.path.join(root, fname))
-                            print(f"[Temizlik] Silindi: {fname}")
-                        except OSError:
-                            pass 
+            files = [f for path in stream_files for f in partial_files_for(path, include_stream=False)]
+            removed = remove_files(files)
+            if removed:
+                print(f"[Temizlik] {removed} yarım dosya silindi.")
         except Exception as e:
             print(f"Temizlik hatası: {e}")
 
@@ -1305,14 +1578,6 @@ class HomeView(QWidget):
             duration=3000,
             parent=self
         )
-        
-        # Update Batch Item Icon to Error
-        if self.is_batch_mode and self.current_batch_index > 0:
-            item = self.batch_list.item(self.current_batch_index - 1)
-            item.setIcon(FluentIcon.CANCEL.icon()) # X icon
-
-        # Continue Queue
-        self.process_queue()
 
     def perform_post_action(self, action_idx):
         self.pending_action_idx = action_idx
@@ -1363,19 +1628,22 @@ class HomeView(QWidget):
 
     def stop_workers(self):
         """Stops any active worker threads safely."""
-        # Stop Gallery/Download Worker
-        if hasattr(self, 'worker') and self.worker:
-            try:
-                if self.worker.isRunning():
-                    if hasattr(self.worker, 'stop'):
-                        self.worker.stop()
-                    
-                    # Wait gracefully before resorting to terminate if absolutely needed
-                    if not self.worker.wait(2000):
-                        self.worker.terminate()
-                        self.worker.wait(1000)
-            except Exception as e:
-                print(f"Worker stop error: {e}")
+        # Stop Gallery/Download Workers
+        try:
+            self.scheduler.stop_all()
+        except Exception as e:
+            print(f"Worker stop error: {e}")
+
+        # Stop metadata prefetches and duplicate lookups (nothing depends on them)
+        self.prefetch_timer.stop()
+        for worker in self.prefetch_workers:
+            if worker.isRunning():
+                worker.terminate()
+                worker.wait(1000)
+        for worker in self.canonical_workers:
+            if worker.isRunning():
+                worker.requestInterruption()
+                worker.wait(1000)
 
         # Stop Shutdown Timer
         if hasattr(self, 'shutdown_timer') and self.shutdown_timer.isActive():
@@ -1,10 +1,13 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QFileDialog
 from PySide6.QtCore import Qt
-from qfluentwidgets import (TitleLabel, PushSettingCard, SwitchSettingCard, FluentIcon, ComboBox, 
+from qfluentwidgets import (TitleLabel, PushSettingCard, SwitchSettingCard, FluentIcon, ComboBox, SwitchButton,
                             setTheme, setThemeColor, Theme, InfoBar, InfoBarPosition, BodyLabel, CardWidget, themeColor)
 import os
 from src.settings_manager import get_settings, get_default_download_folder
 from src.core.logger import get_logger
+from src.core.scheduler import DEFAULT_MAX_CONCURRENT, DEFAULT_MAX_PER_HOST
+from src.core.bandwidth import get_bandwidth_governor, RATE_PRESETS_KB, format_rate
+from src.core.cookie_jar import get_cookie_cache
 
 class SettingsView(QWidget):
     def __init__(self, text: str, parent=None):
@@ -70,6 +73,20 @@ class SettingsView(QWidget):
         
         self.v_layout.addWidget(self.open_folder_switch)
         
+        # 4.5 Keep Partial Files on Cancel (Resume Mode)
+        self.keep_partials_switch = SwitchSettingCard(
+            icon=FluentIcon.PAUSE,
+            title="İptalde Kaldığı Yerden Devam Et",
+            content="İptal edilen indirmeler duraklatılır ve yarım dosyaları silinmez, daha sonra devam ettirilebilir.",
+            parent=self
+        )
+        # Load state (Default: True)
+        keep_partials = self.settings.value("keep_partials_on_cancel", "true") == "true"
+        self.keep_partials_switch.setChecked(keep_partials)
+        self.keep_partials_switch.checkedChanged.connect(self.toggle_keep_partials)
+        
+        self.v_layout.addWidget(self.keep_partials_switch)
+        
         # 5. Check Updates on Startup Switch
         self.startup_update_switch = SwitchSettingCard(
             icon=FluentIcon.SYNC,
@@ -146,6 +163,136 @@ class SettingsView(QWidget):
         # Load Browser Setting
         self.load_browser_setting()
 
+        # 8. Concurrent Downloads Section
+        self.parallel_card = CardWidget(self)
+        self.parallel_card.setFixedHeight(80)
+        self.parallel_layout = QHBoxLayout(self.parallel_card)
+        self.parallel_layout.setContentsMargins(20, 0, 20, 0)
+        
+        self.parallel_icon_label = BodyLabel()
+        self.parallel_icon_label.setPixmap(FluentIcon.SPEED_HIGH.icon().pixmap(20, 20))
+        
+        self.parallel_text_layout = QVBoxLayout()
+        self.parallel_text_layout.setSpacing(2)
+        self.parallel_title = BodyLabel("Eşzamanlı İndirme", self)
+        self.parallel_title.setStyleSheet("font-size: 14px; font-weight: 500;")
+        self.parallel_desc = BodyLabel("Toplu indirmede aynı anda çalışacak indirme sayısı (Toplam / Site başına).", self)
+        self.parallel_desc.setTextColor("#808080", "#909090")
+        
+        self.parallel_text_layout.addStretch(1)
+        self.parallel_text_layout.addWidget(self.parallel_title)
+        self.parallel_text_layout.addWidget(self.parallel_desc)
+        self.parallel_text_layout.addStretch(1)
+
+        self.parallel_total_combo = ComboBox(self)
+        self.parallel_total_combo.addItems([str(i) for i in range(1, 11)])
+        self.parallel_total_combo.setFixedWidth(70)
+        
+        self.parallel_host_combo = ComboBox(self)
+        self.parallel_host_combo.addItems([str(i) for i in range(1, 11)])
+        self.parallel_host_combo.setFixedWidth(70)
+
+        self.parallel_layout.addWidget(self.parallel_icon_label)
+        self.parallel_layout.addSpacing(15)
+        self.parallel_layout.addLayout(self.parallel_text_layout)
+        self.parallel_layout.addStretch(1)
+        self.parallel_layout.addWidget(self.parallel_total_combo)
+        self.parallel_layout.addWidget(self.parallel_host_combo)
+        
+        self.v_layout.addWidget(self.parallel_card)
+        
+        # Load Concurrency Setting
+        self.load_parallel_setting()
+        self.parallel_total_combo.currentIndexChanged.connect(self.change_parallel)
+        self.parallel_host_combo.currentIndexChanged.connect(self.change_parallel)
+
+        # 9. Bandwidth Limit Section (applies to running downloads immediately)
+        self.bandwidth_card = CardWidget(self)
+        self.bandwidth_card.setFixedHeight(80)
+        self.bandwidth_layout = QHBoxLayout(self.bandwidth_card)
+        self.bandwidth_layout.setContentsMargins(20, 0, 20, 0)
+
+        self.bandwidth_icon_label = BodyLabel()
+        self.bandwidth_icon_label.setPixmap(FluentIcon.SPEED_MEDIUM.icon().pixmap(20, 20))
+
+        self.bandwidth_text_layout = QVBoxLayout()
+        self.bandwidth_text_layout.setSpacing(2)
+        self.bandwidth_title = BodyLabel("Bant Genişliği Sınırı", self)
+        self.bandwidth_title.setStyleSheet("font-size: 14px; font-weight: 500;")
+        self.bandwidth_desc = BodyLabel("Tüm indirmelerin toplam hızı. Aktif indirmeler arasında eşit paylaştırılır.", self)
+        self.bandwidth_desc.setTextColor("#808080", "#909090")
+
+        self.bandwidth_text_layout.addStretch(1)
+        self.bandwidth_text_layout.addWidget(self.bandwidth_title)
+        self.bandwidth_text_layout.addWidget(self.bandwidth_desc)
+        self.bandwidth_text_layout.addStretch(1)
+
+        self.bandwidth_combo = ComboBox(self)
+        self.bandwidth_combo.addItems([format_rate(kb) for kb in RATE_PRESETS_KB])
+        self.bandwidth_combo.setFixedWidth(120)
+
+        self.bandwidth_layout.addWidget(self.bandwidth_icon_label)
+        self.bandwidth_layout.addSpacing(15)
+        self.bandwidth_layout.addLayout(self.bandwidth_text_layout)
+        self.bandwidth_layout.addStretch(1)
+        self.bandwidth_layout.addWidget(self.bandwidth_combo)
+
+        self.v_layout.addWidget(self.bandwidth_card)
+
+        # 10. Scheduled Bandwidth Limit (e.g. office hours)
+        self.schedule_card = CardWidget(self)
+        self.schedule_card.setFixedHeight(80)
+        self.schedule_layout = QHBoxLayout(self.schedule_card)
+        self.schedule_layout.setContentsMargins(20, 0, 20, 0)
+
+        self.schedule_icon_label = BodyLabel()
+        self.schedule_icon_label.setPixmap(FluentIcon.DATE_TIME.icon().pixmap(20, 20))
+
+        self.schedule_text_layout = QVBoxLayout()
+        self.schedule_text_layout.setSpacing(2)
+        self.schedule_title = BodyLabel("Zamanlanmış Sınır", self)
+        self.schedule_title.setStyleSheet("font-size: 14px; font-weight: 500;")
+        self.schedule_desc = BodyLabel("Seçilen saatler arasında farklı bir hız sınırı uygula (Başlangıç / Bitiş / Hız).", self)
+        self.schedule_desc.setTextColor("#808080", "#909090")
+
+        self.schedule_text_layout.addStretch(1)
+        self.schedule_text_layout.addWidget(self.schedule_title)
+        self.schedule_text_layout.addWidget(self.schedule_desc)
+        self.schedule_text_layout.addStretch(1)
+
+        hours = [f"{h:02d}:00" for h in range(24)]
+        self.schedule_switch = SwitchButton(self)
+        self.schedule_switch.setOnText("Açık")
+        self.schedule_switch.setOffText("Kapalı")
+        self.schedule_start_combo = ComboBox(self)
+        self.schedule_start_combo.addItems(hours)
+        self.schedule_start_combo.setFixedWidth(90)
+        self.schedule_end_combo = ComboBox(self)
+        self.schedule_end_combo.addItems(hours)
+        self.schedule_end_combo.setFixedWidth(90)
+        self.schedule_rate_combo = ComboBox(self)
+        self.schedule_rate_combo.addItems([format_rate(kb) for kb in RATE_PRESETS_KB])
+        self.schedule_rate_combo.setFixedWidth(120)
+
+        self.schedule_layout.addWidget(self.schedule_icon_label)
+        self.schedule_layout.addSpacing(15)
+        self.schedule_layout.addLayout(self.schedule_text_layout)
+        self.schedule_layout.addStretch(1)
+        self.schedule_layout.addWidget(self.schedule_switch)
+        self.schedule_layout.addWidget(self.schedule_start_combo)
+        self.schedule_layout.addWidget(self.schedule_end_combo)
+        self.schedule_layout.addWidget(self.schedule_rate_combo)
+
+        self.v_layout.addWidget(self.schedule_card)
+
+        # Load Bandwidth Settings
+        self.load_bandwidth_setting()
+        self.bandwidth_combo.currentIndexChanged.connect(self.change_bandwidth)
+        self.schedule_switch.checkedChanged.connect(self.change_bandwidth)
+        self.schedule_start_combo.currentIndexChanged.connect(self.change_bandwidth)
+        self.schedule_end_combo.currentIndexChanged.connect(self.change_bandwidth)
+        self.schedule_rate_combo.currentIndexChanged.connect(self.change_bandwidth)
+
         self.v_layout.addSpacing(20) # Add some space instead of the title
 
         # Custom Theme Card (CardWidget)
@@ -218,6 +365,10 @@ class SettingsView(QWidget):
         val = "true" if checked else "false"
         self.settings.setValue("open_folder_on_complete", val)
 
+    def toggle_keep_partials(self, checked: bool):
+        val = "true" if checked else "false"
+        self.settings.setValue("keep_partials_on_cancel", val)
+
     def toggle_debug(self, checked: bool):
         val = "true" if checked else "false"
         self.settings.setValue("debug_mode", val)
@@ -308,6 +459,16 @@ class SettingsView(QWidget):
         # Browser Card
         self.browser_icon_label.setPixmap(FluentIcon.PEOPLE.icon(color=c).pixmap(20, 20))
         self.browser_title.setStyleSheet("font-size: 14px; font-weight: 500; color: #f0f0f0;")
+        
+        # Concurrency Card
+        self.parallel_icon_label.setPixmap(FluentIcon.SPEED_HIGH.icon(color=c).pixmap(20, 20))
+        self.parallel_title.setStyleSheet("font-size: 14px; font-weight: 500; color: #f0f0f0;")
+        
+        # Bandwidth Cards
+        self.bandwidth_icon_label.setPixmap(FluentIcon.SPEED_MEDIUM.icon(color=c).pixmap(20, 20))
+        self.bandwidth_title.setStyleSheet("font-size: 14px; font-weight: 500; color: #f0f0f0;")
+        self.schedule_icon_label.setPixmap(FluentIcon.DATE_TIME.icon(color=c).pixmap(20, 20))
+        self.schedule_title.setStyleSheet("font-size: 14px; font-weight: 500; color: #f0f0f0;")
 
     def load_browser_setting(self):
         saved_browser = self.settings.value("browser_cookies", "disabled")
@@ -330,6 +491,7 @@ class SettingsView(QWidget):
         browser_key = mapping.get(index, "disabled")
         
         self.settings.setValue("browser_cookies", browser_key)
+        get_cookie_cache().invalidate(browser_key) # Read the browser again on next use
         
         if browser_key != "disabled":
             InfoBar.info(
@@ -342,3 +504,49 @@ class SettingsView(QWidget):
                 parent=self.window()
             )
 
+
+    def load_parallel_setting(self):
+        max_total = self.settings.value("max_concurrent_downloads", DEFAULT_MAX_CONCURRENT)
+        max_host = self.settings.value("max_downloads_per_host", DEFAULT_MAX_PER_HOST)
+        
+        try:
+            total_idx = min(max(int(max_total), 1), 10) - 1
+            host_idx = min(max(int(max_host), 1), 10) - 1
+        except (TypeError, ValueError):
+            total_idx, host_idx = DEFAULT_MAX_CONCURRENT - 1, DEFAULT_MAX_PER_HOST - 1
+        
+        self.parallel_total_combo.setCurrentIndex(total_idx)
+        self.parallel_host_combo.setCurrentIndex(host_idx)
+
+    def change_parallel(self, index):
+        self.settings.setValue("max_concurrent_downloads", self.parallel_total_combo.currentIndex() + 1)
+        self.settings.setValue("max_downloads_per_host", self.parallel_host_combo.currentIndex() + 1)
+
+    def load_bandwidth_setting(self):
+        def preset_index(key):
+            try:
+                return RATE_PRESETS_KB.index(int(self.settings.value(key, 0)))
+            except (TypeError, ValueError):
+                return 0
+
+        def hour_index(key, default):
+            try:
+                return int(str(self.settings.value(key, default)).split(':')[0]) % 24
+            except (TypeError, ValueError):
+                return int(default.split(':')[0])
+
+        self.bandwidth_combo.setCurrentIndex(preset_index("bandwidth_limit_kb"))
+        self.schedule_rate_combo.setCurrentIndex(preset_index("bandwidth_schedule_limit_kb"))
+        self.schedule_start_combo.setCurrentIndex(hour_index("bandwidth_schedule_start", "09:00"))
+        self.schedule_end_combo.setCurrentIndex(hour_index("bandwidth_schedule_end", "18:00"))
+        self.schedule_switch.setChecked(self.settings.value("bandwidth_schedule_enabled", "false") == "true")
+
+    def change_bandwidth(self, *args):
+        self.settings.setValue("bandwidth_limit_kb", RATE_PRESETS_KB[self.bandwidth_combo.currentIndex()])
+        self.settings.setValue("bandwidth_schedule_limit_kb", RATE_PRESETS_KB[self.schedule_rate_combo.currentIndex()])
+        self.settings.setValue("bandwidth_schedule_start", self.schedule_start_combo.currentText())
+        self.settings.setValue("bandwidth_schedule_end", self.schedule_end_combo.currentText())
+        self.settings.setValue("bandwidth_schedule_enabled", "true" if self.schedule_switch.isChecked() else "false")
+        
+        # Running downloads pick up the new limit right away
+        get_bandwidth_governor().reload_settings()
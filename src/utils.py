@@ -1,5 +1,6 @@
 import os
 import sys
+from urllib.parse import urlparse
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -12,6 +13,18 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+def get_host(url):
+    """Returns the normalized host of a URL (used for per-host limits and tuning)."""
+    try:
+        if not url.startswith('http'):
+            url = 'https://' + url
+        host = urlparse(url).netloc.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        return host
+    except Exception:
+        return ''
+
 def kill_external_processes():
     """
     Kills potential lingering background processes (ffmpeg, ffprobe, yt-dlp).
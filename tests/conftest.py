@@ -0,0 +1,77 @@
+import http.server
+import os
+import re
+import sys
+import tempfile
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Logs and settings of the test run stay out of the user's Orbit folder
+os.environ['APPDATA'] = tempfile.mkdtemp(prefix='orbit-tests-')
+
+
+class MediaServer(http.server.ThreadingHTTPServer):
+    """
+    Local stand-in for a media host: serves in-memory files with HTTP Range
+    support (keep-alive, 206 + Content-Range) and records every request.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), RangeHandler)
+        self.files = {}      # path -> bytes
+        self.ranges = True   # False: Range headers are ignored (200 with the whole file)
+        self.requests = []   # (path, Range header)
+
+    def handle_error(self, request, client_address):
+        pass # Clients dropping a connection (cancelled downloads) are expected
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server_address[1]}/{path.lstrip('/')}"
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?', 1)[0]
+        data = server.files.get(path.lstrip('/'))
+        server.requests.append((path, self.headers.get('Range')))
+        if data is None:
+            self.send_error(404)
+            return
+
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')
+        if match and server.ranges:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes' if server.ranges else 'none')
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except OSError:
+            pass # Client went away (cancelled download)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def media_server():
+    server = MediaServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05, ), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+from yt_dlp.utils import make_archive_id
+
+from src.core.download_archive import DownloadArchive
+from src.core.ydl_pool import OrbitYoutubeDL
+
+PROFILE = 'video:best'
+ARCHIVE_ID = make_archive_id('Generic', 'clip')
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = DownloadArchive(str(tmp_path / 'archive.db'))
+    yield archive
+    archive.close()
+
+
+def test_entry_without_path_is_missing(archive):
+    archive.add(ARCHIVE_ID, PROFILE)
+    assert archive.lookup(ARCHIVE_ID, PROFILE) is None
+
+
+def test_entry_with_deleted_file_is_missing(archive, tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(b'x')
+    archive.add(ARCHIVE_ID, PROFILE, 'clip', str(path))
+    assert archive.lookup(ARCHIVE_ID, PROFILE)['path'] == str(path)
+    path.unlink()
+    assert archive.lookup(ARCHIVE_ID, PROFILE) is None
+
+
+def download(media_server, archive, tmp_path, defer_archive):
+    media_server.files['clip.mp4'] = os.urandom(64 * 1024)
+    ydl = OrbitYoutubeDL({
+        'quiet': True, 'noprogress': True, 'outtmpl': str(tmp_path / '%(title)s.%(ext)s'),
+        'download_archive': archive.view(PROFILE),
+    })
+    ydl.defer_archive = defer_archive
+    try:
+        ydl.process_ie_result({
+            'id': 'clip', 'title': 'clip', 'extractor': 'generic', 'extractor_key': 'Generic',
+            'webpage_url': media_server.url('watch'), 'url': media_server.url('clip.mp4'), 'ext': 'mp4',
+        }, download=True)
+    finally:
+        ydl.close()
+
+
+def test_yt_dlp_records_the_final_path(media_server, archive, tmp_path):
+    download(media_server, archive, tmp_path, defer_archive=False)
+    entry = archive.lookup(ARCHIVE_ID, PROFILE)
+    assert entry and entry['path'] == str(tmp_path / 'clip.mp4')
+
+
+def test_nothing_is_recorded_while_post_processing_is_deferred(media_server, archive, tmp_path):
+    download(media_server, archive, tmp_path, defer_archive=True)
+    assert archive.count() == 0
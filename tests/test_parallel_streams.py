@@ -0,0 +1,106 @@
+import os
+
+import pytest
+from yt_dlp.postprocessor import FFmpegMergerPP
+from yt_dlp.utils import prepend_extension
+
+from src.core.ydl_pool import OrbitYoutubeDL
+from src.core.mp4_postprocessor import OrbitMergerPP
+
+
+class RecordingYoutubeDL(OrbitYoutubeDL):
+    """Records what the merge step is handed instead of running ffmpeg."""
+    def __init__(self, params):
+        super().__init__(params)
+        self.merges = []   # (files to merge, merger classes)
+        self.threaded = [] # Files downloaded by a background stream
+
+    def _stream_worker(self, name, info, job):
+        self.threaded.append(name)
+        super()._stream_worker(name, info, job)
+
+    def run_all_pps(self, key, info, *, additional_pps=None):
+        if key == 'post_process':
+            self.merges.append((info.get('__files_to_merge'), [type(pp) for pp in additional_pps or []]))
+            return info
+        return super().run_all_pps(key, info, additional_pps=additional_pps)
+
+
+def format_filename(temp_filename, merged_ext, fmt):
+    """The name yt-dlp gives a format of a merge: prepend_extension(correct_ext(...)) of process_info."""
+    stem, real_ext = os.path.splitext(temp_filename)
+    base = stem if real_ext[1:] == merged_ext else temp_filename
+    return prepend_extension(f"{base}.{fmt['ext']}", f"f{fmt['format_id']}", fmt['ext'])
+
+
+@pytest.fixture
+def streams(media_server):
+    media_server.files['video.mp4'] = os.urandom(300 * 1024)
+    media_server.files['audio.m4a'] = os.urandom(100 * 1024)
+    return media_server
+
+
+def split_info(server, audio='audio.m4a'):
+    return {
+        'id': 'clip', 'title': 'clip.v2', 'extractor': 'generic', 'extractor_key': 'Generic',
+        'webpage_url': server.url('watch'),
+        'formats': [
+            {'format_id': 'v', 'url': server.url('video.mp4'), 'ext': 'mp4', 'protocol': 'http',
+             'vcodec': 'avc1', 'acodec': 'none'},
+            {'format_id': 'a', 'url': server.url(audio), 'ext': 'm4a', 'protocol': 'http',
+             'vcodec': 'none', 'acodec': 'mp4a'},
+        ],
+    }
+
+
+def run(tmp_path, info, outtmpl, parallel=True):
+    ydl = RecordingYoutubeDL({
+        'quiet': True, 'noprogress': True, 'format': 'v+a', 'merge_output_format': 'mp4',
+        'outtmpl': str(tmp_path / outtmpl), 'parallel_streams': parallel,
+    })
+    try:
+        ydl.process_ie_result(info, download=True)
+    finally:
+        ydl.close()
+    return ydl
+
+
+@pytest.fixture(autouse=True)
+def merger_available(monkeypatch):
+    # The merge itself isn't run: only its inputs are checked, ffmpeg isn't needed
+    monkeypatch.setattr(FFmpegMergerPP, 'available', True)
+
+
+@pytest.mark.parametrize('outtmpl, temp_name', [
+    ('%(title)s.%(ext)s', 'clip.v2.mp4'),
+    ('%(title)s', 'clip.v2'), # No extension in the template: correct_ext appends one
+])
+@pytest.mark.parametrize('parallel', [True, False])
+def test_streams_get_yt_dlp_names_and_reach_the_merger(streams, tmp_path, outtmpl, temp_name, parallel):
+    ydl = run(tmp_path, split_info(streams), outtmpl, parallel)
+
+    # In the order of the format spec 'v+a'
+    requested = [{'format_id': 'v', 'ext': 'mp4'}, {'format_id': 'a', 'ext': 'm4a'}]
+    expected = [format_filename(str(tmp_path / temp_name), 'mp4', f) for f in requested]
+    assert ydl.merges == [(expected, [OrbitMergerPP])]
+    assert ydl.threaded == (expected[1:] if parallel else [])
+    for path, name in zip(expected, ('video.mp4', 'audio.m4a')):
+        with open(path, 'rb') as f:
+            assert f.read() == streams.files[name]
+
+
+def test_both_streams_are_requested(streams, tmp_path):
+    run(tmp_path, split_info(streams), '%(title)s.%(ext)s')
+    assert {path for path, _ in streams.requests} == {'/video.mp4', '/audio.m4a'}
+
+
+def test_failed_stream_fails_the_item(streams, tmp_path):
+    ydl = RecordingYoutubeDL({
+        'quiet': True, 'noprogress': True, 'format': 'v+a', 'merge_output_format': 'mp4',
+        'outtmpl': str(tmp_path / '%(title)s.%(ext)s'), 'parallel_streams': True, 'retries': 0,
+    })
+    with pytest.raises(Exception):
+        ydl.process_ie_result(split_info(streams, audio='missing.m4a'), download=True)
+    ydl.close()
+    assert ydl.merges == []
+    assert ydl._stream_jobs == {} # No stream thread left behind
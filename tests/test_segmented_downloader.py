@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from src.core import segmented_downloader
+from src.core.segmented_downloader import SegmentedDownload, DirectDownloadError, probe, SEGMENTS_SUFFIX
+
+SIZE = 1024 * 1024 + 12345 # Not a multiple of the segment size: short last segment
+
+
+@pytest.fixture
+def small_segments(monkeypatch):
+    # Several segments without megabytes of test data
+    monkeypatch.setattr(segmented_downloader, 'SEGMENT_SIZE', 64 * 1024)
+    monkeypatch.setattr(segmented_downloader, 'MIN_SPLIT_SIZE', 128 * 1024)
+
+
+@pytest.fixture
+def movie(media_server):
+    data = os.urandom(SIZE)
+    media_server.files['movie.mp4'] = data
+    return data
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_probe_reads_size_and_range_support(media_server, movie):
+    info = probe(media_server.url('movie.mp4'))
+    assert info['size'] == SIZE
+    assert info['ranges'] is True
+
+
+@pytest.mark.parametrize('connections', [1, 4])
+def test_segmented_download_is_byte_identical(media_server, movie, small_segments, tmp_path, connections):
+    path = str(tmp_path / 'movie.mp4')
+    downloaded = SegmentedDownload(media_server.url('movie.mp4'), path, connections).run()
+
+    assert downloaded == SIZE
+    assert read(path) == movie
+    assert sorted(os.listdir(tmp_path)) == ['movie.mp4'] # .part and .segments are gone
+    ranges = [r for p, r in media_server.requests if r != 'bytes=0-0']
+    assert len(ranges) == -(-SIZE // segmented_downloader.SEGMENT_SIZE)
+
+
+def test_server_without_ranges_uses_one_connection(media_server, movie, small_segments, tmp_path):
+    media_server.ranges = False
+    path = str(tmp_path / 'movie.mp4')
+    SegmentedDownload(media_server.url('movie.mp4'), path, 4).run()
+
+    assert read(path) == movie
+    assert len(media_server.requests) == 2 # Probe + one plain GET
+
+
+def test_resume_from_segments_file(media_server, movie, small_segments, tmp_path):
+    path = str(tmp_path / 'movie.mp4')
+    url = media_server.url('movie.mp4')
+    progress = []
+    paused = SegmentedDownload(url, path, 2, on_progress=lambda done, total, speed: progress.append(done),
+                               should_continue=lambda: not progress or progress[-1] < SIZE // 2)
+    with pytest.raises(DirectDownloadError):
+        paused.run()
+
+    state_path = path + '.part' + SEGMENTS_SUFFIX
+    assert os.path.exists(state_path)
+    assert not os.path.exists(path)
+    kept = paused._downloaded
+    assert 0 < kept < SIZE
+
+    media_server.requests.clear()
+    resumed = SegmentedDownload(url, path, 2)
+    assert resumed.run() == SIZE
+    assert read(path) == movie
+    assert not os.path.exists(state_path)
+    # Only what was missing was asked for again (plus the 1-byte probe)
+    requested = 0
+    for _, header in media_server.requests:
+        start, end = map(int, header[len('bytes='):].split('-'))
+        requested += end - start + 1
+    assert requested == SIZE - kept + 1
+
+
+@pytest.mark.parametrize('announced', [SIZE + 4096, SIZE - 4096])
+def test_wrong_total_size_is_rejected(media_server, movie, tmp_path, monkeypatch, announced):
+    monkeypatch.setattr(segmented_downloader, 'SEGMENT_RETRIES', 0)
+    media_server.ranges = False # Whole file whatever was asked for
+    path = str(tmp_path / 'movie.mp4')
+    url = media_server.url('movie.mp4')
+    info = dict(probe(url), size=announced)
+
+    with pytest.raises(DirectDownloadError, match='incomplete|Size mismatch'):
+        SegmentedDownload(url, path, probe_info=info).run()
+    assert not os.path.exists(path) # Never renamed to its final name